@@ -44,6 +44,7 @@ class AdminControlWindow(ctk.CTkToplevel):
 
         self.user_tab = self.tabview.add("User Management")
         self.responder_tab = self.tabview.add("Responder Management")
+        self.analytics_tab = self.tabview.add("Response Times")
 
         # ============================== USER MANAGEMENT ==============================
         self._build_user_management_tab(self.user_tab)
@@ -51,6 +52,9 @@ class AdminControlWindow(ctk.CTkToplevel):
         # ============================= RESPONDER MANAGEMENT ==========================
         self._build_responder_management_tab(self.responder_tab)
 
+        # ============================= RESPONSE TIMES ================================
+        self._build_response_times_tab(self.analytics_tab)
+
         # initial state
         self.rm_active_shift = "A"
         self.refresh_lists()
@@ -93,6 +97,41 @@ class AdminControlWindow(ctk.CTkToplevel):
         finally:
             self.destroy()
 
+    # =========================================================================================
+    #                                   RESPONSE TIMES
+    # =========================================================================================
+    def _build_response_times_tab(self, root):
+        ctk.CTkLabel(root, text="Response Times", font=ctk.CTkFont(size=22, weight="bold")).pack(pady=(6, 8))
+
+        bar = ctk.CTkFrame(root)
+        bar.pack(pady=4)
+        self.rt_group_var = ctk.StringVar(value="unit")
+        ctk.CTkOptionMenu(bar, values=["unit", "shift", "nature"], variable=self.rt_group_var,
+                          command=lambda _v: self._rt_refresh(), width=110).grid(row=0, column=0, padx=5)
+        self.rt_since_entry = ctk.CTkEntry(bar, placeholder_text="Since YYYY-MM-DD", width=150)
+        self.rt_since_entry.grid(row=0, column=1, padx=5)
+        self.rt_until_entry = ctk.CTkEntry(bar, placeholder_text="Until YYYY-MM-DD", width=150)
+        self.rt_until_entry.grid(row=0, column=2, padx=5)
+        ctk.CTkButton(bar, text="Refresh", width=90, command=self._rt_refresh).grid(row=0, column=3, padx=5)
+
+        self.rt_box = ctk.CTkTextbox(root, font=ctk.CTkFont(family="Consolas", size=12), wrap="none")
+        self.rt_box.pack(fill="both", expand=True, padx=8, pady=6)
+        self._set_readonly(self.rt_box, True)
+
+    def _rt_refresh(self):
+        from run_analytics import get_response_times, format_report
+        by = self.rt_group_var.get()
+        try:
+            report = get_response_times().report(
+                by, self.rt_since_entry.get().strip() or None, self.rt_until_entry.get().strip() or None)
+            text = format_report(report, by) if report else "No dispatched units in this range."
+        except Exception as e:
+            text = f"Could not build report: {e}"
+        self._set_readonly(self.rt_box, False)
+        self.rt_box.delete("1.0", "end")
+        self.rt_box.insert("1.0", text)
+        self._set_readonly(self.rt_box, True)
+
     # =========================================================================================
     #                                   USER MANAGEMENT
     # =========================================================================================
@@ -444,15 +483,7 @@ class AdminControlWindow(ctk.CTkToplevel):
 
     def _rm_code_sort_key(self, code: str):
         """B# first (by #), then other numeric codes, then lexicographic."""
-        import re
-        c = (code or "").strip().upper()
-        if c.startswith("B"):
-            m = re.match(r"^B(\d+)", c)
-            n = int(m.group(1)) if m else 10_000_000
-            return (0, n, c)
-        m = re.match(r"^(\d+)", c)
-        n = int(m.group(1)) if m else 10_000_000
-        return (1, n, c)
+        return responders_repo.code_sort_key(code)
 
     def _rm_sort_shift_list_detailed(self, rows):
         """Sort rows of (code, name, status, phone, email) using _rm_code_sort_key."""
@@ -554,8 +585,8 @@ class AdminControlWindow(ctk.CTkToplevel):
         self.rm_selected_key = text  # "code - name"
 
         code = text.split(" - ", 1)[0].strip()
-        rows = self._rm_read_rows(self.rm_active_shift)
-        row = next((r for r in rows if r[0] == code), None)
+        hit = responders_repo.get_responder(code, self.rm_active_shift)
+        row = list(hit) if hit else None
 
         self._set_readonly(self.rm_details_box, False)
         self.rm_details_box.delete("1.0", "end")
@@ -648,15 +679,12 @@ class AdminControlWindow(ctk.CTkToplevel):
                 messagebox.showerror("Add Responder", "Unit Code and Name are required.")
                 return
 
-            det = responders_repo.load_responders_detailed_by_shift()
-            if any(c == code for (c, _, _, _, _) in det.get(tgt_shift, [])):
-                messagebox.showerror("Add Responder", f"Unit Code '{code}' already exists in Shift {tgt_shift}.")
+            try:
+                responders_repo.add_responder(tgt_shift, (code, name, status, phone, email))
+            except ValueError as e:
+                messagebox.showerror("Add Responder", str(e))
                 return
 
-            det.setdefault(tgt_shift, []).append((code, name, status, phone, email))
-            det[tgt_shift] = self._rm_sort_shift_list_detailed(det[tgt_shift])
-            responders_repo.save_responders_detailed_by_shift(det)
-
             popup.destroy()
             self.rm_active_shift = tgt_shift
             self._rm_refresh_for_shift(self.rm_active_shift)
@@ -711,28 +739,14 @@ class AdminControlWindow(ctk.CTkToplevel):
                 messagebox.showerror("Edit Responder", "Unit Code and Name are required.")
                 return
 
-            det = responders_repo.load_responders_detailed_by_shift()
+            try:
+                responders_repo.update_responder(
+                    cur_shift, orig_code, (new_code, name, status, phone, email), new_shift=new_shift
+                )
+            except ValueError as e:
+                messagebox.showerror("Edit Responder", str(e))
+                return
 
-            if new_shift != cur_shift:
-                if any(c == new_code for (c, _, _, _, _) in det.get(new_shift, [])):
-                    messagebox.showerror("Edit Responder", f"Unit Code '{new_code}' already exists in Shift {new_shift}.")
-                    return
-                det[cur_shift] = [(c, n, s, p, e) for (c, n, s, p, e) in det.get(cur_shift, []) if c != orig_code]
-                det.setdefault(new_shift, []).append((new_code, name, status, phone, email))
-                det[new_shift] = self._rm_sort_shift_list_detailed(det[new_shift])
-            else:
-                lst = []
-                for (c, n, s, p, e) in det.get(cur_shift, []):
-                    if c == orig_code:
-                        lst.append((new_code, name, status, phone, email))
-                    else:
-                        lst.append((c, n, s, p, e))
-                if new_code != orig_code and any(c == new_code for (c, _, _, _, _) in lst if c != orig_code):
-                    messagebox.showerror("Edit Responder", f"Unit Code '{new_code}' already exists in Shift {cur_shift}.")
-                    return
-                det[cur_shift] = self._rm_sort_shift_list_detailed(lst)
-
-            responders_repo.save_responders_detailed_by_shift(det)
             popup.destroy()
             self.rm_active_shift = new_shift
             self._rm_refresh_for_shift(self.rm_active_shift)
@@ -756,9 +770,11 @@ class AdminControlWindow(ctk.CTkToplevel):
 
         # Remove from file and refresh
         cur_shift = self._rm_norm_key(self.rm_active_shift) or "A"
-        det = responders_repo.load_responders_detailed_by_shift()
-        det[cur_shift] = [(c, n, s, p, e) for (c, n, s, p, e) in det.get(cur_shift, []) if c != code]
-        responders_repo.save_responders_detailed_by_shift(det)
+        try:
+            responders_repo.delete_responder(cur_shift, code)
+        except ValueError as e:
+            messagebox.showerror("Delete Responder", str(e))
+            return
 
         self.rm_selected_key = None
         self._rm_refresh_for_shift(self.rm_active_shift)
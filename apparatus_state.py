@@ -0,0 +1,133 @@
+# apparatus_state.py
+import json
+import os
+import time
+
+from filelock import FileLock
+
+APPARATUS_STATE_FILE = "apparatus_state.json"
+PERSISTED_FIELDS = ("opstatus", "lastusedby", "staging", "timestamp")
+STAMPS_KEY = "_ts"     # per-unit {field: epoch seconds of the last write}
+
+
+def read_state_file(path: str) -> dict:
+    """{UNIT: {field: value, "_ts": {field: t}}}. Older files without "_ts" read as t=0."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    out = {}
+    if not isinstance(raw, dict):
+        return out
+    for unit, state in raw.items():
+        if not isinstance(state, dict):
+            continue
+        stamps = state.get(STAMPS_KEY) or {}
+        entry = {STAMPS_KEY: {}}
+        for field in PERSISTED_FIELDS:
+            if field in state:
+                entry[field] = state[field]
+                try:
+                    entry[STAMPS_KEY][field] = float(stamps.get(field, 0.0))
+                except (TypeError, ValueError):
+                    entry[STAMPS_KEY][field] = 0.0
+        out[unit.upper()] = entry
+    return out
+
+
+def write_state_file(data: dict, path: str) -> None:
+    """Temp file + fsync + rename, so readers never see a half-written file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ApparatusStateStore:
+    """
+    Shared apparatus meta (op status, last used by, staging) for every console.
+
+    Each field carries the time it was last set; set() only marks it dirty.
+    flush() takes the file lock, re-reads the file, merges field by field
+    (newest stamp wins) and writes the result back atomically, so two
+    consoles editing different units - or different fields of one unit -
+    never clobber each other. Callers debounce flush() so a burst of edits
+    becomes one write.
+
+    refresh() is a cheap os.stat(); when another console wrote, it merges
+    the file in and returns only the fields that changed here.
+    """
+
+    def __init__(self, path: str = APPARATUS_STATE_FILE):
+        self.path = path
+        self._values = {}     # UNIT -> {field: value}
+        self._stamps = {}     # UNIT -> {field: t}
+        self._dirty = set()   # (UNIT, field)
+        self._stamp = None
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def get(self, unit: str) -> dict:
+        return dict(self._values.get(unit.upper(), {}))
+
+    def set(self, unit: str, field: str, value, when: float = None) -> None:
+        unit = unit.upper()
+        self._values.setdefault(unit, {})[field] = value
+        self._stamps.setdefault(unit, {})[field] = time.time() if when is None else when
+        self._dirty.add((unit, field))
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def _merge(self, disk: dict) -> dict:
+        """Take every field the file has newer than ours (pending local edits win ties)."""
+        changed = {}
+        for unit, state in disk.items():
+            stamps = state.get(STAMPS_KEY, {})
+            mine_v = self._values.setdefault(unit, {})
+            mine_t = self._stamps.setdefault(unit, {})
+            for field in PERSISTED_FIELDS:
+                if field not in state:
+                    continue
+                t = stamps.get(field, 0.0)
+                if field in mine_t and (t < mine_t[field] or (t == mine_t[field] and (unit, field) in self._dirty)):
+                    continue
+                if mine_v.get(field) != state[field]:
+                    changed.setdefault(unit, {})[field] = state[field]
+                mine_v[field] = state[field]
+                mine_t[field] = t
+                self._dirty.discard((unit, field))
+        return changed
+
+    def refresh(self, force: bool = False) -> dict:
+        """Merge in other consoles' writes. Returns {UNIT: {field: value}} that changed."""
+        stamp = self._file_stamp()
+        if not force and stamp == self._stamp:
+            return {}
+        self._stamp = stamp
+        return self._merge(read_state_file(self.path))
+
+    def flush(self) -> dict:
+        """Write pending edits. Returns whatever the merge pulled in from other consoles."""
+        if not self._dirty:
+            return {}
+        with FileLock(self.path + ".lock", timeout=5):
+            changed = self._merge(read_state_file(self.path))
+            data = {}
+            for unit in sorted(self._values):
+                entry = {f: self._values[unit][f] for f in PERSISTED_FIELDS if f in self._values[unit]}
+                entry[STAMPS_KEY] = {f: self._stamps[unit][f] for f in entry}
+                data[unit] = entry
+            write_state_file(data, self.path)
+            self._dirty.clear()
+            self._stamp = self._file_stamp()
+        return changed
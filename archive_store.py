@@ -0,0 +1,338 @@
+# archive_store.py
+import argparse
+import io
+import json
+import os
+import struct
+import sys
+import zlib
+
+try:
+    import zstandard
+except ImportError:     # optional: archives are written with zlib without it
+    zstandard = None
+
+from filelock import FileLock
+
+import run_cache
+import run_segments
+from run_store import ARCHIVE_SUFFIX, RUN_LOG_LOCK, SUMMARY_DIR, iter_runs_from
+
+# Compressed archives for closed run log segments (run_log/YYYY-MM.txt) and
+# past months of shift summaries (shift_summaries/YYYY-MM-DD_*.txt).
+#
+# A .pack file is independently compressed blocks of about BLOCK_SIZE raw
+# bytes, cut only at run (or summary file) boundaries, followed by a JSON
+# index:
+#
+#   PACK_MAGIC | block 0 | block 1 | ... | index JSON | u64 index length | PACK_MAGIC
+#
+# Each index entry has the block's offset/length in the pack, its raw_start /
+# raw_length in the original text, and what it holds: for run segments the
+# run_segments.RunRanges fields (run count, Timestamp and run-number range),
+# for summaries the member file names. Reading one run or one summary
+# decompresses one block. The uncompressed bytes are identical to the
+# original file, so byte offsets into the run log (RunTable refs, resume
+# offsets) stay valid after compaction.
+
+PACK_MAGIC = b"PPMPACK1"
+PACK_VERSION = 1
+BLOCK_SIZE = 64 * 1024
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 19
+
+_indexes = {}       # abs path -> ((mtime_ns, size), index)
+
+
+def default_codec() -> str:
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("archive is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+# =========================
+# Pack files
+# =========================
+def write_pack(path: str, blocks, codec: str = None) -> dict:
+    """
+    Write (raw bytes, index info) blocks to path (via a temp file + rename).
+    Returns the index.
+    """
+    codec = codec or default_codec()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    entries = []
+    raw_total = 0
+    try:
+        with open(tmp, "wb") as f:
+            f.write(PACK_MAGIC)
+            for data, info in blocks:
+                comp = _compress(data, codec)
+                entries.append(dict(info, offset=f.tell(), length=len(comp),
+                                    raw_start=raw_total, raw_length=len(data)))
+                f.write(comp)
+                raw_total += len(data)
+            index = {"version": PACK_VERSION, "codec": codec, "raw_bytes": raw_total, "blocks": entries}
+            head = json.dumps(index, separators=(",", ":")).encode("utf-8")
+            f.write(head + struct.pack("<Q", len(head)) + PACK_MAGIC)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return index
+
+
+def read_index(path: str) -> dict:
+    """The pack's index (cached until the file changes). ValueError if it isn't a pack."""
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    hit = _indexes.get(key)
+    if hit is not None and hit[0] == (st.st_mtime_ns, st.st_size):
+        return hit[1]
+    with open(path, "rb") as f:
+        if st.st_size < 2 * len(PACK_MAGIC) + 8 or f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+            raise ValueError(f"{path} is not a pack file")
+        f.seek(-(8 + len(PACK_MAGIC)), os.SEEK_END)
+        tail = f.read()
+        if tail[8:] != PACK_MAGIC:
+            raise ValueError(f"{path} is truncated")
+        length = struct.unpack("<Q", tail[:8])[0]
+        f.seek(-(length + len(tail)), os.SEEK_END)
+        index = json.loads(f.read(length).decode("utf-8"))
+    if index.get("version") != PACK_VERSION:
+        raise ValueError(f"{path}: unsupported pack version {index.get('version')}")
+    _indexes[key] = ((st.st_mtime_ns, st.st_size), index)
+    return index
+
+
+def iter_pack(path: str, blocks=None):
+    """(index entry, raw bytes) for `blocks` (index entries; default all), one open() for the lot."""
+    index = read_index(path)
+    codec = index["codec"]
+    with open(path, "rb") as f:
+        for entry in (index["blocks"] if blocks is None else blocks):
+            f.seek(entry["offset"])
+            yield entry, _decompress(f.read(entry["length"]), codec)
+
+
+def read_raw(path: str, start: int, end: int) -> bytes:
+    """Raw (uncompressed) bytes [start, end) of the original file."""
+    wanted = [b for b in read_index(path)["blocks"]
+              if b["raw_start"] < end and b["raw_start"] + b["raw_length"] > start]
+    return b"".join(data[max(0, start - b["raw_start"]):end - b["raw_start"]]
+                    for b, data in iter_pack(path, wanted))
+
+
+# =========================
+# Run log segments
+# =========================
+def select_blocks(path: str, since: str = None, until: str = None, run_number=None,
+                  offset: int = 0, reverse: bool = False) -> list:
+    """Index entries that can hold a matching run (see run_segments.may_contain) at or after raw offset."""
+    wanted = run_segments.wanted_run_numbers(run_number)
+    out = [b for b in read_index(path)["blocks"]
+           if b["raw_start"] + b["raw_length"] > offset and run_segments.may_contain(b, since, until, wanted)]
+    return out[::-1] if reverse else out
+
+
+def iter_lines(path: str, since: str = None, until: str = None, run_number=None):
+    """Text lines of the candidate blocks, as iterating open(original, "r") would give them."""
+    for _, data in iter_pack(path, select_blocks(path, since, until, run_number)):
+        yield from io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+
+
+def iter_lines_reverse(path: str, since: str = None, until: str = None, run_number=None):
+    """Lines of the candidate blocks, last to first (as run_store._iter_lines_reverse)."""
+    for _, data in iter_pack(path, select_blocks(path, since, until, run_number, reverse=True)):
+        for part in reversed(data.split(b"\n")):
+            yield part.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def iter_raw_lines(path: str, offset: int = 0):
+    """Byte lines of the original file from raw `offset` on, decompressing block by block."""
+    for entry, data in iter_pack(path, select_blocks(path, offset=offset)):
+        pos = entry["raw_start"]
+        for line in io.BytesIO(data):
+            end = pos + len(line)
+            if end > offset:
+                yield line if pos >= offset else line[offset - pos:]
+            pos = end
+
+
+def compact_segment(path: str, codec: str = None) -> str:
+    """
+    Pack one closed run segment next to itself (YYYY-MM.pack) and delete the
+    .txt once the pack reads back byte-for-byte. Returns the pack path.
+    """
+    pack = path[:-len(".txt")] + ARCHIVE_SUFFIX
+    with FileLock(RUN_LOG_LOCK, timeout=30):
+        with open(path, "rb") as f:
+            data = f.read()
+        blocks = []
+        cut, ranges = 0, run_segments.RunRanges()
+        for lines, start, _ in iter_runs_from(0, path, raw=True):
+            if start - cut >= BLOCK_SIZE:
+                blocks.append((data[cut:start], ranges.as_dict()))
+                cut, ranges = start, run_segments.RunRanges()
+            ranges.add(lines)
+        blocks.append((data[cut:], ranges.as_dict()))
+        write_pack(pack, blocks, codec)
+        if b"".join(raw for _, raw in iter_pack(pack)) != data:
+            os.remove(pack)
+            raise RuntimeError(f"{pack} did not read back identical to {path}")
+        os.remove(path)
+        run_cache.discard(path)
+    return pack
+
+
+def compact_runs(seg_dir: str = run_segments.SEGMENT_DIR, codec: str = None) -> list:
+    """Pack every closed .txt segment. Returns [(month, raw bytes, packed bytes)]."""
+    done = []
+    for month, entry in run_segments.load_manifest(seg_dir).items():
+        if not entry["closed"] or not entry["file"].endswith(".txt"):
+            continue
+        try:
+            pack = compact_segment(os.path.join(seg_dir, entry["file"]), codec)
+        except Exception as e:
+            print(f"[archive_store] could not compact {month}: {e}")
+            continue
+        done.append((month, entry["bytes"], os.path.getsize(pack)))
+    if done:
+        run_segments.load_manifest(seg_dir)     # rescans the new packs and saves the manifest
+    return done
+
+
+# =========================
+# Shift summaries
+# =========================
+def _summary_month(name: str):
+    return run_segments.month_of(name[:10]) if name.endswith(".txt") else None
+
+
+def compact_summaries(summary_dir: str = SUMMARY_DIR, codec: str = None) -> list:
+    """
+    Pack summaries from past months into summary_dir/YYYY-MM.pack (merging
+    with an existing pack for that month) and delete the packed .txt files.
+    Returns [(month, files packed)].
+    """
+    if not os.path.isdir(summary_dir):
+        return []
+    active = run_segments.current_month()
+    by_month = {}
+    for name in sorted(os.listdir(summary_dir)):
+        month = _summary_month(name)
+        if month and month < active:
+            by_month.setdefault(month, []).append(name)
+    done = []
+    for month, names in by_month.items():
+        pack = os.path.join(summary_dir, month + ARCHIVE_SUFFIX)
+        members = dict(iter_members(pack)) if os.path.exists(pack) else {}
+        for name in names:
+            with open(os.path.join(summary_dir, name), "rb") as f:
+                members[name] = f.read()
+        write_pack(pack, _summary_blocks(sorted(members.items())), codec)
+        if dict(iter_members(pack)) != members:
+            raise RuntimeError(f"{pack} did not read back identical")
+        for name in names:
+            os.remove(os.path.join(summary_dir, name))
+        done.append((month, len(names)))
+    return done
+
+
+def _summary_blocks(members):
+    """((raw bytes, {"files": [[name, start, length], ...]})) grouping whole files into ~BLOCK_SIZE blocks."""
+    buf, files = [], []
+    size = 0
+    for name, data in members:
+        if size and size + len(data) > BLOCK_SIZE:
+            yield b"".join(buf), {"files": files}
+            buf, files, size = [], [], 0
+        files.append([name, size, len(data)])
+        buf.append(data)
+        size += len(data)
+    if files:
+        yield b"".join(buf), {"files": files}
+
+
+def iter_members(pack: str, names=None):
+    """(name, bytes) of the files in a summary pack (only the blocks holding `names`, if given)."""
+    blocks = read_index(pack)["blocks"]
+    if names is not None:
+        blocks = [b for b in blocks if any(f[0] in names for f in b["files"])]
+    for entry, data in iter_pack(pack, blocks):
+        for name, start, length in entry["files"]:
+            if names is None or name in names:
+                yield name, data[start:start + length]
+
+
+def _summary_packs(summary_dir: str) -> list:
+    try:
+        return sorted(os.path.join(summary_dir, n) for n in os.listdir(summary_dir) if n.endswith(ARCHIVE_SUFFIX))
+    except OSError:
+        return []
+
+
+def summary_names(summary_dir: str = SUMMARY_DIR) -> list:
+    """File names of the summaries held in packs (loose .txt files are listed by the caller)."""
+    names = []
+    for pack in _summary_packs(summary_dir):
+        try:
+            names += [f[0] for b in read_index(pack)["blocks"] for f in b["files"]]
+        except (OSError, ValueError) as e:
+            print(f"[archive_store] skipping {pack}: {e}")
+    return names
+
+
+def read_summary(name: str, summary_dir: str = SUMMARY_DIR) -> str:
+    """Text of one packed summary (decompresses only its block). KeyError if no pack holds it."""
+    month = _summary_month(name)
+    pack = os.path.join(summary_dir, f"{month}{ARCHIVE_SUFFIX}") if month else None
+    if pack and os.path.exists(pack):
+        for _, data in iter_members(pack, {name}):
+            return data.decode("utf-8")
+    raise KeyError(name)
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Compact closed run log segments and old shift summaries")
+    ap.add_argument("--runs", default=run_segments.SEGMENT_DIR, help="segment directory (default: %(default)s)")
+    ap.add_argument("--summaries", default=SUMMARY_DIR, help="summary directory (default: %(default)s)")
+    ap.add_argument("--codec", choices=(CODEC_ZLIB, CODEC_ZSTD), default=None,
+                    help="default: zstd if the zstandard package is installed, else zlib")
+    args = ap.parse_args(argv)
+    if args.codec == CODEC_ZSTD and zstandard is None:
+        ap.error("zstd needs the zstandard package")
+
+    if run_segments.is_segmented(args.runs):
+        for month, raw, packed in compact_runs(args.runs, args.codec):
+            print(f"runs {month}: {raw} -> {packed} bytes ({raw / max(packed, 1):.1f}x)")
+    else:
+        print(f"[archive_store] {args.runs} is not segmented; run `python run_segments.py split` first")
+    for month, n in compact_summaries(args.summaries, args.codec):
+        print(f"summaries {month}: {n} files packed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+# benchmarks/bench_contention.py
+"""
+Multi-console contention harness for the shared files.
+
+Launches N worker processes in one scratch directory. Each worker replays
+seeded dispatcher activity through the real write paths:
+
+    run submit   run_reports.save_run_to_text
+    addendum     run_reports.append_addendum
+    shift line   CallForm.shift_append_line
+    typing       CallForm.update_typing_state -> write_typing_state
+    apparatus    CallForm.save_apparatus_state (+ its debounced flush)
+
+CallForm methods run against a small console object with a synchronous
+stand-in for the Tk scheduler, so deferred flushes happen between events
+just as they would in the app's idle time.
+
+It reports throughput, p50/p99 latency per operation, the time spent
+waiting for FileLocks, and lost updates (records a worker wrote that are
+missing from the final files, plus apparatus_fields: two consoles editing
+different fields of one unit without seeing each other's write).
+
+    python benchmarks/bench_contention.py --workers 4 --ops 300
+    python benchmarks/bench_contention.py --workers 8 --json > before.json
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Activity mix (weights); addendums are rare but rewrite the whole run log
+MIX = (("shift_line", 40), ("typing", 30), ("apparatus", 17), ("run_submit", 10), ("addendum", 3))
+APPARATUS_FIELDS = ("opstatus", "staging", "lastusedby")
+
+
+class _Scheduler:
+    """Synchronous stand-in for TickScheduler: deferred jobs and timers run from drain()."""
+
+    def __init__(self):
+        self._jobs = {}     # name -> (due, func)
+        self._seq = 0
+
+    def defer(self, name, func):
+        self._jobs[name] = (0.0, func)
+
+    def call_later(self, delay_ms, func, name=None):
+        if name is None:
+            self._seq += 1
+            name = f"_once{self._seq}"
+        self._jobs[name] = (time.monotonic() + delay_ms / 1000.0, func)
+        return name
+
+    def pending(self, name):
+        return name in self._jobs
+
+    def poke(self, name):
+        pass
+
+    def drain(self, force=False):
+        now = time.monotonic()
+        for name, (due, func) in list(self._jobs.items()):
+            if force or due <= now:
+                self._jobs.pop(name, None)
+                func()
+
+
+def _timed_lock_class(base, stats):
+    class TimedFileLock(base):
+        def __enter__(self):
+            t0 = time.perf_counter()
+            out = super().__enter__()
+            waited = time.perf_counter() - t0
+            stats["lock_wait_s"] += waited
+            stats["max_lock_wait_s"] = max(stats["max_lock_wait_s"], waited)
+            stats["lock_acquires"] += 1
+            return out
+    return TimedFileLock
+
+
+def _make_console(cf, worker_id):
+    from unit_recommender import UnitRecommender
+    from apparatus_state import ApparatusStateStore
+
+    class Console:
+        shift_append_line = cf.CallForm.shift_append_line
+        _queue_log_flush = cf.CallForm._queue_log_flush
+        _flush_log = cf.CallForm._flush_log
+        read_typing_state = cf.CallForm.read_typing_state
+        write_typing_state = cf.CallForm.write_typing_state
+        update_typing_state = cf.CallForm.update_typing_state
+        save_apparatus_state = cf.CallForm.save_apparatus_state
+        flush_apparatus_state = cf.CallForm.flush_apparatus_state
+        apply_apparatus_changes = cf.CallForm.apply_apparatus_changes
+
+        def _queue_recommendation_refresh(self):
+            pass
+
+    c = Console()
+    c.username = f"bench{worker_id:02d}"
+    c.active_shift = "A"
+    c.scheduler = _Scheduler()
+    c._last_typing_emit = 0
+    c.run_tabs = {}
+    c.recommender = UnitRecommender()
+    c.apparatus_store = ApparatusStateStore()
+    c.global_apparatus = {
+        unit: {"runstatus": "AVAILABLE", "opstatus": "Ready", "lastusedby": "Last Used By",
+               "staging": cf.staging_locations[0], "timestamp": cf.now_stamp()}
+        for unit, _ in cf.apparatus_units
+    }
+    return c
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(pct / 100.0 * (len(values) - 1)))))
+    return values[k]
+
+
+def _worker(workdir, worker_id, workers, ops, seed, start_evt, out_q):
+    os.chdir(workdir)
+    import filelock
+    lock_stats = {"lock_wait_s": 0.0, "max_lock_wait_s": 0.0, "lock_acquires": 0}
+    timed = _timed_lock_class(filelock.FileLock, lock_stats)
+
+    import apparatus_state
+    import log_writer
+    import run_reports
+    import run_store
+    import call_form as cf
+    for mod in (apparatus_state, log_writer, run_store, cf):
+        mod.FileLock = timed
+
+    rng = random.Random(seed * 1000 + worker_id)
+    console = _make_console(cf, worker_id)
+    kinds = [k for k, _ in MIX]
+    weights = [w for _, w in MIX]
+
+    # Each worker owns a disjoint slice of (unit, field) pairs, so any value
+    # missing at the end is a lost update, not a legitimate overwrite.
+    pairs = [(u, f) for u, _ in cf.apparatus_units for f in APPARATUS_FIELDS]
+    owned = pairs[worker_id::workers] or [pairs[worker_id % len(pairs)]]
+
+    written = {"runs": [], "addendums": [], "shift_lines": [], "apparatus": {}}
+    latencies = {k: [] for k in kinds}
+
+    start_evt.wait()
+    t_start = time.perf_counter()
+    for i in range(ops):
+        kind = "typing" if i == 0 else rng.choices(kinds, weights)[0]
+        if kind == "addendum" and not written["runs"]:
+            kind = "run_submit"
+        t0 = time.perf_counter()
+        if kind == "shift_line":
+            line = f"{console.username}: bench line {i}"
+            console.shift_append_line(line)
+            written["shift_lines"].append(line)
+        elif kind == "typing":
+            console._last_typing_emit = 0
+            console.update_typing_state(rng.random() < 0.5)
+        elif kind == "apparatus":
+            unit, field = rng.choice(owned)
+            value = f"{console.username}#{i}"
+            console.global_apparatus[unit][field] = value
+            console.save_apparatus_state(unit, field)
+            written["apparatus"][f"{unit}|{field}"] = value
+        elif kind == "run_submit":
+            run_number = f"BENCH-{worker_id:02d}-{i:06d}"
+            units = rng.sample([u for u, _ in cf.apparatus_units], 2)
+            run_reports.save_run_to_text(
+                {"run_number": run_number, "caller": "Bench Caller", "location": f"Lot {rng.randint(1, 40)}",
+                 "nature": "Medical", "assigned": ", ".join(units),
+                 "notes": "\n".join(f"[12:00:{s:02d}] {u} ENROUTE" for s, u in enumerate(units))},
+                {u: {"status": "AVAILABLE", "timestamp": cf.now_stamp()} for u in units},
+            )
+            written["runs"].append(run_number)
+        elif kind == "addendum":
+            run_number = rng.choice(written["runs"])
+            text = f"{console.username} addendum {i}"
+            try:
+                run_reports.append_addendum(run_number, console.username, text)
+                written["addendums"].append([run_number, text])
+            except RuntimeError:
+                written["addendums"].append([run_number, text])   # our own run vanished: counted as lost
+        console.scheduler.drain()
+        latencies[kind].append(time.perf_counter() - t0)
+
+    console.scheduler.drain(force=True)
+    console._last_typing_emit = 0
+    console.update_typing_state(False)       # final presence marker checked by the parent
+    log_writer.close_all()
+    elapsed = time.perf_counter() - t_start
+
+    out_q.put({
+        "worker": worker_id,
+        "user": console.username,
+        "elapsed_s": elapsed,
+        "latencies": latencies,
+        "written": written,
+        "lock": lock_stats,
+        "queues": log_writer.metrics(),
+    })
+
+
+def _lost_updates(workdir, results) -> dict:
+    sys.path.insert(0, ROOT)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import run_reports
+        import call_form as cf
+        from apparatus_state import read_state_file, APPARATUS_STATE_FILE
+
+        runs = {r.get("run_number"): r for r in run_reports.parse_runs_from_log()}
+        shift_text = ""
+        for name in os.listdir(cf.SHIFT_LOG_DIR):
+            if name.endswith("_current.txt"):
+                shift_text += open(os.path.join(cf.SHIFT_LOG_DIR, name), encoding="utf-8").read()
+        shift_lines = set(shift_text.splitlines())
+        try:
+            typing = json.load(open(cf.typing_state_path(), encoding="utf-8"))
+        except (OSError, ValueError):
+            typing = {}
+        typing_users = set(typing.get("shifts", {}).get("SHIFT_A", {}))
+        app_state = read_state_file(APPARATUS_STATE_FILE)
+    finally:
+        os.chdir(cwd)
+
+    lost = {"runs": 0, "addendums": 0, "shift_lines": 0, "typing": 0, "apparatus": 0}
+    for r in results:
+        w = r["written"]
+        lost["runs"] += sum(1 for rn in w["runs"] if rn not in runs)
+        for rn, text in w["addendums"]:
+            if not any(text in a for a in runs.get(rn, {}).get("addendums", [])):
+                lost["addendums"] += 1
+        lost["shift_lines"] += sum(1 for ln in w["shift_lines"] if ln not in shift_lines)
+        lost["typing"] += 0 if r["user"] in typing_users else 1
+        for key, value in w["apparatus"].items():
+            unit, field = key.split("|")
+            if app_state.get(unit, {}).get(field) != value:
+                lost["apparatus"] += 1
+    return lost
+
+
+def _field_merge_lost(workdir) -> int:
+    """
+    Two consoles edit different fields of one unit, each flushing without
+    polling the other's write first. Returns how many of the edits are
+    missing from the file (0 when the per-field merge holds).
+    """
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import call_form as cf
+        from apparatus_state import read_state_file, APPARATUS_STATE_FILE
+
+        unit = cf.apparatus_units[0][0]
+        a, b = _make_console(cf, 0), _make_console(cf, 1)
+        edits = [(a, "opstatus", "Needs Maintenance"), (b, "staging", cf.staging_locations[-1]),
+                 (a, "lastusedby", "bench00 responder")]
+        for console, field, value in edits:
+            console.global_apparatus[unit][field] = value
+            console.save_apparatus_state(unit, field)
+            console.scheduler.drain(force=True)
+        saved = read_state_file(APPARATUS_STATE_FILE).get(unit, {})
+    finally:
+        os.chdir(cwd)
+    return sum(1 for _, field, value in edits if saved.get(field) != value)
+
+
+def run(workers: int, ops: int, seed: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="bench_contention_")
+    try:
+        ctx = mp.get_context("spawn")
+        start_evt = ctx.Event()
+        out_q = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(workdir, w, workers, ops, seed, start_evt, out_q))
+                 for w in range(workers)]
+        for p in procs:
+            p.start()
+        time.sleep(0.5)
+        t0 = time.perf_counter()
+        start_evt.set()
+        results = [out_q.get() for _ in procs]
+        for p in procs:
+            p.join()
+        wall = time.perf_counter() - t0
+
+        by_kind = {}
+        for r in results:
+            for kind, vals in r["latencies"].items():
+                by_kind.setdefault(kind, []).extend(vals)
+        total_ops = sum(len(v) for v in by_kind.values())
+        lost = _lost_updates(workdir, results)
+        os.makedirs(os.path.join(workdir, "fields"))
+        lost["apparatus_fields"] = _field_merge_lost(os.path.join(workdir, "fields"))
+        return {
+            "workers": workers,
+            "ops_per_worker": ops,
+            "seed": seed,
+            "wall_s": round(wall, 3),
+            "ops_per_s": round(total_ops / wall, 1) if wall else 0.0,
+            "latency_ms": {
+                kind: {"n": len(vals),
+                       "p50": round(_percentile(vals, 50) * 1000, 3),
+                       "p99": round(_percentile(vals, 99) * 1000, 3)}
+                for kind, vals in sorted(by_kind.items()) if vals
+            },
+            "lock_wait_ms": round(sum(r["lock"]["lock_wait_s"] for r in results) * 1000, 2),
+            "max_lock_wait_ms": round(max(r["lock"]["max_lock_wait_s"] for r in results) * 1000, 3),
+            "lock_acquires": sum(r["lock"]["lock_acquires"] for r in results),
+            "lost_updates": lost,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Shared-file contention harness for dispatch consoles")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--ops", type=int, default=300, help="events per worker")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    rows = [run(n, args.ops, args.seed) for n in args.workers]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    for r in rows:
+        print(f"\n== {r['workers']} workers x {r['ops_per_worker']} events: "
+              f"{r['ops_per_s']} ops/s, wall {r['wall_s']} s")
+        print(f"   lock wait {r['lock_wait_ms']} ms total, max {r['max_lock_wait_ms']} ms, "
+              f"{r['lock_acquires']} acquires")
+        for kind, lat in r["latency_ms"].items():
+            print(f"   {kind:<11} n={lat['n']:<6} p50={lat['p50']:>8} ms  p99={lat['p99']:>8} ms")
+        print("   lost updates: " + ", ".join(f"{k}={v}" for k, v in r["lost_updates"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
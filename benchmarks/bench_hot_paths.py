@@ -0,0 +1,236 @@
+# benchmarks/bench_hot_paths.py
+"""
+pytest-benchmark suite for the storage / search hot paths, over generated
+datasets (see generators.py). From this directory:
+
+    python -m pytest                                   # run (sizes from --bench-runs)
+    python -m pytest --benchmark-save=baseline         # store JSON under baselines/
+    python -m pytest --benchmark-compare=0001 --benchmark-compare-fail=median:15%
+
+The window methods are exercised on small stand-in objects that borrow the
+real functions, so no Tk display is needed.
+"""
+import os
+import shutil
+
+import pytest
+
+import auth
+import responders_repo
+import roster_service
+import run_analytics
+import run_reports
+import shift_summary
+
+
+# -------------------------
+# Stand-ins for window state
+# -------------------------
+class _Reports:
+    """Just enough of RunReportsWindow for its search + access-control methods."""
+    _normalize = run_reports.RunReportsWindow._normalize
+    _contains = run_reports.RunReportsWindow._contains
+    _run_matches = run_reports.RunReportsWindow._run_matches
+    _filter_runs_by_query = run_reports.RunReportsWindow._filter_runs_by_query
+    _tokenize_assigned = run_reports.RunReportsWindow.__dict__["_tokenize_assigned"]
+    _user_has_access_to_run = run_reports.RunReportsWindow._user_has_access_to_run
+    _apply_access_filter = run_reports.RunReportsWindow._apply_access_filter
+
+    def __init__(self, username, is_admin=False, is_owner=False):
+        self.username = username
+        self.is_admin = is_admin
+        self.is_owner = is_owner
+
+
+class _Var:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class _Listbox:
+    def __init__(self):
+        self.items = []
+
+    def delete(self, first, last=None):
+        self.items = []
+
+    def insert(self, index, item):
+        self.items.append(item)
+
+
+class _Summaries:
+    filter_files = shift_summary.ShiftSummaryWindow.filter_files
+
+    def __init__(self, files, query):
+        self.all_files = files
+        self.filtered_files = []
+        self.search_var = _Var(query)
+        self.file_listbox = _Listbox()
+
+
+# -------------------------
+# Run log
+# -------------------------
+def bench_parse_runs_from_log(benchmark, in_dataset):
+    # Warm: loaded from run_log.txt.cache (written by the first round)
+    runs = benchmark(run_reports.parse_runs_from_log)
+    assert len(runs) == in_dataset["runs"]
+
+
+def bench_parse_runs_from_log_cold(benchmark, in_dataset):
+    # No cache next to the log: every block is parsed and the cache written
+    import run_cache
+    runs = benchmark.pedantic(run_reports.parse_runs_from_log, rounds=3, iterations=1,
+                              setup=lambda: run_cache.discard("run_log.txt"))
+    assert len(runs) == in_dataset["runs"]
+
+
+def bench_iter_runs_latest_50(benchmark, in_dataset):
+    runs = benchmark(lambda: list(run_reports.iter_runs(reverse=True, limit=50)))
+    assert runs[0]["run_number"] == f"Run {100000 + in_dataset['runs'] - 1}"
+
+
+def bench_iter_runs_one_month(benchmark, in_dataset):
+    benchmark(lambda: list(run_reports.iter_runs(since="2024-06-01", until="2024-06-30")))
+
+
+def bench_iter_runs_one_month_segmented(benchmark, in_dataset, tmp_path):
+    import run_segments
+    shutil.copyfile(os.path.join(in_dataset["root"], "run_log.txt"), tmp_path / "run_log.txt")
+    seg_dir = str(tmp_path / "run_log")
+    run_segments.split_log(str(tmp_path / "run_log.txt"), seg_dir)
+    benchmark(lambda: list(run_reports.iter_runs(seg_dir, since="2024-06-01", until="2024-06-30")))
+
+
+def bench_archived_run_lookup(benchmark, in_dataset, tmp_path):
+    import archive_store
+    import run_segments
+    shutil.copyfile(os.path.join(in_dataset["root"], "run_log.txt"), tmp_path / "run_log.txt")
+    seg_dir = str(tmp_path / "run_log")
+    run_segments.split_log(str(tmp_path / "run_log.txt"), seg_dir)
+    assert archive_store.compact_runs(seg_dir)
+    target = f"Run {100000 + in_dataset['runs'] // 2}"
+    runs = benchmark(lambda: list(run_reports.iter_runs(seg_dir, run_number=target)))
+    assert len(runs) == 1
+
+
+def bench_run_table_count(benchmark, in_dataset):
+    run_table = pytest.importorskip("run_table")
+    if not run_table.available():
+        pytest.skip("NumPy not installed")
+    table = run_table.RunTable()
+    table.refresh()
+    benchmark(table.count, since="2024-06-01", until="2024-12-31", nature="Fall", unit="E1", open=False)
+
+
+def bench_response_times_build(benchmark, in_dataset):
+    def build():
+        rt = run_analytics.ResponseTimes()
+        rt.refresh()
+        return rt.report("unit")
+    assert benchmark.pedantic(build, rounds=3, iterations=1)
+
+
+def bench_append_addendum(benchmark, in_dataset, tmp_path, monkeypatch):
+    # append_addendum rewrites run_log.txt, so every round starts from a fresh copy
+    src = os.path.join(in_dataset["root"], "run_log.txt")
+    monkeypatch.chdir(tmp_path)
+    target = f"Run {100000 + in_dataset['runs'] // 2}"
+
+    def setup():
+        shutil.copyfile(src, tmp_path / "run_log.txt")
+
+    benchmark.pedantic(run_reports.append_addendum, args=(target, "bench", "benchmark addendum"),
+                       setup=setup, rounds=5, iterations=1)
+
+
+def bench_filter_runs_by_query(benchmark, in_dataset):
+    runs = run_reports.parse_runs_from_log()
+    win = _Reports("bench", is_admin=True)
+    hits = benchmark(win._filter_runs_by_query, runs, "chest pain")
+    assert hits
+
+
+@pytest.mark.parametrize("jobs", [1, os.cpu_count() or 1], ids=["1proc", "allcores"])
+def bench_run_search_full_history(benchmark, in_dataset, monkeypatch, jobs):
+    import run_search
+    monkeypatch.setattr(run_search, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(run_search, "SHARD_BYTES", 1 << 20)
+    hits = benchmark(lambda: list(run_search.RunSearch(jobs=jobs, query="chest pain")))
+    assert hits
+
+
+def bench_grep_runs_miss(benchmark, in_dataset):
+    # Raw mmap grep, nothing matches: no block is decoded or parsed
+    import run_search
+    assert benchmark(lambda: list(run_search.RunSearch(jobs=1, query="no such text zzz"))) == []
+
+
+def bench_grep_torn_block(benchmark, tmp_path):
+    # Regression: a block cut short by a crash (START with no END, the next
+    # START glued to its last line) must not leak into the following run
+    import run_search
+    import run_store
+    block = ("=== RUN START ===\nRunNumber: {}\nCaller: c\nLocation: l\nNature: n\nAssigned: E1\n"
+             "Timestamp: 2024-01-01 10:00:00\nNotes:\n{}\nStatuses:\nAddendums:\n=== RUN END ===\n")
+    log = tmp_path / "run_log.txt"
+    log.write_text(block.format("Run 1", "alpha") + "=== RUN START ===\nRunNumber: Run 2\nNotes:\npartial zebra"
+                   + block.format("Run 3", "beta") + block.format("Run 4", "see === RUN START === zebra"),
+                   encoding="utf-8")
+    path = str(log)
+    for query in ("zebra", "partial", "beta"):
+        parsed = [r.to_dict() for r in run_store.iter_runs(path) if run_store.run_matches(r, query)]
+        assert [r.to_dict() for r in run_search.RunSearch(path, jobs=1, query=query)] == parsed
+    assert benchmark(lambda: list(run_search.RunSearch(path, jobs=1, query="zebra")))
+
+
+def bench_filter_runs_by_query_miss(benchmark, in_dataset):
+    # Worst case: nothing matches, every field of every run is scanned
+    runs = run_reports.parse_runs_from_log()
+    win = _Reports("bench", is_admin=True)
+    assert benchmark(win._filter_runs_by_query, runs, "no such text zzz") == []
+
+
+def bench_apply_access_filter_responder(benchmark, in_dataset):
+    runs = run_reports.parse_runs_from_log()
+    win = _Reports(in_dataset["usernames"][1])
+    benchmark(win._apply_access_filter, runs)
+
+
+def bench_apply_access_filter_admin(benchmark, in_dataset):
+    runs = run_reports.parse_runs_from_log()
+    win = _Reports(in_dataset["usernames"][0], is_admin=True)
+    assert len(benchmark(win._apply_access_filter, runs)) == len(runs)
+
+
+# -------------------------
+# Accounts / roster / shift summaries
+# -------------------------
+def bench_validate_login(benchmark, in_dataset):
+    last = in_dataset["usernames"][-1]
+    password = f"pw{len(in_dataset['usernames']) - 1:04d}"
+    assert benchmark(auth.validate_login, last, password)
+
+
+def bench_load_responders_cold(benchmark, in_dataset):
+    def setup():
+        roster_service._roster = None     # force a full parse + index build
+    benchmark.pedantic(responders_repo.load_responders_detailed_by_shift, setup=setup,
+                       rounds=50, iterations=1)
+
+
+def bench_load_responders_cached(benchmark, in_dataset):
+    roster_service._roster = None
+    responders_repo.load_responders_detailed_by_shift()
+    data = benchmark(responders_repo.load_responders_detailed_by_shift)
+    assert data["A"]
+
+
+def bench_shift_summary_filter(benchmark, in_dataset):
+    files = sorted(f for f in os.listdir(shift_summary.SUMMARY_DIR) if f.endswith(".txt"))
+    win = _Summaries(files, "shift_a")
+    benchmark(win.filter_files)
+    assert win.filtered_files
@@ -0,0 +1,111 @@
+# benchmarks/bench_log_append.py
+"""
+Contention benchmark for shared log appends: N writer processes each append
+M records to one file, through log_writer in FileLock mode (one lock round
+trip per record, as before group commit) and in lock-free O_APPEND mode.
+
+After each run the file is checked: every record must be present exactly
+once and intact (no interleaving).
+
+    python benchmarks/bench_log_append.py --writers 1 2 4 8 --records 500
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import log_writer  # noqa: E402
+
+
+def _writer(path, mode, writer_id, records, size, start_evt, out_q):
+    q = log_writer.AppendQueue(path, mode=mode, durability=log_writer.DURABILITY_ON_CLOSE)
+    pad = "x" * max(0, size - 24)
+    start_evt.wait()
+    t0 = time.perf_counter()
+    for i in range(records):
+        q.append(f"W{writer_id:03d} {i:08d} {pad}|\n")
+    q.close()
+    out_q.put((writer_id, time.perf_counter() - t0, q.lock_wait_s, q.max_lock_wait_s))
+
+
+def _verify(path, writers, records) -> int:
+    """Number of bad or missing records (0 means every record landed intact)."""
+    seen = set()
+    bad = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("|\n") or not line.startswith("W"):
+                bad += 1
+                continue
+            head = line.split(" ", 2)
+            key = (head[0], head[1])
+            if key in seen:
+                bad += 1
+            seen.add(key)
+    return bad + (writers * records - len(seen))
+
+
+def run_once(mode: str, writers: int, records: int, size: int) -> dict:
+    fd, path = tempfile.mkstemp(prefix="bench_log_", suffix=".txt")
+    os.close(fd)
+    ctx = mp.get_context("spawn")
+    start_evt = ctx.Event()
+    out_q = ctx.Queue()
+    procs = [ctx.Process(target=_writer, args=(path, mode, w, records, size, start_evt, out_q))
+             for w in range(writers)]
+    for p in procs:
+        p.start()
+    time.sleep(0.2)
+    t0 = time.perf_counter()
+    start_evt.set()
+    results = [out_q.get() for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - t0
+    bad = _verify(path, writers, records)
+    for extra in (path, path + ".lock"):
+        try:
+            os.remove(extra)
+        except OSError:
+            pass
+    total = writers * records
+    return {
+        "mode": mode,
+        "writers": writers,
+        "records": total,
+        "wall_s": round(wall, 4),
+        "records_per_s": round(total / wall, 1) if wall else 0.0,
+        "lock_wait_ms": round(sum(r[2] for r in results) * 1000, 2),
+        "max_lock_wait_ms": round(max(r[3] for r in results) * 1000, 3),
+        "bad_records": bad,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--records", type=int, default=500, help="records per writer")
+    ap.add_argument("--size", type=int, default=120, help="bytes per record")
+    ap.add_argument("--modes", nargs="+", default=[log_writer.MODE_LOCK, log_writer.MODE_O_APPEND],
+                    choices=[log_writer.MODE_LOCK, log_writer.MODE_O_APPEND])
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    rows = [run_once(m, n, args.records, args.size) for n in args.writers for m in args.modes]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'mode':<10}{'writers':>8}{'records':>9}{'wall s':>9}{'rec/s':>11}{'lock ms':>10}{'max ms':>9}{'bad':>5}")
+        for r in rows:
+            print(f"{r['mode']:<10}{r['writers']:>8}{r['records']:>9}{r['wall_s']:>9}"
+                  f"{r['records_per_s']:>11}{r['lock_wait_ms']:>10}{r['max_lock_wait_ms']:>9}{r['bad_records']:>5}")
+    return 1 if any(r["bad_records"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
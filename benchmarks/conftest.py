@@ -0,0 +1,49 @@
+# benchmarks/conftest.py
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generators  # noqa: E402
+
+DEFAULT_RUN_SIZES = "10000,100000"    # add 1000000 with --bench-runs for the full sweep
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench-runs", default=DEFAULT_RUN_SIZES,
+                     help="comma-separated run_log.txt sizes (e.g. 10000,100000,1000000)")
+    parser.addoption("--bench-seed", type=int, default=0, help="generator seed")
+
+
+def pytest_generate_tests(metafunc):
+    if "runs" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("--bench-runs").split(",") if s.strip()]
+        metafunc.parametrize("runs", sizes, ids=[f"{n // 1000}k" for n in sizes], scope="session")
+
+
+@pytest.fixture(scope="session")
+def dataset(request, runs):
+    """A generated dataset directory for `runs`, cached across sessions in the pytest cache."""
+    seed = request.config.getoption("--bench-seed")
+    key = f"bench-data/v{generators.GENERATOR_VERSION}-s{seed}-{runs}"
+    root = str(request.config.cache.mkdir(key.replace("/", "-")))
+    marker = os.path.join(root, ".complete")
+    if not os.path.exists(marker):
+        shutil.rmtree(root, ignore_errors=True)
+        info = generators.build_dataset(root, runs, seed)
+        with open(marker, "w", encoding="utf-8") as f:
+            f.write(",".join(info["usernames"]))
+    with open(marker, "r", encoding="utf-8") as f:
+        usernames = f.read().split(",")
+    return {"root": root, "runs": runs, "usernames": usernames}
+
+
+@pytest.fixture
+def in_dataset(dataset, monkeypatch):
+    """Run inside the dataset directory (the app opens its files by relative path)."""
+    monkeypatch.chdir(dataset["root"])
+    return dataset
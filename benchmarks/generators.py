@@ -0,0 +1,179 @@
+# benchmarks/generators.py
+"""
+Deterministic synthetic data for benchmarks: the same (size, seed) always
+produces byte-identical files, so timings are comparable across commits.
+
+    python benchmarks/generators.py OUTDIR --runs 100000 --seed 0
+
+writes, in the layout the app expects relative to its working directory:
+
+    run_log.txt             N run blocks (save_run_to_text format)
+    users.txt               dispatcher / responder accounts
+    responders.txt          [A]..[D] roster
+    responder_users.json    responder id -> usernames
+    shift_logs/             current shift logs for the last few days
+    shift_summaries/        one archived summary per shift per day
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+GENERATOR_VERSION = 1     # bump when output changes, so cached datasets are rebuilt
+
+SHIFTS = ("A", "B", "C", "D")
+APPARATUS = ("E1", "E2", "M1", "M2", "R1", "T1", "U1", "U2")
+STATUS_FLOW = ("DISPATCHED", "ENROUTE", "ON SCENE", "TRANSPORTING", "AVAILABLE")
+NATURES = ("Medical", "Fall", "Chest Pain", "Fire Alarm", "Smoke Investigation", "MVA",
+           "Lift Assist", "Breathing Problem", "Unconscious", "Public Assist")
+FIRST = ("Alex", "Jordan", "Casey", "Riley", "Taylor", "Morgan", "Jamie", "Drew", "Quinn", "Avery",
+         "Cameron", "Dakota", "Kelsey", "Shane", "Chris", "Brendan", "Patrick", "Scott", "Cody", "Bill")
+LAST = ("Smith", "Hicks", "Ross", "Blick", "Slayton", "Hartigan", "Montague", "Davis", "Harper",
+        "McFalda", "Carpenter", "Mullins", "Nguyen", "Garcia", "Miller", "Wilson", "Moore", "Clark")
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+def responder_codes(per_shift: int = 12) -> dict:
+    """{"A": ["B1", "11", "12", ...], ...} - one B# lead plus numbered members per shift."""
+    out = {}
+    for i, s in enumerate(SHIFTS, start=1):
+        out[s] = [f"B{i}"] + [f"{i}{n}" if n < 10 else f"{i}{n:02d}" for n in range(1, per_shift)]
+    return out
+
+
+def write_responders(path: str, per_shift: int = 12, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    codes = responder_codes(per_shift)
+    with open(path, "w", encoding="utf-8") as f:
+        for s in SHIFTS:
+            f.write(f"[{s}]\n")
+            for code in codes[s]:
+                name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+                f.write(f"{code},{name},Active,555-{rng.randint(1000, 9999)},{code.lower()}@example.org\n")
+            f.write("\n")
+    return codes
+
+
+def write_users(path: str, n_users: int = 200, seed: int = 0) -> list:
+    """users.txt rows: username,password,first,last,bosk_id,is_temp,is_admin. Returns usernames."""
+    rng = random.Random(seed + 1)
+    names = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n_users):
+            first, last = rng.choice(FIRST), rng.choice(LAST)
+            username = f"{first.lower()}{i:04d}"
+            names.append(username)
+            bosk = "OWNER-001" if i == 0 else f"BOSK-{i:05d}"
+            f.write(f"{username},pw{i:04d},{first},{last},{bosk},0,{1 if i % 25 == 0 else 0}\n")
+    return names
+
+
+def write_responder_users(path: str, codes: dict, usernames: list, seed: int = 0) -> dict:
+    rng = random.Random(seed + 2)
+    mapping = {}
+    for s in SHIFTS:
+        for code in codes[s]:
+            if code.isdigit():
+                mapping[code] = rng.sample(usernames, k=min(len(usernames), rng.randint(1, 2)))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(mapping, f, indent=1)
+    return mapping
+
+
+def iter_run_blocks(n_runs: int, codes: dict, seed: int = 0):
+    """Yield run_log.txt blocks (str) in the exact save_run_to_text layout, oldest first."""
+    rng = random.Random(seed + 3)
+    members = [c for s in SHIFTS for c in codes[s] if c.isdigit()]
+    span = 2 * 365 * 24 * 3600
+    step = span / max(1, n_runs)
+    for i in range(n_runs):
+        start = START + timedelta(seconds=int(i * step + rng.random() * step))
+        units = rng.sample(APPARATUS, rng.randint(1, 2)) + rng.sample(members, rng.randint(1, 3))
+        lines = [
+            "=== RUN START ===",
+            f"RunNumber: Run {100000 + i}",
+            f"Caller: {rng.choice(FIRST)} {rng.choice(LAST)}",
+            f"Location: Lot {rng.randint(1, 60)}, Row {rng.choice('ABCDEFGH')}",
+            f"Nature: {rng.choice(NATURES)}",
+            f"Assigned: {', '.join(units)}",
+            f"Timestamp: {start:%Y-%m-%d %H:%M:%S}",
+            "Notes:",
+            "Caller: see above",
+            f"Assigned: {', '.join(units)}",
+        ]
+        t = start
+        events = []
+        for status in STATUS_FLOW[:rng.randint(2, len(STATUS_FLOW))]:
+            t += timedelta(seconds=rng.randint(20, 600))
+            lines.append(f"[{t:%H:%M:%S}] {', '.join(units)} {status}.")
+            events.append((status, t))
+        lines.append("Statuses:")
+        for u in units:
+            for status, t in events:
+                lines.append(f"{u}|{status}|{t:%Y-%m-%d %H:%M:%S}")
+        lines.append("Addendums:")
+        if rng.random() < 0.05:
+            lines.append(f"[{t + timedelta(hours=2):%Y-%m-%d %H:%M:%S}] {rng.choice(FIRST).lower()}: follow-up note")
+        lines += ["=== RUN END ===", ""]
+        yield "\n".join(lines) + "\n"
+
+
+def write_run_log(path: str, n_runs: int, codes: dict, seed: int = 0) -> None:
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        for block in iter_run_blocks(n_runs, codes, seed):
+            f.write(block)
+
+
+def write_shift_logs(root: str, days: int = 365, lines_per_shift: int = 40, seed: int = 0) -> None:
+    """Archived summaries for `days` days (two shifts a day) plus current logs for the last 3 days."""
+    rng = random.Random(seed + 4)
+    summaries = os.path.join(root, "shift_summaries")
+    current = os.path.join(root, "shift_logs")
+    os.makedirs(summaries, exist_ok=True)
+    os.makedirs(current, exist_ok=True)
+    for d in range(days):
+        day = START + timedelta(days=d)
+        for half in range(2):
+            shift = SHIFTS[(d * 2 + half) % len(SHIFTS)]
+            body = [f"[{day:%Y-%m-%d} {6 + 12 * half:02d}:{m:02d}] dispatcher{rng.randint(1, 9)}: "
+                    f"{rng.choice(APPARATUS)} {rng.choice(STATUS_FLOW)}" for m in range(lines_per_shift)]
+            text = (f"PPM Shift Summary\nDate: {day:%Y-%m-%d}\nShift: SHIFT_{shift}\n"
+                    f"Archived by: dispatcher\n" + "=" * 60 + "\n\n" + "\n".join(body) + "\n")
+            name = f"{day:%Y-%m-%d}_SHIFT_{shift}_summary.txt"
+            with open(os.path.join(summaries, name), "w", encoding="utf-8") as f:
+                f.write(text)
+            if d >= days - 3:
+                with open(os.path.join(current, f"{day:%Y-%m-%d}_SHIFT_{shift}_current.txt"), "w",
+                          encoding="utf-8") as f:
+                    f.write("\n".join(body) + "\n")
+
+
+def build_dataset(root: str, n_runs: int = 10_000, seed: int = 0, n_users: int = 200,
+                  per_shift: int = 12, days: int = 365) -> dict:
+    """Write a complete dataset under root. Returns {"root", "usernames", "codes", "runs"}."""
+    os.makedirs(root, exist_ok=True)
+    codes = write_responders(os.path.join(root, "responders.txt"), per_shift, seed)
+    usernames = write_users(os.path.join(root, "users.txt"), n_users, seed)
+    write_responder_users(os.path.join(root, "responder_users.json"), codes, usernames, seed)
+    write_run_log(os.path.join(root, "run_log.txt"), n_runs, codes, seed)
+    write_shift_logs(root, days, seed=seed)
+    return {"root": root, "usernames": usernames, "codes": codes, "runs": n_runs}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Generate a deterministic benchmark dataset")
+    ap.add_argument("outdir")
+    ap.add_argument("--runs", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--days", type=int, default=365)
+    args = ap.parse_args(argv)
+    info = build_dataset(args.outdir, args.runs, args.seed, args.users, days=args.days)
+    size = os.path.getsize(os.path.join(args.outdir, "run_log.txt"))
+    print(f"{info['runs']} runs ({size / 1e6:.1f} MB), {len(info['usernames'])} users -> {args.outdir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
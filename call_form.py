@@ -16,8 +16,18 @@ import random
 import requests
 from bs4 import BeautifulSoup
 
-from run_reports import RunReportsWindow, save_run_to_text
+from run_reports import RunReportsWindow, save_run_to_text, run_log_queue
 from incident_reports import IncidentReportForm
+from shift_calendar import get_calendar
+from roster_service import get_roster
+from unit_autocomplete import UnitAutocomplete, last_token
+from unit_recommender import UnitRecommender, APPARATUS_GROUP
+from sla_monitor import SlaMonitor
+from tick_scheduler import TickScheduler, HIGH, LOW
+from apparatus_state import ApparatusStateStore, PERSISTED_FIELDS
+from run_notes import RunNotes
+from run_journal import RunJournals
+import log_writer
 import database  # noqa: F401
 
 # ==============================
@@ -27,16 +37,18 @@ import io  # keep at top-level
 
 SHIFT_LOG_DIR = "shift_logs"
 os.makedirs(SHIFT_LOG_DIR, exist_ok=True)
+# Shift logs are append-only lines: lock-free O_APPEND writes where the OS makes them atomic
+SHIFT_LOG_APPEND_MODE = log_writer.MODE_O_APPEND if os.name == "posix" else log_writer.MODE_LOCK
 
 def current_shift_name(self=None):
     """
     Returns active shift name string like 'SHIFT_A'.
     If self.active_shift is set by set_default_responder_shift(), use it.
-    Fallback to 'SHIFT_A'.
+    Fallback to the shift the rotation calendar has on duty right now.
     """
     if self is not None and hasattr(self, "active_shift") and self.active_shift:
         return f"SHIFT_{self.active_shift}"
-    return "SHIFT_A"
+    return f"SHIFT_{get_calendar().shift_at()}"
 
 def today_stamp():
     return datetime.now().strftime("%Y-%m-%d")
@@ -70,8 +82,6 @@ def load_random_quote():
         return "Be your best self."
 
 def save_run_to_log(run_data, statuses):
-    log_path = "run_log.txt"
-    lock_path = f"{log_path}.lock"
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     block = [
@@ -96,9 +106,7 @@ def save_run_to_log(run_data, statuses):
         ""
     ]
 
-    with FileLock(lock_path, timeout=5):
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write("\n".join(block) + "\n")
+    run_log_queue().append("\n".join(block) + "\n")
 
 
 # ==============================
@@ -144,7 +152,8 @@ contact_list = [
     ("SBM Daytime", "248-807-1144")
 ]
 ALERT_CONTACTS = {"Shift Supervisor"}
-responder_shifts = {
+# Built-in roster, used only when responders.txt is missing or empty
+DEFAULT_RESPONDER_SHIFTS = {
     "A": [
         ("B1", "Bill Mullins"), ("11", "Clifford Hicks"), ("12", "Chris Allen"),
         ("13", "Rodney Rodgers"), ("14", "Mark Newman"), ("15", "Tiffany Grasch"),
@@ -166,8 +175,21 @@ responder_shifts = {
         ("46", "Chasity Davis"), ("47", "Scott Harper"), ("48", "Cody McFalda")
     ],
 }
-all_responders = [f"{u} {n}" for shift in responder_shifts.values() for u, n in shift]
-APPARATUS_STATE_FILE = "apparatus_state.json"
+APPARATUS_FLUSH_DELAY_MS = 400   # coalesce bursts of apparatus edits into one write
+
+def load_roster_view():
+    """
+    Returns (responder_shifts, all_responders) from the shared roster service:
+      responder_shifts = {"A": [(code, name), ...], ...}
+      all_responders   = ["B1 Bill Mullins", ...]
+    """
+    roster = get_roster()
+    if roster.is_empty():
+        shifts = DEFAULT_RESPONDER_SHIFTS
+    else:
+        shifts = roster.simple_by_shift()
+    return shifts, [f"{u} {n}" for shift in shifts.values() for u, n in shift]
+
 
 def send_email_alert(subject: str, body: str) -> None:
     try:
@@ -195,10 +217,17 @@ class CallForm(ctk.CTk):
         self.geometry("1200x800")
         self.title("Call Entry")
 
+        # All periodic work runs on one scheduler (started at the end of __init__)
+        self.scheduler = TickScheduler(self)
+
+        # Roster (shared, hot-reloaded from responders.txt)
+        self.responder_shifts, self.all_responders = load_roster_view()
+        get_roster().subscribe(self.on_roster_changed)
+
         # Global/static state
         self.persistent_dynamic_responders = {}  # global memory of chosen dynamic names (by slot index)
         self.run_unit_assignments = {}           # run_number -> set(apparatus units)
-        self.global_statuses = {u: "AVAILABLE" for shift in responder_shifts.values() for u, _ in shift}
+        self.global_statuses = {u: "AVAILABLE" for shift in self.responder_shifts.values() for u, _ in shift}
         self.globally_unavailable = set()        # units forced UNAVAILABLE, persists across runs until cleared
         self.last_status_updates = {}            # (run, unit) -> (status, ts) for dedupe
         self.global_apparatus = {
@@ -210,6 +239,12 @@ class CallForm(ctk.CTk):
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             } for unit, _ in apparatus_units
         }
+        self.unit_index = UnitAutocomplete()     # Assigned / Responder(s) completion
+        self._rebuild_unit_index()
+        self.recommender = UnitRecommender()     # "Suggested" units per run tab
+        self._roster_units = set()               # responder codes seeded from the roster
+        self._seed_recommender()
+        self.sla = SlaMonitor(self._on_sla_breach)  # ENROUTE / ON SCENE watchdog
 
         # UI frame
         self.main_tabview = ctk.CTkTabview(self)
@@ -227,12 +262,25 @@ class CallForm(ctk.CTk):
         self.run_tabs = {}
         self.status_memory = {}     # per-run, per-shift, per-slot memory
         self.unit_active_runs = {}  # unit -> set(run_number)
+        self.apparatus_store = ApparatusStateStore()   # shared with other consoles, merged per field
         self.load_apparatus_state()
-
-        # First run tab
-        self.create_run_tab()
+        self.scheduler.add("apparatus_state", self.poll_apparatus_state, 2000, priority=LOW, max_interval_ms=16000)
+
+        # Reopen runs a crashed session left behind, else start with one blank run tab
+        self.journals = RunJournals(self.username)   # per-run write-ahead journals
+        if not self.restore_open_runs():
+            self.create_run_tab()
+        self.scheduler.add("journal_sync", self.journals.sync, 1000, adaptive=False, run_when_hidden=True)
+        self.scheduler.add("log_sync", log_writer.sync_all, 1000, adaptive=False, run_when_hidden=True)
+        self.scheduler.add("sla", self.poll_sla, 1000, priority=HIGH, adaptive=False, run_when_hidden=True)
         self.after(0, lambda: self.state("zoomed"))
 
+        # Back off polling while the window is in the background or minimised.
+        # Focus moving between child widgets fires Out/In pairs, so re-check once they settle.
+        for seq in ("<FocusIn>", "<FocusOut>", "<Map>", "<Unmap>"):
+            self.bind(seq, lambda _e: self.scheduler.call_later(100, self._update_visibility, name="visibility"), add="+")
+        self.scheduler.start()
+
         # Footer (deduplicated)
         self.footer_frame = ctk.CTkFrame(self)
         self.footer_frame.pack(side="bottom", fill="x")
@@ -304,6 +352,7 @@ class CallForm(ctk.CTk):
         ctk.CTkLabel(wt_inner, text="Responder(s)").grid(row=0, column=0, padx=(0, 6), pady=4, sticky="e")
         self.wt_resp_entry = ctk.CTkEntry(wt_inner, width=320, placeholder_text="E1, M1, 21… or names")
         self.wt_resp_entry.grid(row=0, column=1, padx=(0, 14), pady=4, sticky="w")
+        self.attach_unit_autocomplete(self.wt_resp_entry)
 
         ctk.CTkLabel(wt_inner, text="Check").grid(row=0, column=2, padx=(0, 6), pady=4, sticky="e")
         self.wt_desc_entry = ctk.CTkEntry(wt_inner, width=360, placeholder_text="Area / checklist (e.g., Electrode)")
@@ -330,11 +379,12 @@ class CallForm(ctk.CTk):
         self.shift_entry.bind("<KeyPress>", _typing_event)
         self.shift_entry.bind("<KeyRelease>", _typing_event)
 
-        # Polling timers for shared files (store ids so we can cancel on destroy)
+        # Polling of shared files (backs off to the max interval while nothing changes)
         self._shift_last_size = 0
         self._last_typing_emit = 0
-        self._shift_poll_id = self.after(700, self.poll_shift_log)
-        self._typing_poll_id = self.after(700, self.poll_typing_state)
+        self.scheduler.add("shift_log", self.poll_shift_log, 700, max_interval_ms=2800)
+        self.scheduler.add("typing", self.poll_typing_state, 700, max_interval_ms=2800)
+        self.scheduler.add("roster", self.poll_roster, 2000, priority=LOW, max_interval_ms=16000)
 
 
     def shift_mark_attention(self):
@@ -353,7 +403,8 @@ class CallForm(ctk.CTk):
         # Force a quick refresh so styling appears immediately
         self.poll_shift_log()
 
-    def poll_shift_log(self) -> None:
+    def poll_shift_log(self) -> bool:
+        """Reload the shared shift log if it grew. Returns True if it changed."""
         try:
             path = shift_current_log_path(current_shift_name(self))
             size = os.path.getsize(path) if os.path.exists(path) else 0
@@ -380,15 +431,10 @@ class CallForm(ctk.CTk):
                 self.shift_view.config(state="disabled")
                 self.shift_view.see("end")
                 self._shift_last_size = size
+                return True
         except Exception:
             pass
-        finally:
-            if getattr(self, "_destroying", False):
-                return
-            try:
-                self._shift_poll_id = self.after(700, self.poll_shift_log)
-            except Exception:
-                pass
+        return False
 
 
     # ==============================
@@ -409,7 +455,8 @@ class CallForm(ctk.CTk):
 
         # Initial load + auto refresh
         self.update_weather()
-        self.after(1800000, self.auto_update_weather)  # 30 min
+        self.scheduler.add("weather", self.auto_update_weather, 1800000,  # 30 min
+                           priority=LOW, adaptive=False, run_when_hidden=True)
 
     def update_weather(self):
         """Fetch and display weather from perryweather.com (best-effort; safe if bs4/requests missing)."""
@@ -439,16 +486,60 @@ class CallForm(ctk.CTk):
 
     def auto_update_weather(self):
         self.update_weather()
-        self.after(1800000, self.auto_update_weather)
+        return True
 
     # ==============================
     # Run Tab
     # ==============================
+    def journal_field(self, run_number: str, field: str) -> None:
+        """Journal a Caller/Location/Nature value if it changed since the last record."""
+        tab = self.run_tabs.get(run_number)
+        if not tab:
+            return
+        value = tab["fields"][field].get().strip()
+        if tab["journaled_fields"].get(field, "") != value:
+            tab["journaled_fields"][field] = value
+            self.journals.record(run_number, "field", name=field, value=value)
+
+    def restore_open_runs(self) -> int:
+        """Rebuild run tabs from journals left by a session that did not close them. Returns the count."""
+        restored = 0
+        apparatus_codes = {u for u, _ in apparatus_units}
+        for run_number, state in self.journals.pending_runs():
+            if run_number in self.run_tabs:
+                continue
+            try:
+                self.create_run_tab(run_number)
+                tab = self.run_tabs[run_number]
+                for field, value in state["fields"].items():
+                    ent = tab["fields"].get(field)
+                    if ent is not None and field != "assigned":
+                        ent.insert(0, value)
+                        tab["journaled_fields"][field] = value
+                tab["notes_model"].restore(state["notes"])
+
+                units = [u.upper() for u in state["assigned"]]
+                responders = [u for u in units if u not in apparatus_codes]
+                apparatus_list = [u for u in units if u in apparatus_codes]
+                tab["assigned_units"] = responders
+                self.run_unit_assignments[run_number] = set(apparatus_list)
+                if not hasattr(self, "apparatus_responder_links"):
+                    self.apparatus_responder_links = {}
+                self.apparatus_responder_links[run_number] = {app: responders.copy() for app in apparatus_list}
+                for unit in responders:
+                    self.unit_active_runs.setdefault(unit, set()).add(run_number)
+
+                self.append_note(run_number, "Run restored from journal after restart")
+                restored += 1
+            except Exception as e:
+                print(f"[call_form] could not restore {run_number}: {e}")
+        return restored
+
     def on_call_received(self, run_number: str) -> None:
         self.append_note(run_number, "Call Received")
 
-    def create_run_tab(self) -> None:
-        run_number = f"Run {str(datetime.now().timestamp())[-6:].replace('.', '')}"
+    def create_run_tab(self, run_number: str = None) -> None:
+        run_number = run_number or f"Run {str(datetime.now().timestamp())[-6:].replace('.', '')}"
         run_frame = self.main_tabview.add(run_number)
         self.main_tabview.set(run_number)
 
@@ -456,11 +547,14 @@ class CallForm(ctk.CTk):
         self.run_tabs[run_number] = {
             "fields": {},
             "notes": None,
+            "notes_model": None,             # RunNotes mirrored by the notes widget
             "responder_widgets": {},         # unit -> (var, menu)
             "responder_widget_shift": {},    # unit -> shift_key
+            "responder_labels": {},          # unit -> name label
             "dropdowns": {},                 # idx -> dict(name/status vars/menus/shift)
             "apparatus": {},                 # unit -> vars/menus
             "assigned_units": [],            # responders
+            "journaled_fields": {},          # field -> last value written to the run journal
         }
 
         # Root layout
@@ -515,6 +609,15 @@ class CallForm(ctk.CTk):
                 command=lambda s=st, rn=run_number: self.update_assigned_units_status(rn, s)
             ).pack(side="left", padx=4)
 
+        # Suggested units (kept current by the recommender)
+        reco_var = tk.StringVar(value="Suggested: —")
+        self.run_tabs[run_number]["recommend_var"] = reco_var
+        ctk.CTkLabel(ts_container, textvariable=reco_var).pack(side="left", padx=(12, 4))
+        ctk.CTkButton(
+            ts_container, text="Use", width=50,
+            command=lambda rn=run_number: self.use_recommendations(rn)
+        ).pack(side="left", padx=4)
+
         # Input fields
         input_frame = ctk.CTkFrame(outer)
         input_frame.grid(row=2, column=0, columnspan=8, sticky="n", pady=(5, 0))
@@ -529,6 +632,10 @@ class CallForm(ctk.CTk):
             ent.grid(row=0, column=2 * i + 1, padx=5, pady=2, sticky="w")
             self.run_tabs[run_number]["fields"][field] = ent
             entries.append(ent)
+            if field == "assigned":
+                self.attach_unit_autocomplete(ent)
+            else:
+                ent.bind("<FocusOut>", lambda _e, f=field, rn=run_number: self.journal_field(rn, f), add="+")
 
         # Enter-to-append / assign
         for idx, field in enumerate(fields):
@@ -545,6 +652,7 @@ class CallForm(ctk.CTk):
                     return "break"
 
                 if f != "assigned":
+                    self.journal_field(rn, f)
                     # NO timestamp for caller/location/nature in NOTES
                     self.append_note(rn, f"{f.capitalize()}: {value}", skip_timestamp=True)
                     # Move focus to next entry safely
@@ -579,6 +687,7 @@ class CallForm(ctk.CTk):
 
                 # One clean Assigned line in notes
                 all_assigned = apparatus_units_list + responder_units
+                self.journals.record(rn, "assign", units=all_assigned)
                 if all_assigned:
                     units_str = ", ".join(all_assigned)
                     self.append_note(rn, f"Assigned: {units_str}", skip_timestamp=True)
@@ -598,11 +707,7 @@ class CallForm(ctk.CTk):
                 self.after(0, notes_widget.focus_set)
 
                 # Optionally start a new timestamp prompt on Notes line
-                now_str = datetime.now().strftime("%H:%M:%S")
-                current = notes_widget.get("1.0", "end-1c")
-                if current and not current.endswith("\n"):
-                    notes_widget.insert("end", "\n")
-                notes_widget.insert("end", f"[{now_str}] ")
+                self.run_tabs[rn]["notes_model"].prompt()
 
                 return "break"
 
@@ -628,13 +733,18 @@ class CallForm(ctk.CTk):
         notes.pack(side="left", fill="both", expand=True)
         scroll.config(command=notes.yview)
         self.run_tabs[run_number]["notes"] = notes
+        notes_model = RunNotes(
+            notes, listener=lambda kind, text, rn=run_number: self.journals.record(rn, kind, text=text)
+        )
+        self.run_tabs[run_number]["notes_model"] = notes_model
 
-        def notes_return(event, rn=run_number):
+        def notes_return(event):
             # Keep timestamps in RUN notes (only Shift Log is un-timestamped)
-            now_str = datetime.now().strftime("%H:%M:%S")
-            self.run_tabs[rn]["notes"].insert("end", f"\n[{now_str}] ")
+            notes_model.new_line()
             return "break"
         notes.bind("<Return>", notes_return)
+        notes.bind("<KeyRelease>", lambda _e: notes_model.check_widget(), add="+")
+        notes.bind("<ButtonRelease>", lambda _e: notes_model.check_widget(), add="+")
 
         # Contacts (right; scrollable)
         contact_frame = ctk.CTkScrollableFrame(outer, width=240)
@@ -668,9 +778,8 @@ class CallForm(ctk.CTk):
         tabview.pack(fill="both", expand=True)
         self.run_tabs[run_number]["tabview"] = tabview
 
-        self.responder_shifts = responder_shifts
         dynamic_counter = 0
-        for shift_key, roster in responder_shifts.items():
+        for shift_key, roster in self.responder_shifts.items():
             tab_name = f"Shift {shift_key}"
             tab_frame = tabview.add(tab_name)
 
@@ -685,7 +794,9 @@ class CallForm(ctk.CTk):
                 # Static responders
                 if row_idx < len(roster):
                     unit, name = roster[row_idx]
-                    ctk.CTkLabel(frame, text=f"{unit} {name}").grid(row=row_idx, column=0, sticky="w", padx=3)
+                    name_label = ctk.CTkLabel(frame, text=f"{unit} {name}")
+                    name_label.grid(row=row_idx, column=0, sticky="w", padx=3)
+                    self.run_tabs[run_number]["responder_labels"][unit] = name_label
                     status_var = tk.StringVar()
                     status_menu = ctk.CTkOptionMenu(
                         frame,
@@ -704,7 +815,7 @@ class CallForm(ctk.CTk):
                     name_menu = ctk.CTkOptionMenu(
                         frame,
                         variable=name_var,
-                        values=["Responder"] + all_responders,
+                        values=["Responder"] + self.all_responders,
                         command=lambda fullname, idx=dynamic_counter: self.dynamic_responder_selected(run_number, fullname, idx),
                     )
                     name_menu.grid(row=row_idx, column=2, padx=3)
@@ -738,6 +849,7 @@ class CallForm(ctk.CTk):
         # Ensure correct shift selected and defaults set
         self.set_default_responder_shift(tabview, run_number)
         self.apply_global_statuses_to_tab(run_number)
+        self._queue_recommendation_refresh()
 
         # Apparatus (with header labels)
         header_row = 10
@@ -789,10 +901,11 @@ class CallForm(ctk.CTk):
             staging_menu.grid(row=row, column=3, padx=3)
 
             lastused_menu = ctk.CTkOptionMenu(
-                grid, variable=app_data["lastusedby"], values=all_responders,
+                grid, variable=app_data["lastusedby"], values=self.all_responders,
                 command=lambda responder, u=unit: self.update_lastused_timestamp(run_number, u, responder)
             )
             lastused_menu.grid(row=row, column=4, padx=3)
+            app_data["lastused_menu"] = lastused_menu
 
             # Timestamp display (read-only)
             ts_entry = ctk.CTkEntry(grid, width=160)
@@ -830,6 +943,9 @@ class CallForm(ctk.CTk):
         if unit not in self.global_apparatus:
             return
         self.global_apparatus[unit]["runstatus"] = status
+        self.unit_index.set_status(unit, status)
+        self.recommender.update(unit, status=status)
+        self._queue_recommendation_refresh()
         # Reflect in every open tab’s apparatus widgets
         for rn, run in self.run_tabs.items():
             app = run.get("apparatus", {}).get(unit)
@@ -843,47 +959,12 @@ class CallForm(ctk.CTk):
 
     def set_default_responder_shift(self, tabview, run_number):
         """Pick the active shift from the day/time & set up per-shift memory for this run."""
-        now = datetime.now()
-        week = now.isocalendar()[1]
-        is_odd = (week % 2) == 1
-        day_idx = now.weekday()  # 0=Mon
-        day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-
-        schedule = {
-            "odd": {
-                "Mon": {"day": "C", "night": "D"},
-                "Tue": {"day": "C", "night": "D"},
-                "Wed": {"day": "A", "night": "B"},
-                "Thu": {"day": "A", "night": "B"},
-                "Fri": {"day": "C", "night": "D"},
-                "Sat": {"day": "C", "night": "D"},
-                "Sun": {"day": "C", "night": "D"},
-            },
-            "even": {
-                "Mon": {"day": "A", "night": "B"},
-                "Tue": {"day": "A", "night": "B"},
-                "Wed": {"day": "C", "night": "D"},
-                "Thu": {"day": "C", "night": "D"},
-                "Fri": {"day": "A", "night": "B"},
-                "Sat": {"day": "A", "night": "B"},
-                "Sun": {"day": "A", "night": "B"},
-            },
-        }
-        sched = schedule["odd" if is_odd else "even"]
-
-        hour = now.hour
-        if hour < 6:
-            ref_day = day_names[(day_idx - 1) % 7]
-            current_shift = sched[ref_day]["night"]
-        elif 6 <= hour < 18:
-            ref_day = day_names[day_idx]
-            current_shift = sched[ref_day]["day"]
-        else:
-            ref_day = day_names[day_idx]
-            current_shift = sched[ref_day]["night"]
+        current_shift = get_calendar().shift_at()
+        run = self.run_tabs.setdefault(run_number, {})
+        # Per-shift memory only needs (re)seeding when the on-duty shift changes
+        needs_seed = run.get("current_shift") != current_shift
 
-        self.run_tabs.setdefault(run_number, {})
-        self.run_tabs[run_number]["current_shift"] = current_shift
+        run["current_shift"] = current_shift
         self.active_shift = current_shift
 
         try:
@@ -893,10 +974,11 @@ class CallForm(ctk.CTk):
             pass
 
         # Initialize per-run/per-shift memory
-        for shift_key, members in getattr(self, "responder_shifts", {}).items():
-            for unit, _ in members:
-                k = f"{unit}_{run_number}_{shift_key}"
-                self.status_memory[k] = "AVAILABLE" if shift_key == current_shift else "--"
+        if needs_seed:
+            for shift_key, members in getattr(self, "responder_shifts", {}).items():
+                for unit, _ in members:
+                    k = f"{unit}_{run_number}_{shift_key}"
+                    self.status_memory[k] = "AVAILABLE" if shift_key == current_shift else "--"
 
         # Apply to visible widgets
         self.refresh_status_badges(run_number)
@@ -946,18 +1028,27 @@ class CallForm(ctk.CTk):
         self.wt_desc_entry.delete(0, "end")
 
     def shift_append_line(self, line: str) -> None:
-        path = shift_current_log_path(current_shift_name(self))
-        lock = FileLock(path + ".lock")
-        with lock:
-            with open(path, "a", encoding="utf-8") as f:
-                f.write(line.rstrip("\n") + "\n")
+        """Queue a shift log line; lines queued in one burst are written under one lock."""
+        q = log_writer.get_queue(shift_current_log_path(current_shift_name(self)), mode=SHIFT_LOG_APPEND_MODE)
+        if q.on_pending is None:
+            q.on_pending = self._queue_log_flush
+        q.append(line.rstrip("\n") + "\n")
+
+    def _queue_log_flush(self, q) -> None:
+        self.scheduler.defer(f"log:{q.path}", lambda: self._flush_log(q))
+
+    def _flush_log(self, q) -> None:
+        try:
+            q.flush()
+        except Exception as e:
+            print(f"[call_form] could not write {q.path}: {e}")
+            self.scheduler.call_later(1000, lambda: self._flush_log(q), name=f"log_retry:{q.path}")
+            return
+        self.scheduler.poke("shift_log")
 
     def shift_read_all(self) -> str:
-        path = shift_current_log_path(current_shift_name(self))
-        if not os.path.exists(path):
-            return ""
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+        # Skips a line another console is still writing (or died writing)
+        return log_writer.read_complete(shift_current_log_path(current_shift_name(self)))
 
     def toggle_needs_attention(self):
         # Simple toggle that logs a centered red line on the Shift Log
@@ -985,7 +1076,7 @@ class CallForm(ctk.CTk):
                     app["timestamp_entry"].configure(state="disabled")
                 except Exception:
                     pass
-        self.save_apparatus_state()
+        self.save_apparatus_state(unit_upper, "lastusedby", "timestamp")
         self.append_note(run_number, f"{unit_upper} last used by set to {responder}")
 
     def shift_send_note(self) -> None:
@@ -1030,20 +1121,30 @@ class CallForm(ctk.CTk):
     def destroy(self):
     # prevent background callbacks from firing after the app closes
         self._destroying = True
-        for attr in ("_shift_poll_id", "_typing_poll_id"):
-            try:
-                pid = getattr(self, attr, None)
-                if pid:
-                    self.after_cancel(pid)
-            except Exception:
-                pass
+        get_roster().unsubscribe(self.on_roster_changed)
+        try:
+            self.scheduler.stop()
+        except Exception:
+            pass
+        try:
+            if self.apparatus_store.dirty:
+                self.apparatus_store.flush()
+        except Exception:
+            pass
+        try:
+            self.journals.close_all()   # keep the files: open runs come back next start
+        except Exception:
+            pass
+        log_writer.close_all()
         try:
             super().destroy()
         except Exception:
             pass
 
 
-    def poll_typing_state(self) -> None:
+    def poll_typing_state(self) -> bool:
+        """Refresh the "… is typing" label. Returns True if the label changed."""
+        before = self.typing_label_var.get()
         try:
             state = self.read_typing_state()
             s = current_shift_name(self)
@@ -1058,19 +1159,222 @@ class CallForm(ctk.CTk):
                 self.typing_label_var.set("No one is typing…")
         except Exception:
             pass
-        finally:
-            if getattr(self, "_destroying", False):
-                return
+        return self.typing_label_var.get() != before
+
+
+    def _update_visibility(self) -> None:
+        try:
+            if self.state() == "iconic" or not self.winfo_viewable():
+                state = "hidden"
+            elif self.focus_displayof() is None:
+                state = "background"
+            else:
+                state = "focused"
+        except Exception:
+            return
+        self.scheduler.set_visibility(state)
+
+    def poll_roster(self) -> bool:
+        """Cheap stat() of responders.txt; on change the roster calls on_roster_changed()."""
+        try:
+            return get_roster().check_for_changes()
+        except Exception:
+            return False
+
+    def on_roster_changed(self, roster=None) -> None:
+        """
+        Roster edited (Admin Controls or another console). New run tabs get the
+        new shift lists; open tabs get refreshed names and dropdown choices.
+        """
+        if getattr(self, "_destroying", False):
+            return
+        self.responder_shifts, self.all_responders = load_roster_view()
+        names = {u: n for shift in self.responder_shifts.values() for u, n in shift}
+        for unit in names:
+            self.global_statuses.setdefault(unit, "AVAILABLE")
+        self.scheduler.defer("unit_index", self._rebuild_unit_index)
+        self._seed_recommender()
+        self._queue_recommendation_refresh()
+
+        for rn, run in self.run_tabs.items():
+            for unit, label in run.get("responder_labels", {}).items():
+                if unit in names:
+                    try:
+                        label.configure(text=f"{unit} {names[unit]}")
+                    except Exception:
+                        pass
+            for slot in run.get("dropdowns", {}).values():
+                try:
+                    slot["name_widget"].configure(values=["Responder"] + self.all_responders)
+                except Exception:
+                    pass
+            for app in run.get("apparatus", {}).values():
+                try:
+                    app["lastused_menu"].configure(values=self.all_responders)
+                except Exception:
+                    pass
+
+    # ==============================
+    # Response-time watchdog
+    # ==============================
+    def poll_sla(self) -> bool:
+        """One 1 s tick drives every outstanding ENROUTE / ON SCENE deadline."""
+        try:
+            return bool(self.sla.poll())
+        except Exception:
+            return False
+
+    def _on_sla_breach(self, run_number: str, unit: str, milestone: str, minutes) -> None:
+        if run_number not in self.run_tabs:
+            return
+        msg = f"{unit} not {milestone} after {minutes:g} min"
+        try:
+            self.shift_append_line(f"{self.username}: ***NEEDS ATTENTION*** — {run_number}: {msg}")
+        except Exception:
+            pass
+        try:
+            self.append_note(run_number, f"⚠️ {msg}")
+        except Exception:
+            pass
+
+    # ==============================
+    # Dispatch recommendations
+    # ==============================
+    def _seed_recommender(self) -> None:
+        # track() moves a unit to its new shift; one dropped from the roster must be forgotten
+        units = set()
+        for shift_key, members in self.responder_shifts.items():
+            for unit, _ in members:
+                self.recommender.track(unit, shift_key, self.global_statuses.get(unit, "AVAILABLE"))
+                units.add(unit.strip().upper())
+        for unit in self._roster_units - units:
+            self.recommender.forget(unit)
+        self._roster_units = units
+        for unit, app in self.global_apparatus.items():
+            self.recommender.track(unit, APPARATUS_GROUP, app.get("runstatus", "AVAILABLE"),
+                                   app.get("opstatus", "Ready"))
+
+    def recommendations_for_run(self, run_number: str, n_responders: int = 3, n_apparatus: int = 2) -> list:
+        """Ranked unit codes to dispatch next on this run (on-duty responders, then apparatus)."""
+        run = self.run_tabs.get(run_number, {})
+        shift_key = run.get("current_shift") or getattr(self, "active_shift", None) or get_calendar().shift_at()
+        already = set(u.upper() for u in run.get("assigned_units", []))
+        already |= self.run_unit_assignments.get(run_number, set())
+        return (self.recommender.top(shift_key, n_responders, exclude=already)
+                + self.recommender.top(APPARATUS_GROUP, n_apparatus, exclude=already))
+
+    def _queue_recommendation_refresh(self) -> None:
+        """Coalesce bursts of status events into one refresh per idle cycle."""
+        if getattr(self, "_destroying", False):
+            return
+        self.scheduler.defer("recommendations", self._refresh_recommendations)
+
+    def _refresh_recommendations(self) -> None:
+        for rn, run in self.run_tabs.items():
+            var = run.get("recommend_var")
+            if var is None:
+                continue
+            codes = self.recommendations_for_run(rn)
+            var.set("Suggested: " + (", ".join(codes) if codes else "—"))
+
+    def use_recommendations(self, run_number: str) -> None:
+        """Append the current suggestions to this run's Assigned field (Enter still commits)."""
+        codes = self.recommendations_for_run(run_number)
+        ent = self.run_tabs.get(run_number, {}).get("fields", {}).get("assigned")
+        if not codes or ent is None:
+            return
+        cur = ent.get().strip().rstrip(",")
+        ent.delete(0, "end")
+        ent.insert(0, (cur + ", " if cur else "") + ", ".join(codes))
+        ent.focus_set()
+
+    # ==============================
+    # Unit autocomplete (Assigned / Responder(s))
+    # ==============================
+    def _rebuild_unit_index(self) -> None:
+        statuses = dict(self.global_statuses)
+        for unit, app in self.global_apparatus.items():
+            statuses[unit] = app.get("runstatus", "AVAILABLE")
+        self.unit_index.rebuild(self.responder_shifts, apparatus_units, statuses)
+
+    def attach_unit_autocomplete(self, entry) -> None:
+        """
+        Suggest unit codes / responder names for the last comma-separated item
+        of `entry`. Tab (or a click) accepts; Escape or leaving the field hides.
+        """
+        state = {"win": None, "box": None, "items": []}
+        ignore = {"Tab", "Return", "KP_Enter", "Escape", "Up", "Down", "Left", "Right",
+                  "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+        def hide(*_):
+            if state["win"] is not None:
+                try:
+                    state["win"].destroy()
+                except Exception:
+                    pass
+            state["win"] = state["box"] = None
+
+        def accept(idx=0):
+            items = state["items"]
+            if not items or state["win"] is None:
+                return False
+            head, _ = last_token(entry.get())
+            entry.delete(0, "end")
+            entry.insert(0, head + items[idx][0])
+            hide()
             try:
-                self._typing_poll_id = self.after(700, self.poll_typing_state)
+                entry.focus_set()
+                entry.icursor("end")
             except Exception:
                 pass
+            return True
+
+        def show(items):
+            if state["win"] is None:
+                win = tk.Toplevel(self)
+                win.overrideredirect(True)
+                try:
+                    win.attributes("-topmost", True)
+                except Exception:
+                    pass
+                box = tk.Listbox(win, height=8, width=34, bg="black", fg="white",
+                                 selectbackground="#1f6aa5", activestyle="none")
+                box.pack(fill="both", expand=True)
+                box.bind("<ButtonRelease-1>",
+                         lambda _e: accept(box.curselection()[0]) if box.curselection() else None)
+                state["win"], state["box"] = win, box
+            box = state["box"]
+            box.delete(0, "end")
+            for code, label, st in items:
+                box.insert("end", f"{label}  [{st}]")
+                box.itemconfig("end", fg=status_colors.get(st, "white") if st != "UNAVAILABLE" else "gray")
+            box.configure(height=len(items))
+            x = entry.winfo_rootx()
+            y = entry.winfo_rooty() + entry.winfo_height()
+            state["win"].geometry(f"+{x}+{y}")
+
+        def on_key(evt):
+            if evt.keysym in ignore:
+                return
+            _, tok = last_token(entry.get())
+            state["items"] = self.unit_index.suggest(tok)
+            if state["items"]:
+                show(state["items"])
+            else:
+                hide()
 
+        entry.bind("<KeyRelease>", on_key, add="+")
+        entry.bind("<Tab>", lambda _e: "break" if accept() else None, add="+")
+        entry.bind("<Escape>", hide, add="+")
+        entry.bind("<FocusOut>", lambda _e: self.scheduler.call_later(200, hide, name="autocomplete_hide"), add="+")
 
     def set_global_responder_status(self, unit: str, status: str) -> None:
         """Set a responder's status globally and reflect in ALL open run tabs (static + dynamic)."""
         unit = unit.upper()
         self.global_statuses[unit] = status
+        self.unit_index.set_status(unit, status)
+        self.recommender.update(unit, status=status, active_runs=len(self.unit_active_runs.get(unit, ())))
+        self._queue_recommendation_refresh()
 
         # Maintain the global UNAVAILABLE latch so new tabs also reflect it
         if status == "UNAVAILABLE":
@@ -1117,11 +1421,10 @@ class CallForm(ctk.CTk):
             messagebox.showinfo("End Shift", "No current shift log to archive.")
             return
 
-        # Closing line (no timestamp)
+        # Closing line (no timestamp); written out before the log is read back
         self.shift_append_line(f"{self.username}: Shift ended; archiving.")
-
-        with open(src, "r", encoding="utf-8") as f:
-            content = f.read()
+        log_writer.get_queue(src, mode=SHIFT_LOG_APPEND_MODE).flush()
+        content = log_writer.read_complete(src)
 
         header = (
             f"PPM Shift Summary\n"
@@ -1153,32 +1456,12 @@ class CallForm(ctk.CTk):
     # ==============================
     def append_note(self, run_number: str, text: str, skip_timestamp: bool = False) -> None:
         """Append to RUN notes; optional timestamp suppression (used for caller/location/nature)."""
-        notes_widget = self.run_tabs[run_number]["notes"]
-        current_text = notes_widget.get("1.0", "end-1c")
-
-        # If last line is just a timestamp prompt, remove it to keep lines tidy
-        if current_text:
-            last_line = current_text.split("\n")[-1]
-            if (last_line.startswith("[") and "]" in last_line
-                    and last_line.count("]") == 1
-                    and last_line.split("]")[1].strip() == ""):
-                chars_to_delete = len(last_line) + 1
-                notes_widget.delete(f"end-{chars_to_delete}c", "end-1c")
-
-        if not skip_timestamp:
-            ts = datetime.now().strftime("%H:%M:%S")
-            new_current = notes_widget.get("1.0", "end-1c")
-            if new_current and not new_current.endswith("\n"):
-                notes_widget.insert("end", "\n")
-            notes_widget.insert("end", f"[{ts}] {text}\n")
-        else:
-            # No timestamp
-            new_current = notes_widget.get("1.0", "end-1c")
-            if new_current and not new_current.endswith("\n"):
-                notes_widget.insert("end", "\n")
-            notes_widget.insert("end", text + "\n")
+        self.run_tabs[run_number]["notes_model"].append(text, stamp=not skip_timestamp)
+        self.run_tabs[run_number]["notes"].see("end")
 
-        notes_widget.see("end")
+    def notes_text(self, run_number: str) -> str:
+        """Run notes serialised from the notes model (not re-read from the widget)."""
+        return self.run_tabs[run_number]["notes_model"].text().strip()
 
     def bind_status_color(self, var: tk.StringVar, widget: ctk.CTkOptionMenu) -> None:
         def update_color(*_):
@@ -1195,6 +1478,7 @@ class CallForm(ctk.CTk):
             shift_key = rw.get("responder_widget_shift", {}).get(unit) or rw.get("current_shift")
         if not shift_key:
             return
+        self.sla.status_event(run_number, unit, new_status)
 
         # UNAVAILABLE → latch globally + shift log
         if new_status == "UNAVAILABLE":
@@ -1384,6 +1668,9 @@ class CallForm(ctk.CTk):
 
         prev = app_data["runstatus"].get()
         app_data["runstatus"].set(status)
+        self.recommender.update(unit_upper, status=status)
+        self.sla.status_event(run_number, unit_upper, status)
+        self._queue_recommendation_refresh()
         try:
             app_data["runstatus_menu"].configure(fg_color=status_colors.get(status, "gray"))
         except Exception:
@@ -1480,6 +1767,8 @@ class CallForm(ctk.CTk):
         unit_upper = unit.upper()
         # Update global persistent OP status immediately
         self.global_apparatus[unit_upper]["opstatus"] = opstatus
+        self.recommender.update(unit_upper, readiness=opstatus)
+        self._queue_recommendation_refresh()
         # Reflect in ALL runs' UI
         for rn, data in self.run_tabs.items():
             app_data = data.get("apparatus", {}).get(unit_upper)
@@ -1489,7 +1778,7 @@ class CallForm(ctk.CTk):
                     app_data["op_menu"].configure(fg_color=tag_colors.get(opstatus, "gray"))
                 except Exception:
                     pass
-        self.save_apparatus_state()
+        self.save_apparatus_state(unit_upper, "opstatus")
         self.append_note(run_number, f"{unit_upper} operational status set to {opstatus}")
 
     def log_apparatus_staging(self, run_number: str, unit: str, staging: str) -> None:
@@ -1500,7 +1789,7 @@ class CallForm(ctk.CTk):
             app = data.get("apparatus", {}).get(unit_upper)
             if app:
                 app["staging"].set(staging)
-        self.save_apparatus_state()
+        self.save_apparatus_state(unit_upper, "staging")
         self.append_note(run_number, f"{unit_upper} staging set to {staging}")
 
     def update_assigned_units_status(self, run_number: str, status: str) -> None:
@@ -1554,11 +1843,13 @@ class CallForm(ctk.CTk):
         # Responders -> GLOBAL
         for unit in sorted(responders_now):
             self.set_global_responder_status(unit, status)
+            self.sla.status_event(run_number, unit, status)
             grouped.append(unit)
 
         # Apparatus -> GLOBAL, but ONLY the ones currently in the field
         for unit in sorted(apparatus_now):
             self.set_global_apparatus_status(unit, status)
+            self.sla.status_event(run_number, unit, status)
             grouped.append(unit)
 
         # Grouped log line
@@ -1599,7 +1890,7 @@ class CallForm(ctk.CTk):
         # --- optional: persist the run (best-effort, won't crash if helper differs/missing)
         try:
             fields = self.run_tabs[run_number]["fields"]
-            notes_text = self.run_tabs[run_number]["notes"].get("1.0", "end").strip()
+            notes_text = self.notes_text(run_number)
             run_data = {
                 "run_number": run_number,
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -1736,7 +2027,7 @@ class CallForm(ctk.CTk):
         text.pack(fill="both", expand=True, pady=(0, 10))
 
         fields = self.run_tabs[run_number]["fields"]
-        notes = self.run_tabs[run_number]["notes"].get("1.0", "end").strip()
+        notes = self.notes_text(run_number)
 
         text.insert("end", f"📋 Run Summary for {run_number}\n\n")
         text.insert("end", f"📞 Caller: {fields['caller'].get()}\n")
@@ -1769,7 +2060,7 @@ class CallForm(ctk.CTk):
                     writer.writerow([key, entry.get()])
                 writer.writerow([])
                 writer.writerow(["Notes"])
-                writer.writerow([self.run_tabs[run_number]["notes"].get("1.0", "end").strip()])
+                writer.writerow([self.notes_text(run_number)])
             messagebox.showinfo("Export", f"Run exported to {filename}.", parent=self)
         except Exception as exc:
             messagebox.showerror("Export Failed", f"Could not export CSV:\n{exc}", parent=self)
@@ -1803,7 +2094,7 @@ class CallForm(ctk.CTk):
             # briefly set topmost so it jumps in front, then release
             try:
                 win.attributes("-topmost", True)
-                self.after(300, lambda: (win.attributes("-topmost", False)))
+                self.scheduler.call_later(300, lambda: (win.attributes("-topmost", False)))
             except Exception:
                 pass
         except Exception:
@@ -1818,9 +2109,8 @@ class CallForm(ctk.CTk):
             except Exception:
                 pass
 
-        self.after(50, _nudge)
-        self.after(250, _nudge)
-        self.after(1000, _nudge)
+        for delay in (50, 250, 1000):
+            self.scheduler.call_later(delay, _nudge)
 
         # If it loses focus, yank it back on top
         try:
@@ -1862,37 +2152,75 @@ class CallForm(ctk.CTk):
     # ==============================
     # Persistence for apparatus meta
     # ==============================
-    def save_apparatus_state(self) -> None:
-        data = {}
-        for unit, state in self.global_apparatus.items():
-            data[unit] = {
-                "opstatus": state.get("opstatus", "Ready"),
-                "lastusedby": state.get("lastusedby", "Last Used By"),
-                "staging": state.get("staging", staging_locations[0]),
-                "timestamp": state.get("timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-                # runstatus not persisted across restarts by design
-            }
+    def save_apparatus_state(self, unit: str, *fields: str) -> None:
+        """
+        Stage the fields just edited on one unit and write them after a short
+        quiet period. Only those fields are stamped, so the merge keeps other
+        consoles' newer edits to the rest of the unit.
+        """
+        store = self.apparatus_store
+        unit_upper = unit.upper()
+        state = self.global_apparatus.get(unit_upper)
+        if state is None:
+            return
+        for field in fields:
+            # runstatus not persisted across restarts by design
+            if field in PERSISTED_FIELDS and field in state:
+                store.set(unit_upper, field, state[field])
+        if store.dirty and not self.scheduler.pending("apparatus_flush"):
+            self.scheduler.call_later(APPARATUS_FLUSH_DELAY_MS, self.flush_apparatus_state, name="apparatus_flush")
+
+    def flush_apparatus_state(self) -> None:
         try:
-            with open(APPARATUS_STATE_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f)
-        except Exception:
-            pass
+            changed = self.apparatus_store.flush()
+        except Exception as e:
+            print(f"[call_form] could not save apparatus state: {e}")
+            self.scheduler.call_later(APPARATUS_FLUSH_DELAY_MS * 5, self.flush_apparatus_state, name="apparatus_flush")
+            return
+        self.apply_apparatus_changes(changed)
 
     def load_apparatus_state(self) -> None:
-        if not os.path.exists(APPARATUS_STATE_FILE):
-            return
         try:
-            with open(APPARATUS_STATE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            for unit, state in data.items():
-                unit_upper = unit.upper()
-                if unit_upper in self.global_apparatus:
-                    for key in ["opstatus", "lastusedby", "staging", "timestamp"]:
-                        if key in state:
-                            self.global_apparatus[unit_upper][key] = state[key]
+            self.apply_apparatus_changes(self.apparatus_store.refresh(force=True))
         except Exception:
             pass
 
+    def poll_apparatus_state(self) -> bool:
+        """Pick up other consoles' apparatus edits. Returns True if anything changed."""
+        try:
+            changed = self.apparatus_store.refresh()
+        except Exception:
+            return False
+        self.apply_apparatus_changes(changed)
+        return bool(changed)
+
+    def apply_apparatus_changes(self, changed: dict) -> None:
+        """changed: {UNIT: {field: value}} merged in from disk; reflect in globals and open run tabs."""
+        for unit_upper, fields in (changed or {}).items():
+            if unit_upper not in self.global_apparatus:
+                continue
+            self.global_apparatus[unit_upper].update(fields)
+            if "opstatus" in fields:
+                self.recommender.update(unit_upper, readiness=fields["opstatus"])
+                self._queue_recommendation_refresh()
+            for rn, data in self.run_tabs.items():
+                app = data.get("apparatus", {}).get(unit_upper)
+                if not app:
+                    continue
+                for field in ("opstatus", "lastusedby", "staging", "timestamp"):
+                    if field in fields:
+                        app[field].set(fields[field])
+                try:
+                    if "opstatus" in fields:
+                        app["op_menu"].configure(fg_color=tag_colors.get(fields["opstatus"], "gray"))
+                    if "timestamp" in fields:
+                        app["timestamp_entry"].configure(state="normal")
+                        app["timestamp_entry"].delete(0, "end")
+                        app["timestamp_entry"].insert(0, fields["timestamp"])
+                        app["timestamp_entry"].configure(state="disabled")
+                except Exception:
+                    pass
+
     def _bring_to_front(self, win):
         """Try hard to put a Toplevel-like window in front of CallForm."""
         try:
@@ -1909,7 +2237,7 @@ class CallForm(ctk.CTk):
             # briefly set topmost so it jumps in front, then release
             try:
                 win.attributes("-topmost", True)
-                self.after(300, lambda: (win.attributes("-topmost", False)))
+                self.scheduler.call_later(300, lambda: (win.attributes("-topmost", False)))
             except Exception:
                 pass
         except Exception:
@@ -1920,6 +2248,8 @@ class CallForm(ctk.CTk):
     # Navigation / Windows
     # ==============================
     def close_run_tab(self, run_number: str) -> None:
+        self.sla.clear_run(run_number)
+        self.journals.discard(run_number)
         try:
             self.main_tabview.delete(run_number)
             del self.run_tabs[run_number]
@@ -1976,7 +2306,7 @@ class CallForm(ctk.CTk):
         # Toggle topmost briefly so it pops in front
         try:
             win.attributes("-topmost", True)
-            win.after(250, lambda: win.attributes("-topmost", False))
+            self.scheduler.call_later(250, lambda: win.attributes("-topmost", False))
         except Exception:
             pass
 
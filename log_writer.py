@@ -0,0 +1,282 @@
+# log_writer.py
+import os
+import time
+
+from filelock import FileLock
+
+# Durability policies for queued appends
+DURABILITY_EVERY_WRITE = "write"      # fsync after every batch
+DURABILITY_INTERVAL = "interval"      # fsync at most every FSYNC_INTERVAL_MS (see sync_all)
+DURABILITY_ON_CLOSE = "close"         # fsync only on close()
+DEFAULT_DURABILITY = DURABILITY_INTERVAL
+FSYNC_INTERVAL_MS = 1000
+LOCK_TIMEOUT = 5
+
+# How a batch reaches the file
+MODE_LOCK = "lock"            # FileLock + append (works everywhere)
+MODE_O_APPEND = "o_append"    # one os.write() on an O_APPEND fd, no lock file (POSIX local disks)
+MAX_ATOMIC_WRITE = 64 * 1024  # batches are split at record boundaries above this size
+
+
+class AppendQueue:
+    """
+    Group-commit appends for one shared log file.
+
+    append() only queues the text. flush() writes everything queued under a
+    single FileLock acquisition and a single write() call. With an
+    on_pending hook (e.g. CallForm deferring to idle time) every append made
+    in one burst - a grouped status update, a run submit - becomes one
+    locked write instead of one lock round-trip per line. Without a hook,
+    append() flushes right away.
+
+    In MODE_O_APPEND each record must be self-delimiting (a newline-ended
+    line, a whole RUN START..END block): the kernel appends every write()
+    atomically, so concurrent writers never interleave and no lock file is
+    taken. A crash can still leave a partial last record, which readers
+    skip (see read_complete); a short write() is never finished with a
+    second one (see _write_group).
+
+    retarget, if set, is called at flush time (under the lock in MODE_LOCK)
+    and returns the file the batch really goes to, for logs that can move
+    while records sit in the queue (run_store.run_log_queue).
+    """
+
+    def __init__(self, path: str, lock_path: str = None, durability: str = DEFAULT_DURABILITY,
+                 fsync_interval_ms: int = FSYNC_INTERVAL_MS, mode: str = MODE_LOCK):
+        self.path = path
+        self.lock_path = lock_path or f"{path}.lock"
+        self.mode = mode
+        self.durability = durability
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self.on_pending = None
+        self.retarget = None
+        self._pending = []
+        self._written = path        # file of the last batch, for sync()
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+        # metrics
+        self.batches = 0
+        self.records = 0
+        self.max_batch = 0
+        self.lock_wait_s = 0.0
+        self.max_lock_wait_s = 0.0
+        self.fsyncs = 0
+
+    def append(self, text: str) -> None:
+        self._pending.append(text)
+        if self.on_pending is None:
+            self.flush()
+            return
+        try:
+            self.on_pending(self)
+        except Exception:
+            self.flush()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Write every queued record in one locked append. Returns the batch size."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, []
+        start = time.perf_counter()
+        waited = 0.0
+        try:
+            if self.mode == MODE_O_APPEND:
+                self._write_o_append(self._target(), batch)
+            else:
+                with FileLock(self.lock_path, timeout=LOCK_TIMEOUT):
+                    waited = time.perf_counter() - start
+                    with open(self._target(), "a", encoding="utf-8") as f:
+                        f.write("".join(batch))
+                        f.flush()
+                        self._maybe_fsync(f.fileno())
+        except ShortWrite as e:
+            self._pending[:0] = batch[e.written:]   # whole records already on disk aren't repeated
+            raise
+        except Exception:
+            self._pending[:0] = batch   # keep order; retried on the next flush
+            raise
+        self.batches += 1
+        self.records += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.lock_wait_s += waited
+        self.max_lock_wait_s = max(self.max_lock_wait_s, waited)
+        return len(batch)
+
+    def _target(self) -> str:
+        path = self.retarget() if self.retarget is not None else self.path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._written = path
+        return path
+
+    def _write_o_append(self, path: str, batch) -> None:
+        groups, chunk, size = [], [], 0
+        for rec in batch:
+            data = rec.encode("utf-8")
+            if chunk and size + len(data) > MAX_ATOMIC_WRITE:
+                groups.append(chunk)
+                chunk, size = [], 0
+            chunk.append(data)
+            size += len(data)
+        if chunk:
+            groups.append(chunk)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            written = 0
+            for group in groups:
+                _write_group(fd, path, group, written)
+                written += len(group)
+            self._maybe_fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _maybe_fsync(self, fd: int) -> None:
+        if self.durability == DURABILITY_EVERY_WRITE or (
+                self.durability == DURABILITY_INTERVAL
+                and time.monotonic() - self._last_sync >= self.fsync_interval):
+            os.fsync(fd)
+            self._synced()
+        else:
+            self._unsynced = True
+
+    def _synced(self) -> None:
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+        self.fsyncs += 1
+
+    def sync(self, force: bool = False) -> bool:
+        """fsync data written since the last sync (interval policy, or force). Returns True if it synced."""
+        if not self._unsynced:
+            return False
+        if not force and (self.durability != DURABILITY_INTERVAL
+                          or time.monotonic() - self._last_sync < self.fsync_interval):
+            return False
+        # A write descriptor: Windows refuses fsync (EBADF) on a read-only one
+        try:
+            fd = os.open(self._written, os.O_WRONLY | os.O_APPEND)
+        except FileNotFoundError:
+            self._unsynced = False      # nothing left to make durable
+            return False
+        except OSError as e:
+            print(f"[log_writer] could not open {self._written} to sync: {e}")
+            return False
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            print(f"[log_writer] fsync of {self._written} failed: {e}")
+            return False                # still unsynced: retried by the next sync
+        finally:
+            os.close(fd)
+        self._synced()
+        return True
+
+    def close(self) -> None:
+        self.flush()
+        self.sync(force=True)
+
+    def metrics(self) -> dict:
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "avg_batch": round(self.records / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+            "lock_wait_ms": round(self.lock_wait_s * 1000, 3),
+            "max_lock_wait_ms": round(self.max_lock_wait_s * 1000, 3),
+            "fsyncs": self.fsyncs,
+        }
+
+
+class ShortWrite(OSError):
+    """An O_APPEND write() failed or stored part of a group; `written` records of the batch are whole on disk."""
+
+    def __init__(self, written: int, message: str):
+        super().__init__(message)
+        self.written = written
+
+
+def _write_group(fd: int, path: str, group: list, written: int) -> None:
+    """
+    One write() for a record group. A second write() for the rest of a short
+    one could interleave with another writer, so a short write is an error:
+    the cut record is closed with a newline (readers see one torn line, and
+    the next writer's record still starts a line of its own) and ShortWrite
+    says how many records made it whole.
+    """
+    data = b"".join(group)
+    try:
+        n = os.write(fd, data)
+    except OSError as e:
+        raise ShortWrite(written, f"write to {path} failed: {e}") from e
+    if n == len(data):
+        return
+    whole = cut = 0
+    for rec in group:
+        if cut + len(rec) > n:
+            break
+        cut += len(rec)
+        whole += 1
+    if n > cut:
+        try:
+            os.write(fd, b"\n")
+        except OSError:
+            pass
+    raise ShortWrite(written + whole, f"short write to {path}: {n} of {len(data)} bytes")
+
+
+def read_complete(path: str) -> str:
+    """File text minus a trailing partial record (anything after the last newline)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return ""
+    end = data.rfind(b"\n")
+    return data[:end + 1].decode("utf-8", errors="replace") if end >= 0 else ""
+
+
+_queues = {}
+
+
+def get_queue(path: str, lock_path: str = None, mode: str = None) -> AppendQueue:
+    """Process-wide queue per log file (so every writer of a file shares its batches)."""
+    key = os.path.abspath(path)
+    q = _queues.get(key)
+    if q is None:
+        q = _queues[key] = AppendQueue(path, lock_path, mode=mode or MODE_LOCK)
+    return q
+
+
+def flush_all() -> None:
+    for q in list(_queues.values()):
+        try:
+            q.flush()
+        except Exception as e:
+            print(f"[log_writer] flush of {q.path} failed: {e}")
+
+
+def sync_all() -> bool:
+    synced = False
+    for q in list(_queues.values()):
+        try:
+            synced = q.sync() or synced
+        except Exception:
+            pass
+    return synced
+
+
+def close_all() -> None:
+    """Flush + fsync every queue and drop flush hooks (later appends write through)."""
+    for q in list(_queues.values()):
+        q.on_pending = None
+        try:
+            q.close()
+        except Exception as e:
+            print(f"[log_writer] close of {q.path} failed: {e}")
+
+
+def metrics() -> dict:
+    """{path: metrics} for every log written by this process."""
+    return {q.path: q.metrics() for q in _queues.values()}
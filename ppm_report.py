@@ -0,0 +1,139 @@
+# ppm_report.py
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+from run_export import EXPORT_FIELDS, export_runs, flat_cell, run_filter, run_to_dict
+from run_store import iter_runs, log_exists, log_size, user_roles
+
+# Headless run lookup: reads run_log.txt through run_store (no Tk), streams
+# each match as soon as it's parsed.
+#
+#   python ppm_report.py "chest pain" --since 2024-06-01 --until 2024-06-30
+#   python ppm_report.py --unit E1 --unit M2 --latest 20 --format json
+#   python ppm_report.py --run "Run 1042" --format csv --fields run_number,timestamp,notes
+#   python ppm_report.py --since 2024-01-01 --user alex --out audit_2024.csv.gz
+
+FORMATS = ("text", "json", "jsonl", "csv")
+DEFAULT_FIELDS = ("run_number", "timestamp", "nature", "location", "assigned")
+
+
+def select_runs(args):
+    is_admin, is_owner = user_roles(args.user) if args.user else (False, False)
+    reverse = args.latest is not None
+    limit = args.latest if reverse else args.limit
+    jobs = _jobs(args) if (args.query or args.unit or args.nature or args.user) and not args.run else 1
+    if (jobs > 1 or args.query) and not args.run:
+        # text: raw grep over the mapped log; big histories: across worker processes too
+        from run_search import RunSearch
+        runs = RunSearch(args.log, jobs=jobs, reverse=reverse, since=args.since, until=args.until,
+                         units=args.unit, nature=args.nature, query=args.query,
+                         username=args.user, is_admin=is_admin, is_owner=is_owner)
+        return itertools.islice(runs, limit)
+    # dates and run numbers go to iter_runs, which checks them before parsing a block
+    keep = run_filter(units=args.unit, nature=args.nature, query=args.query,
+                      username=args.user, is_admin=is_admin, is_owner=is_owner)
+    return iter_runs(args.log, reverse=reverse, since=args.since, until=args.until,
+                     run_number=set(args.run) if args.run else None, predicate=keep, limit=limit)
+
+
+def _jobs(args) -> int:
+    from run_search import PARALLEL_MIN_BYTES, default_jobs
+    if args.jobs is not None:
+        return max(1, args.jobs)
+    return default_jobs() if log_size(args.log) >= PARALLEL_MIN_BYTES else 1
+
+
+def write_runs(runs, fmt: str, fields, out) -> int:
+    n = 0
+    if fmt == "csv":
+        w = csv.writer(out)
+        w.writerow(fields)
+    elif fmt == "json":
+        out.write("[")
+    for r in runs:
+        d = run_to_dict(r)
+        if fmt == "csv":
+            w.writerow([flat_cell(d[f]) for f in fields])
+        elif fmt == "json":
+            out.write(("," if n else "") + "\n  " + json.dumps({f: d[f] for f in fields}, ensure_ascii=False))
+        elif fmt == "jsonl":
+            out.write(json.dumps({f: d[f] for f in fields}, ensure_ascii=False) + "\n")
+        else:
+            out.write("  |  ".join(flat_cell(d[f]).replace("\n", " / ").strip() for f in fields) + "\n")
+        n += 1
+        out.flush()
+    if fmt == "json":
+        out.write("\n]\n" if n else "]\n")
+    return n
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="ppm-report", description="Query run_log.txt without the GUI")
+    ap.add_argument("query", nargs="?", help="text to search for (fields, notes, statuses, addendums)")
+    ap.add_argument("--log", help="run log file or segment directory (default: run_log/ once split, else run_log.txt)")
+    ap.add_argument("--since", help="YYYY-MM-DD[ HH:MM:SS], inclusive")
+    ap.add_argument("--until", help="YYYY-MM-DD[ HH:MM:SS], inclusive")
+    ap.add_argument("--unit", action="append", help="unit involved (repeat for any-of)")
+    ap.add_argument("--run", action="append", help="exact run number (repeatable)")
+    ap.add_argument("--nature", help="exact nature (case-insensitive)")
+    group = ap.add_mutually_exclusive_group()
+    group.add_argument("--latest", type=int, metavar="N", help="newest N matches, newest first")
+    group.add_argument("--limit", type=int, metavar="N", help="first N matches, oldest first")
+    ap.add_argument("--format", choices=FORMATS, default="text")
+    ap.add_argument("--fields", help=f"comma list of fields (default: {','.join(DEFAULT_FIELDS)} "
+                                     f"for text/csv, every field for json/jsonl and --out)")
+    ap.add_argument("--jobs", type=int, metavar="N",
+                    help="worker processes for text/unit/nature/user searches "
+                         "(default: all cores once the log is large, else 1)")
+    ap.add_argument("--user", help="only runs this user may see (as in the CAD Logs window)")
+    ap.add_argument("--out", metavar="FILE",
+                    help="bulk export to FILE (.csv, .json or .jsonl, add .gz to compress) with progress on stderr")
+    args = ap.parse_args(argv)
+    if args.out:
+        if args.latest is not None or args.limit is not None:
+            ap.error("--out exports every match; drop --latest/--limit")
+        if args.run:
+            ap.error("--out does not take --run")
+
+    default_fields = EXPORT_FIELDS if args.out or args.format in ("json", "jsonl") else DEFAULT_FIELDS
+    fields = [f.strip() for f in args.fields.split(",")] if args.fields else list(default_fields)
+    bad = [f for f in fields if f not in EXPORT_FIELDS]
+    if bad:
+        ap.error(f"unknown field(s): {', '.join(bad)} (choose from {', '.join(EXPORT_FIELDS)})")
+    if not log_exists(args.log):
+        print(f"[ppm_report] no run log at {args.log or 'run_log.txt'}", file=sys.stderr)
+        return 1
+    if args.out:
+        return _export(args, fields)
+    try:
+        write_runs(select_runs(args), args.format, fields, sys.stdout)
+    except BrokenPipeError:
+        # output piped into head & co.; stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    return 0
+
+
+def _export(args, fields) -> int:
+    def progress(written, scanned, fraction):
+        print(f"\r  {written} runs written, {scanned} scanned ({fraction:.0%})", end="", file=sys.stderr)
+
+    is_admin, is_owner = user_roles(args.user) if args.user else (False, False)
+    fmt = args.format if args.format in ("csv", "json", "jsonl") else None
+    try:
+        n = export_runs(args.out, fmt=fmt, fields=fields, path=args.log, progress=progress,
+                        since=args.since, until=args.until, units=args.unit, nature=args.nature,
+                        query=args.query, username=args.user, is_admin=is_admin, is_owner=is_owner)
+    except KeyboardInterrupt:
+        print("\n[ppm_report] export interrupted", file=sys.stderr)
+        return 130
+    print(f"\n[ppm_report] {n} runs -> {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,29 @@
 # responders_repo.py
 import os
+import re
 
 RESPONDERS_FILE = "responders.txt"
 
+_B_CODE_RE = re.compile(r"^B(\d+)")
+_NUM_CODE_RE = re.compile(r"^(\d+)")
+
 def _norm_shift_key(s: str) -> str:
     s = (s or "").strip().upper()
     if s.startswith("SHIFT_"):
         s = s[6:]
     return s if s in ("A", "B", "C", "D") else ""
 
+def code_sort_key(code: str):
+    """B# first (by #), then other numeric codes, then lexicographic."""
+    c = (code or "").strip().upper()
+    if c.startswith("B"):
+        m = _B_CODE_RE.match(c)
+        n = int(m.group(1)) if m else 10_000_000
+        return (0, n, c)
+    m = _NUM_CODE_RE.match(c)
+    n = int(m.group(1)) if m else 10_000_000
+    return (1, n, c)
+
 def _parse_line_fields(line: str):
     """
     Parse a responder line into 5 fields:
@@ -20,11 +35,15 @@ def _parse_line_fields(line: str):
         parts.append("")
     return parts[:5]
 
-def load_responders_detailed_by_shift():
+def read_responders_file(path=None):
+    """
+    Parse the roster file from scratch. Most callers want the cached
+    load_responders_detailed_by_shift() instead.
+    """
     shifts = {"A": [], "B": [], "C": [], "D": []}
     cur = None
     try:
-        with open(RESPONDERS_FILE, "r", encoding="utf-8-sig") as f:
+        with open(path or RESPONDERS_FILE, "r", encoding="utf-8-sig") as f:
             for raw in f:
                 line = raw.strip()
                 if not line or line.startswith("#") or line.startswith(";"):
@@ -48,23 +67,87 @@ def load_responders_detailed_by_shift():
     return shifts
 
 
-def save_responders_detailed_by_shift(data):
+def load_responders_detailed_by_shift():
+    """
+    {"A":[(code, name, status, phone, email), ...], ...} served from the shared
+    roster cache; responders.txt is only re-read when it changed on disk.
+    """
+    from roster_service import get_roster
+    roster = get_roster()
+    roster.check_for_changes()
+    return roster.detailed_by_shift()
+
+
+def get_responder(code: str, shift=None):
+    """Return (code, name, status, phone, email) for a unit code, or None."""
+    from roster_service import get_roster
+    roster = get_roster()
+    roster.check_for_changes()
+    key = _norm_shift_key(shift) if shift else ""
+    if key:
+        return roster.row_in_shift(key, code)
+    hit = roster.lookup(code)
+    return hit[1] if hit else None
+
+
+def write_responders_file(data, path=None):
     """
     Writes responders with 5 fields per line under [A]/[B]/[C]/[D] sections.
     data: {"A":[(code, name, status, phone, email), ...], ...}
+    The file is written to a temp file and renamed over the original, so
+    readers never see a half-written roster.
     """
-    with open(RESPONDERS_FILE, "w", encoding="utf-8") as f:
-        for key in ("A", "B", "C", "D"):
-            f.write(f"[{key}]\n")
-            for row in data.get(key, []):
-                code = (row[0] if len(row) > 0 else "").strip()
-                name = (row[1] if len(row) > 1 else "").strip()
-                status = (row[2] if len(row) > 2 else "").strip()
-                phone = (row[3] if len(row) > 3 else "").strip()
-                email = (row[4] if len(row) > 4 else "").strip()
-                if code and name:
-                    f.write(f"{code},{name},{status},{phone},{email}\n")
-            f.write("\n")
+    path = path or RESPONDERS_FILE
+    tmp = f"{path}.{os.getpid()}.tmp"     # per process: two admin consoles never share one
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for key in ("A", "B", "C", "D"):
+                f.write(f"[{key}]\n")
+                for row in data.get(key, []):
+                    code = (row[0] if len(row) > 0 else "").strip()
+                    name = (row[1] if len(row) > 1 else "").strip()
+                    status = (row[2] if len(row) > 2 else "").strip()
+                    phone = (row[3] if len(row) > 3 else "").strip()
+                    email = (row[4] if len(row) > 4 else "").strip()
+                    if code and name:
+                        f.write(f"{code},{name},{status},{phone},{email}\n")
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def save_responders_detailed_by_shift(data):
+    """Replace the whole roster. For single edits use add/update/delete_responder()."""
+    write_responders_file(data)
+
+    # Push the edit to the shared roster (and any open CAD windows) right away
+    from roster_service import get_roster
+    get_roster().check_for_changes(force=True)
+
+
+def add_responder(shift, row):
+    """Insert one responder in sorted position. Raises ValueError on duplicates."""
+    from roster_service import get_roster
+    get_roster().add_responder(_norm_shift_key(shift) or "A", row)
+
+
+def update_responder(shift, code, row, new_shift=None):
+    """Edit (and optionally move) one responder. Raises ValueError on conflicts."""
+    from roster_service import get_roster
+    cur = _norm_shift_key(shift) or "A"
+    get_roster().update_responder(cur, code, row, _norm_shift_key(new_shift) or cur)
+
+
+def delete_responder(shift, code):
+    from roster_service import get_roster
+    get_roster().delete_responder(_norm_shift_key(shift) or "A", code)
 
 
 # ---------- Simple API (for call_form.py) ----------
@@ -0,0 +1,225 @@
+# roster_service.py
+import os
+from bisect import bisect_left, bisect_right
+
+import responders_repo
+
+SHIFT_KEYS = ("A", "B", "C", "D")
+
+
+class RosterService:
+    """
+    Single in-memory copy of responders.txt, indexed by shift and by unit code.
+
+    The file is parsed once; check_for_changes() is a cheap os.stat() that
+    re-parses only when the file's mtime/size moved, then notifies
+    subscribers (e.g. open CallForm windows) with the service itself.
+
+    Each shift list is kept sorted by responders_repo.code_sort_key with the
+    keys precomputed alongside, so single edits are a bisect + list insert
+    instead of a reload and re-sort.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or responders_repo.RESPONDERS_FILE
+        self.version = 0
+        self._stamp = None
+        self._by_shift = {k: [] for k in SHIFT_KEYS}
+        self._keys = {k: [] for k in SHIFT_KEYS}     # parallel sort keys
+        self._by_code = {}        # CODE -> (shift, row), first shift wins
+        self._by_shift_code = {}  # (shift, code) -> row
+        self._subscribers = []
+        self.reload()
+
+    # -------------------------
+    # Loading / watching
+    # -------------------------
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def reload(self) -> None:
+        """Re-parse the roster file and rebuild both indexes."""
+        self._stamp = self._file_stamp()
+        parsed = responders_repo.read_responders_file(self.path)
+        by_shift, keys = {}, {}
+        by_code, by_shift_code = {}, {}
+        for shift_key in SHIFT_KEYS:
+            keyed = sorted(
+                ((responders_repo.code_sort_key(r[0]), r) for r in parsed.get(shift_key, [])),
+                key=lambda kr: kr[0],
+            )
+            keys[shift_key] = [k for k, _ in keyed]
+            by_shift[shift_key] = [r for _, r in keyed]
+            for row in by_shift[shift_key]:
+                by_code.setdefault(row[0].upper(), (shift_key, row))
+                by_shift_code[(shift_key, row[0])] = row
+        self._by_shift = by_shift
+        self._keys = keys
+        self._by_code = by_code
+        self._by_shift_code = by_shift_code
+        self.version += 1
+
+    def check_for_changes(self, force: bool = False) -> bool:
+        """Reload + notify if responders.txt changed on disk. Returns True if it did."""
+        if not force and self._file_stamp() == self._stamp:
+            return False
+        self.reload()
+        self._notify()
+        return True
+
+    # -------------------------
+    # Incremental edits
+    # -------------------------
+    @staticmethod
+    def _clean_row(row) -> tuple:
+        vals = [(str(v) if v is not None else "").strip() for v in list(row)[:5]]
+        vals += [""] * (5 - len(vals))
+        if not vals[0] or not vals[1]:
+            raise ValueError("Unit Code and Name are required.")
+        return tuple(vals)
+
+    def _position(self, shift_key: str, code: str) -> int:
+        key = responders_repo.code_sort_key(code)
+        keys = self._keys[shift_key]
+        rows = self._by_shift[shift_key]
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key:
+            if rows[i][0] == code:
+                return i
+            i += 1
+        return -1
+
+    def _insert(self, shift_key: str, row: tuple) -> None:
+        key = responders_repo.code_sort_key(row[0])
+        i = bisect_right(self._keys[shift_key], key)
+        self._keys[shift_key].insert(i, key)
+        self._by_shift[shift_key].insert(i, row)
+        self._by_shift_code[(shift_key, row[0])] = row
+        self._by_code.setdefault(row[0].upper(), (shift_key, row))
+        # Keep "first shift wins" for codes present in several shifts
+        hit = self._by_code[row[0].upper()]
+        if SHIFT_KEYS.index(shift_key) < SHIFT_KEYS.index(hit[0]):
+            self._by_code[row[0].upper()] = (shift_key, row)
+
+    def _remove(self, shift_key: str, code: str) -> tuple:
+        i = self._position(shift_key, code)
+        if i < 0:
+            raise ValueError(f"Responder '{code}' not found in Shift {shift_key}.")
+        del self._keys[shift_key][i]
+        row = self._by_shift[shift_key].pop(i)
+        self._by_shift_code.pop((shift_key, code), None)
+        upper = code.upper()
+        self._by_code.pop(upper, None)
+        for k in SHIFT_KEYS:
+            other = self._by_shift_code.get((k, code))
+            if other is not None:
+                self._by_code[upper] = (k, other)
+                break
+        return row
+
+    def _commit(self) -> None:
+        try:
+            responders_repo.write_responders_file(self._by_shift, self.path)
+        except Exception:
+            # The edit is already in the indexes: drop it so memory matches the
+            # file again, else the next successful edit would write it too.
+            self.reload()
+            raise
+        self._stamp = self._file_stamp()
+        self.version += 1
+        self._notify()
+
+    def add_responder(self, shift_key: str, row) -> None:
+        self.check_for_changes()
+        row = self._clean_row(row)
+        if (shift_key, row[0]) in self._by_shift_code:
+            raise ValueError(f"Unit Code '{row[0]}' already exists in Shift {shift_key}.")
+        self._insert(shift_key, row)
+        self._commit()
+
+    def update_responder(self, shift_key: str, code: str, row, new_shift: str = None) -> None:
+        self.check_for_changes()
+        row = self._clean_row(row)
+        new_shift = new_shift or shift_key
+        if (shift_key, code) not in self._by_shift_code:
+            raise ValueError(f"Responder '{code}' not found in Shift {shift_key}.")
+        moved = (new_shift, row[0]) != (shift_key, code)
+        if moved and (new_shift, row[0]) in self._by_shift_code:
+            raise ValueError(f"Unit Code '{row[0]}' already exists in Shift {new_shift}.")
+        self._remove(shift_key, code)
+        self._insert(new_shift, row)
+        self._commit()
+
+    def delete_responder(self, shift_key: str, code: str) -> None:
+        self.check_for_changes()
+        self._remove(shift_key, code)
+        self._commit()
+
+    def subscribe(self, callback) -> None:
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        try:
+            self._subscribers.remove(callback)
+        except ValueError:
+            pass
+
+    def _notify(self) -> None:
+        for cb in list(self._subscribers):
+            try:
+                cb(self)
+            except Exception as e:
+                print(f"[roster_service] subscriber failed: {e}")
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def detailed_by_shift(self) -> dict:
+        """{"A": [(code, name, status, phone, email), ...], ...} (lists are copies)."""
+        return {k: list(v) for k, v in self._by_shift.items()}
+
+    def simple_by_shift(self) -> dict:
+        """{"A": [(code, name), ...], ...}"""
+        return {k: [(r[0], r[1]) for r in v] for k, v in self._by_shift.items()}
+
+    def shift_rows(self, shift_key: str) -> list:
+        return list(self._by_shift.get(shift_key, []))
+
+    def flat_names(self) -> list:
+        """["B1 Bill Mullins", "11 Clifford Hicks", ...] in shift order."""
+        return [f"{r[0]} {r[1]}" for k in SHIFT_KEYS for r in self._by_shift.get(k, [])]
+
+    def lookup(self, code: str):
+        """(shift, row) for a unit code, or None."""
+        return self._by_code.get((code or "").strip().upper())
+
+    def row_in_shift(self, shift_key: str, code: str):
+        """Row for an exact unit code within one shift, or None."""
+        return self._by_shift_code.get((shift_key, (code or "").strip()))
+
+    def shift_of(self, code: str) -> str:
+        hit = self.lookup(code)
+        return hit[0] if hit else ""
+
+    def name_of(self, code: str) -> str:
+        hit = self.lookup(code)
+        return hit[1][1] if hit else ""
+
+    def is_empty(self) -> bool:
+        return not self._by_code
+
+
+_roster = None
+
+
+def get_roster() -> RosterService:
+    """Process-wide roster shared by responders_repo, CallForm and Admin Controls."""
+    global _roster
+    if _roster is None:
+        _roster = RosterService()
+    return _roster
@@ -0,0 +1,289 @@
+# run_analytics.py
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:     # optional: aggregation falls back to plain Python
+    np = None
+
+from run_records import ts_to_epoch
+from run_store import iter_runs_from, log_fingerprint, time_bound
+from shift_calendar import get_calendar
+
+# Per-unit response times from the run log.
+#
+# Transitions come from two places in each run block:
+#   Notes:     "[HH:MM:SS] 42, M2 are ENROUTE."  "E1 is ON SCENE"  "E1 set to AVAILABLE (dropdown)"
+#              "42, E1 has been updated to dispatched."
+#   Statuses:  "UNIT|STATUS|YYYY-MM-DD HH:MM:SS" (each unit's last status)
+# Note stamps carry no date; they are dated backwards from the latest full
+# timestamp in the block (run submit time / last status), stepping back a
+# day whenever the clock runs backwards across midnight.
+
+METRICS = ("dispatch_to_enroute", "enroute_to_on_scene", "total")
+GROUPS = ("unit", "shift", "nature")
+STATUS_WORDS = ("DISPATCHED", "ENROUTE", "ON SCENE", "TRANSPORTING", "AVAILABLE", "UNAVAILABLE")
+
+_EPOCH = datetime(1970, 1, 1)
+_NOTE = re.compile(r"^\[(\d\d):(\d\d):(\d\d)\] (.*)$")
+_UNITS = r"([A-Za-z0-9]+(?:, [A-Za-z0-9]+)*)"
+_EVENT = re.compile(_UNITS + r" (?:is |are |set to |set back to )?(" + "|".join(STATUS_WORDS) + r")\b")
+_DISPATCH = re.compile(_UNITS + r" has been updated to dispatched")
+
+
+def _note_events(notes, anchor: int):
+    """[(unit, status, epoch)] from timestamped note lines, dated relative to anchor."""
+    found = []
+    for line in notes:
+        m = _NOTE.match(line)
+        if not m:
+            continue
+        body = m.group(4)
+        ev = _EVENT.match(body)
+        if ev:
+            units, status = ev.group(1), ev.group(2)
+        else:
+            ev = _DISPATCH.match(body)
+            if not ev:
+                continue
+            units, status = ev.group(1), "DISPATCHED"
+        sod = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3))
+        found.append((units, status, sod))
+    if not found:
+        return []
+    day, anchor_sod = divmod(anchor, 86400)
+    out = []
+    nxt = anchor_sod
+    for units, status, sod in reversed(found):
+        if sod > nxt:
+            day -= 1
+        nxt = sod
+        when = day * 86400 + sod
+        for unit in units.split(", "):
+            out.append((unit.upper(), status, when))
+    return out
+
+
+def _scan_block(lines):
+    """(nature, latest full timestamp, note lines, [(unit, status, epoch)]) from raw block lines."""
+    nature = ""
+    latest = None
+    notes, statuses = [], []
+    section = None
+    for ln in lines:
+        head, sep, value = ln.partition(": ")
+        if sep and head in ("Nature", "Timestamp", "RunNumber", "Caller", "Location", "Assigned"):
+            if head == "Nature":
+                nature = value
+            elif head == "Timestamp":
+                ts = ts_to_epoch(value)
+                if isinstance(ts, int) and (latest is None or ts > latest):
+                    latest = ts
+        elif ln == "Notes:" or ln == "Statuses:" or ln == "Addendums:":
+            section = ln
+        elif section == "Notes:":
+            if ln.startswith("["):
+                notes.append(ln)
+        elif section == "Statuses:":
+            parts = ln.split("|")
+            if len(parts) >= 3:
+                ts = ts_to_epoch(parts[2])
+                if isinstance(ts, int):
+                    statuses.append((parts[0].upper(), parts[1], ts))
+                    if latest is None or ts > latest:
+                        latest = ts
+    return nature, latest, notes, statuses
+
+
+def unit_timings(lines):
+    """
+    (nature, [(unit, dispatched, enroute, on_scene, cleared)]) for one run
+    block's lines; epoch seconds, None if never seen. Only units with a
+    DISPATCHED event are returned.
+    """
+    nature, latest, notes, statuses = _scan_block(lines)
+    if latest is None:
+        return nature, []
+    first = {}
+    for unit, status, when in _note_events(notes, latest) + statuses:
+        per = first.setdefault(unit, {})
+        if status == "AVAILABLE":
+            per.setdefault("AVAILABLE", []).append(when)
+        elif status not in per or when < per[status]:
+            per[status] = when
+    out = []
+    for unit, per in first.items():
+        dispatched = per.get("DISPATCHED")
+        if dispatched is None:
+            continue
+        cleared = min((t for t in per.get("AVAILABLE", ()) if t >= dispatched), default=None)
+        out.append((unit, dispatched, per.get("ENROUTE"), per.get("ON SCENE"), cleared))
+    return nature, out
+
+
+def _span(a, b):
+    return b - a if a is not None and b is not None and b >= a else None
+
+
+class ResponseTimes:
+    """
+    Flat per-(run, unit) timing rows, grown incrementally from run_log.txt.
+
+        rt = ResponseTimes(); rt.refresh()
+        rt.report(by="unit", since="2024-01-01")
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path        # None: run_store's log (run_log.txt or its segments)
+        self._reset()
+
+    def _reset(self):
+        self.rows = {"unit": [], "shift": [], "nature": [], "dispatched": [],
+                     "dispatch_to_enroute": [], "enroute_to_on_scene": [], "total": []}
+        self._resume = 0
+        self._fingerprint = b""
+
+    def __len__(self):
+        return len(self.rows["unit"])
+
+    def refresh(self) -> int:
+        """Add timings for runs appended since the last call. Returns runs read."""
+        if self._resume and log_fingerprint(self.path, self._resume) != self._fingerprint:
+            self._reset()       # log was rewritten (addendum) or truncated
+        cal = get_calendar()
+        rows = self.rows
+        n = 0
+        end = self._resume
+        for lines, _, end in iter_runs_from(self._resume, self.path, raw=True):
+            n += 1
+            nature, timings = unit_timings(lines)
+            for unit, dispatched, enroute, on_scene, cleared in timings:
+                rows["unit"].append(unit)
+                rows["shift"].append(cal.shift_at(_EPOCH + timedelta(seconds=dispatched)))
+                rows["nature"].append(nature)
+                rows["dispatched"].append(dispatched)
+                rows["dispatch_to_enroute"].append(_span(dispatched, enroute))
+                rows["enroute_to_on_scene"].append(_span(enroute, on_scene))
+                rows["total"].append(_span(dispatched, cleared))
+        if end != self._resume:
+            self._resume = end
+            self._fingerprint = log_fingerprint(self.path, end)
+        return n
+
+    def report(self, by: str = "unit", since=None, until=None) -> dict:
+        """
+        {group: {metric: {"n", "mean", "p50", "p90"}}} in seconds, for runs
+        dispatched between since and until (inclusive, as in iter_runs).
+        """
+        if by not in GROUPS:
+            raise ValueError(f"group by one of {GROUPS}")
+        lo, hi = ts_to_epoch(time_bound(since, False)), ts_to_epoch(time_bound(until, True))
+        keep = [i for i, t in enumerate(self.rows["dispatched"])
+                if (not isinstance(lo, int) or t >= lo) and (not isinstance(hi, int) or t <= hi)]
+        keys = [self.rows[by][i] for i in keep]
+        out = {}
+        for metric in METRICS:
+            values = [self.rows[metric][i] for i in keep]
+            stats = _aggregate_numpy(keys, values) if np is not None else _aggregate_py(keys, values)
+            for key, st in stats.items():
+                out.setdefault(key, {})[metric] = st
+        return dict(sorted(out.items()))
+
+
+def _aggregate_py(keys, values) -> dict:
+    groups = {}
+    for k, v in zip(keys, values):
+        if v is not None:
+            groups.setdefault(k, []).append(v)
+    out = {}
+    for k, vals in groups.items():
+        vals.sort()
+        c = len(vals)
+        out[k] = {"n": c, "mean": round(sum(vals) / c, 1),
+                  "p50": vals[(c - 1) // 2], "p90": vals[int((c - 1) * 0.9)]}
+    return out
+
+
+def _aggregate_numpy(keys, values) -> dict:
+    vals = np.array([-1 if v is None else v for v in values], dtype=np.int64)
+    valid = vals >= 0
+    if not valid.any():
+        return {}
+    names, codes = np.unique(np.array(keys, dtype=object)[valid].astype(str), return_inverse=True)
+    vals = vals[valid]
+    order = np.lexsort((vals, codes))
+    codes, vals = codes[order], vals[order]
+    counts = np.bincount(codes, minlength=len(names))
+    sums = np.bincount(codes, weights=vals, minlength=len(names))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    p50 = vals[starts + (counts - 1) // 2]
+    p90 = vals[starts + ((counts - 1) * 0.9).astype(np.int64)]
+    return {str(names[i]): {"n": int(counts[i]), "mean": round(float(sums[i] / counts[i]), 1),
+                            "p50": int(p50[i]), "p90": int(p90[i])}
+            for i in range(len(names)) if counts[i]}
+
+
+def _mmss(seconds) -> str:
+    if seconds is None:
+        return "-"
+    m, s = divmod(int(round(seconds)), 60)
+    return f"{m}:{s:02d}"
+
+
+def format_report(report: dict, by: str = "unit") -> str:
+    """Plain-text table (one line per group) for the CLI and the admin window."""
+    head = f"{by.upper():<22}" + "".join(f"{m.replace('_', ' '):>30}" for m in METRICS)
+    sub = " " * 22 + "".join(f"{'n':>6}{'mean':>8}{'p50':>8}{'p90':>8}" for _ in METRICS)
+    lines = [head, sub]
+    for key, metrics in report.items():
+        cells = []
+        for m in METRICS:
+            st = metrics.get(m)
+            if st:
+                cells.append(f"{st['n']:>6}{_mmss(st['mean']):>8}{_mmss(st['p50']):>8}{_mmss(st['p90']):>8}")
+            else:
+                cells.append(f"{0:>6}{'-':>8}{'-':>8}{'-':>8}")
+        lines.append(f"{(key or '(none)')[:21]:<22}" + "".join(cells))
+    return "\n".join(lines)
+
+
+_times = {}
+
+
+def get_response_times(path: str = None) -> ResponseTimes:
+    """Shared, refreshed ResponseTimes per log file."""
+    key = os.path.abspath(path or "run_log.txt")
+    rt = _times.get(key)
+    if rt is None:
+        rt = _times[key] = ResponseTimes(path)
+    rt.refresh()
+    return rt
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Per-unit response times from run_log.txt")
+    ap.add_argument("--log", default="run_log.txt")
+    ap.add_argument("--by", choices=GROUPS, default="unit")
+    ap.add_argument("--since", help="YYYY-MM-DD[ HH:MM:SS]")
+    ap.add_argument("--until", help="YYYY-MM-DD[ HH:MM:SS]")
+    ap.add_argument("--json", action="store_true", help="print seconds as JSON")
+    args = ap.parse_args(argv)
+
+    rt = ResponseTimes(args.log)
+    rt.refresh()
+    report = rt.report(args.by, args.since, args.until)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_report(report, args.by))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+# run_cache.py
+import argparse
+import gc
+import marshal
+import os
+import struct
+import sys
+import time
+import zlib
+
+import run_store
+from run_records import Addendum, RunRecord, StatusEvent
+
+# Persisted parse of the run log, so opening Dispatch Logs or restarting a
+# console costs one marshal load instead of re-parsing the text:
+#
+#   run_log.txt.cache            next to the file it caches
+#   run_log/2024-05.txt.cache    one per month segment / archive on a segmented log
+#
+# A cache file is a short file header followed by chunks. Each chunk is a
+# struct header and a marshal dump of plain tuples, one per run with its
+# statuses and addendums as nested tuples:
+#
+#   magic | version | chunk 0 (runs from offset 0) | chunk 1 (runs appended since) | ...
+#
+# A chunk header records the offset its runs start at, the source file's
+# size and mtime when it was read, the offset the parse stopped at (after the
+# last complete block), a CRC-32 of the TAIL_BYTES before that offset and a
+# CRC-32 of the payload. Readers take chunks in order while each one starts
+# where the previous stopped, and use the last one's key:
+#
+#   size and mtime unchanged      the cached runs are used as they are
+#   tail checksum still matches   the log only grew: parse from the offset on and append a chunk
+#   anything else                 (append_addendum rewrite, truncation) parse it all again
+#
+# So a grown log costs one small appended chunk, not a rewrite of the whole
+# cache; after MAX_CHUNKS of them the file is rewritten as one chunk. A torn
+# or corrupt chunk ends the read (it is cut off by the next append), and a
+# chunk that doesn't start where the previous stopped (two consoles
+# extending at once) is skipped. Closed segments never change, so on a
+# segmented log only the active month is re-read. Caches only ever save
+# time: a missing, corrupt or unwritable one falls back to parsing the text.
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 2
+TAIL_BYTES = 4096
+MAX_CHUNKS = 64
+_MAGIC = b"PPMRUNS\0"
+_FILE_HEADER = struct.Struct("<8sI")         # magic, version
+_CHUNK = struct.Struct("<QQqQIII")           # start, size, mtime_ns, end, tail crc32, payload length, payload crc32
+
+
+def cache_path(path: str) -> str:
+    return path + CACHE_SUFFIX
+
+
+def _to_row(r) -> tuple:
+    return (r.run_number, r.caller, r.location, r.nature, r.assigned, r.ts, r.notes,
+            tuple((st.unit, st.status, st.ts) for st in r.statuses),
+            tuple((a.ts, a.author, a.text) for a in r.addendums))
+
+
+def _from_row(row) -> RunRecord:
+    rn, caller, location, nature, assigned, ts, notes, statuses, addendums = row
+    return RunRecord(rn, caller, location, nature, assigned, ts, notes,
+                     [StatusEvent(*st) for st in statuses], [Addendum(*a) for a in addendums])
+
+
+# =========================
+# Cache files
+# =========================
+class CacheState:
+    """What read_cache found: the rows, the last chunk's key, and where the next chunk goes."""
+    __slots__ = ("rows", "size", "mtime_ns", "end", "tail", "chunks", "valid_bytes")
+
+    def __init__(self, rows, size, mtime_ns, end, tail, chunks, valid_bytes):
+        self.rows = rows
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.end = end
+        self.tail = tail
+        self.chunks = chunks
+        self.valid_bytes = valid_bytes
+
+
+def read_cache(path: str):
+    """CacheState from the cache of `path`, or None if it is missing, unreadable or empty."""
+    try:
+        with open(cache_path(path), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < _FILE_HEADER.size or _FILE_HEADER.unpack_from(data) != (_MAGIC, CACHE_VERSION):
+        return None
+    pos = valid = _FILE_HEADER.size
+    rows, key, chunks = [], None, 0
+    while pos + _CHUNK.size <= len(data):
+        start, size, mtime, end, tail, length, payload_crc = _CHUNK.unpack_from(data, pos)
+        payload = data[pos + _CHUNK.size:pos + _CHUNK.size + length]
+        if len(payload) != length or zlib.crc32(payload) != payload_crc:
+            break                               # torn or corrupt: everything after it is dropped
+        pos = valid = pos + _CHUNK.size + length
+        if start != (key[2] if key else 0):
+            continue                            # another console's copy of runs already read
+        try:
+            rows += marshal.loads(payload)
+        except (EOFError, ValueError, TypeError):
+            break
+        key = (size, mtime, end, tail)
+        chunks += 1
+    if key is None:
+        return None
+    return CacheState(rows, *key, chunks, valid)
+
+
+def _chunk(path: str, start: int, size: int, mtime_ns: int, end: int, rows: list) -> bytes:
+    payload = marshal.dumps(rows)
+    return _CHUNK.pack(start, size, mtime_ns, end, run_store.tail_crc(path, end, TAIL_BYTES),
+                       len(payload), zlib.crc32(payload)) + payload
+
+
+def write_cache(path: str, size: int, mtime_ns: int, end: int, rows: list) -> None:
+    """Atomically replace the cache of `path` with one chunk; size / mtime_ns are from a stat taken before parsing."""
+    target = cache_path(path)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    data = _FILE_HEADER.pack(_MAGIC, CACHE_VERSION) + _chunk(path, 0, size, mtime_ns, end, rows)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    except OSError as e:
+        print(f"[run_cache] could not write {target}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def append_cache(path: str, state: CacheState, size: int, mtime_ns: int, end: int, rows: list) -> None:
+    """Append a chunk of the runs parsed from state.end on, cutting off anything after state.valid_bytes."""
+    target = cache_path(path)
+    data = _chunk(path, state.end, size, mtime_ns, end, rows)
+    try:
+        fd = os.open(target, os.O_WRONLY | os.O_APPEND)
+        try:
+            if os.fstat(fd).st_size > state.valid_bytes:
+                os.ftruncate(fd, state.valid_bytes)
+            os.write(fd, data)      # one write(): a short one fails the chunk's CRC and is cut off later
+        finally:
+            os.close(fd)
+    except OSError as e:
+        print(f"[run_cache] could not extend {target}: {e}")
+
+
+def discard(path: str) -> None:
+    """Drop the cache of `path` (after rewriting or removing the file)."""
+    try:
+        os.remove(cache_path(path))
+    except OSError:
+        pass
+
+
+# =========================
+# Loading
+# =========================
+def load_file(path: str) -> list:
+    """RunRecords of one log file, segment or archive, oldest first, through its cache."""
+    # A history is ~10 objects per run, all kept: generational GC passes over
+    # them while they're built would cost more than the load itself.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_file(path)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _load_file(path: str) -> list:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return []
+    state = read_cache(path)
+    rows, start = [], 0
+    if state is not None:
+        if state.size == st.st_size and state.mtime_ns == st.st_mtime_ns:
+            return [_from_row(row) for row in state.rows]
+        if run_store.tail_crc(path, state.end, TAIL_BYTES) == state.tail:
+            rows, start = state.rows, state.end
+    runs = [_from_row(row) for row in rows]
+    added = []
+    end = start
+    for run, _, end in run_store.iter_runs_from(start, path):
+        runs.append(run)
+        added.append(_to_row(run))
+    if start and state.chunks < MAX_CHUNKS:
+        append_cache(path, state, st.st_size, st.st_mtime_ns, end, added)
+    else:
+        write_cache(path, st.st_size, st.st_mtime_ns, end, rows + added)
+    return runs
+
+
+def load_runs(path: str = None) -> list:
+    """Every run of the log (path as for run_store.iter_runs), oldest first, through the caches."""
+    runs = []
+    for f in run_store.log_files(path):
+        runs += load_file(f)
+    return runs
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Build or clear the parsed run caches")
+    ap.add_argument("--log", default=None, help="run log file or segment directory (default: the live log)")
+    ap.add_argument("--clear", action="store_true", help="delete the caches instead of building them")
+    args = ap.parse_args(argv)
+
+    files = run_store.log_files(args.log)
+    if args.clear:
+        for f in files:
+            discard(f)
+        print(f"cleared caches for {len(files)} file(s)")
+        return 0
+    t0 = time.perf_counter()
+    runs = load_runs(args.log)
+    print(f"{len(runs)} runs from {len(files)} file(s) in {time.perf_counter() - t0:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# run_export.py
+import csv
+import gzip
+import json
+import os
+import threading
+import time
+
+from run_records import ts_to_epoch
+from run_store import access_filter, iter_runs_from, log_size, run_matches, run_units, time_bound
+
+# Bulk export of the run log to CSV, JSON or JSON Lines (optionally .gz), one run
+# at a time so memory stays flat however many runs match. Used by the CAD
+# Logs window (ExportJob, in a background thread) and ppm_report --out.
+
+FORMAT_CSV = "csv"
+FORMAT_JSON = "json"        # one array, streamed element by element
+FORMAT_JSONL = "jsonl"
+EXPORT_FIELDS = ("run_number", "timestamp", "caller", "location", "nature", "assigned",
+                 "notes", "statuses", "addendums")
+PROGRESS_INTERVAL = 0.2     # seconds between progress callbacks
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def run_to_dict(r) -> dict:
+    """Plain JSON-ready dict for a run (statuses as dicts, addendums as strings)."""
+    d = {k: r.get(k, "") for k in EXPORT_FIELDS}
+    d["statuses"] = [{"unit": st.get("unit", ""), "status": st.get("status", ""),
+                      "timestamp": st.get("timestamp", "")} for st in (r.get("statuses") or [])]
+    d["addendums"] = list(r.get("addendums") or [])
+    return d
+
+
+def flat_cell(value) -> str:
+    """One CSV / text cell: statuses as "UNIT|STATUS|TS; ...", addendums joined with "; "."""
+    if isinstance(value, list):
+        return "; ".join(f"{v['unit']}|{v['status']}|{v['timestamp']}" if isinstance(v, dict) else str(v)
+                         for v in value)
+    return str(value)
+
+
+def format_for(dest: str) -> str:
+    """csv / json / jsonl from the file name (a trailing .gz is ignored)."""
+    name = dest[:-3] if dest.endswith(".gz") else dest
+    if name.endswith((".jsonl", ".ndjson")):
+        return FORMAT_JSONL
+    return FORMAT_JSON if name.endswith(".json") else FORMAT_CSV
+
+
+def run_filter(since=None, until=None, units=None, nature=None, query=None,
+               username=None, is_admin=False, is_owner=False):
+    """Predicate(run) -> bool combining the export filters (None keeps every run)."""
+    lo, hi = ts_to_epoch(time_bound(since, False)), ts_to_epoch(time_bound(until, True))
+    dated = since is not None or until is not None
+    wanted = {u.strip().upper() for u in (units or []) if u.strip()}
+    nature = (nature or "").strip().lower()
+    query = (query or "").strip()
+    visible = access_filter(username, is_admin, is_owner) if username is not None else None
+    if not (dated or wanted or nature or query or visible):
+        return None
+
+    def keep(r):
+        if dated:
+            ts = r.ts
+            if not isinstance(ts, int) or (isinstance(lo, int) and ts < lo) or (isinstance(hi, int) and ts > hi):
+                return False
+        if wanted and not (wanted & run_units(r)):
+            return False
+        if nature and (r.get("nature") or "").strip().lower() != nature:
+            return False
+        if visible is not None and not visible(r):
+            return False
+        return run_matches(r, query)
+    return keep
+
+
+def export_runs(dest: str, fmt: str = None, fields=EXPORT_FIELDS, path: str = None,
+                progress=None, cancel=None, **filters) -> int:
+    """
+    Stream every run passing the filters (see run_filter) to dest. A ".gz"
+    suffix compresses. Written to dest + ".part" and renamed at the end, so a
+    failed or cancelled export never leaves a half file behind.
+
+    progress(written, scanned, fraction) is called every PROGRESS_INTERVAL
+    seconds; cancel is a threading.Event (raises ExportCancelled when set).
+    Returns the number of runs written.
+    """
+    fmt = fmt or format_for(dest)
+    keep = run_filter(**filters)
+    total = log_size(path)
+    tmp = dest + ".part"
+    if dest.endswith(".gz"):
+        out = gzip.open(tmp, "wt", encoding="utf-8", newline="", compresslevel=6)
+    else:
+        out = open(tmp, "w", encoding="utf-8", newline="")
+    written = scanned = 0
+    last = time.monotonic()
+    try:
+        with out:
+            writer = csv.writer(out) if fmt == FORMAT_CSV else None
+            if writer:
+                writer.writerow(fields)
+            elif fmt == FORMAT_JSON:
+                out.write("[")
+            for r, _, end in iter_runs_from(0, path):
+                scanned += 1
+                if keep is None or keep(r):
+                    d = run_to_dict(r)
+                    if writer:
+                        writer.writerow([flat_cell(d[f]) for f in fields])
+                    elif fmt == FORMAT_JSON:
+                        out.write(("," if written else "") + "\n  "
+                                  + json.dumps({f: d[f] for f in fields}, ensure_ascii=False))
+                    else:
+                        out.write(json.dumps({f: d[f] for f in fields}, ensure_ascii=False) + "\n")
+                    written += 1
+                if scanned % 256 == 0:
+                    if cancel is not None and cancel.is_set():
+                        raise ExportCancelled(f"export cancelled after {written} runs")
+                    now = time.monotonic()
+                    if progress and now - last >= PROGRESS_INTERVAL:
+                        last = now
+                        progress(written, scanned, end / total if total else 1.0)
+            if fmt == FORMAT_JSON:
+                out.write("\n]\n" if written else "]\n")
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if progress:
+        progress(written, scanned, 1.0)
+    return written
+
+
+class ExportJob(threading.Thread):
+    """
+    export_runs in a daemon thread. The GUI polls written / scanned /
+    fraction / done / error from Tk's after() loop; nothing here touches Tk.
+    """
+
+    def __init__(self, dest: str, **kwargs):
+        super().__init__(daemon=True, name="run-export")
+        self.dest = dest
+        self.kwargs = kwargs
+        self.cancel_event = threading.Event()
+        self.written = 0
+        self.scanned = 0
+        self.fraction = 0.0
+        self.result = None
+        self.error = None
+
+    def _progress(self, written, scanned, fraction):
+        self.written, self.scanned, self.fraction = written, scanned, fraction
+
+    def run(self):
+        try:
+            self.result = export_runs(self.dest, progress=self._progress,
+                                      cancel=self.cancel_event, **self.kwargs)
+        except Exception as e:
+            self.error = e
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def done(self) -> bool:
+        return not self.is_alive() and (self.result is not None or self.error is not None)
@@ -0,0 +1,164 @@
+# run_journal.py
+import json
+import os
+import re
+import time
+
+JOURNAL_DIR = "run_journal"
+FSYNC_EVERY = 16          # records between fsyncs
+FSYNC_INTERVAL = 1.0      # ...or seconds, whichever comes first (see RunJournals.sync)
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text or "") or "_"
+
+
+class RunJournal:
+    """
+    Append-only write-ahead log for one open run tab.
+
+    One JSON line per event ("field", "assign", "line", "reset"); the file is
+    created on the first record, so empty tabs leave nothing behind. Writes
+    are flushed to the OS immediately (a crashed process loses nothing) and
+    fsync'd in batches (every FSYNC_EVERY records, or by RunJournals.sync()).
+    """
+
+    def __init__(self, path: str, run_number: str):
+        self.path = path
+        self.run_number = run_number
+        self._f = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, kind: str, **data) -> None:
+        rec = {"k": kind, "t": round(time.time(), 3)}
+        rec.update(data)
+        if self._f is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            new = not os.path.exists(self.path)
+            torn = False
+            if not new:
+                with open(self.path, "rb") as f:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell():
+                        f.seek(-1, os.SEEK_END)
+                        torn = f.read(1) != b"\n"
+            self._f = open(self.path, "a", encoding="utf-8")
+            if new:
+                self._f.write(json.dumps({"k": "open", "t": rec["t"], "run": self.run_number}) + "\n")
+            elif torn:
+                self._f.write("\n")   # fence off a record cut short by a crash
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._f.flush()
+        self._unsynced += 1
+        if self._unsynced >= FSYNC_EVERY:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._f is not None and self._unsynced:
+            try:
+                os.fsync(self._f.fileno())
+            except OSError:
+                pass
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self, discard: bool = False) -> None:
+        if self._f is not None:
+            self.sync()
+            self._f.close()
+            self._f = None
+        if discard:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class RunJournals:
+    """Journals for one console's open runs, kept under JOURNAL_DIR/<user>/."""
+
+    def __init__(self, username: str, root: str = JOURNAL_DIR):
+        self.dir = os.path.join(root, _safe_name(username))
+        self._open = {}
+
+    def get(self, run_number: str) -> RunJournal:
+        j = self._open.get(run_number)
+        if j is None:
+            path = os.path.join(self.dir, _safe_name(run_number) + ".jnl")
+            j = self._open[run_number] = RunJournal(path, run_number)
+        return j
+
+    def record(self, run_number: str, kind: str, **data) -> None:
+        try:
+            self.get(run_number).append(kind, **data)
+        except Exception as e:
+            print(f"[run_journal] could not journal {run_number}: {e}")
+
+    def discard(self, run_number: str) -> None:
+        """Run submitted or closed: its journal is no longer needed."""
+        j = self._open.pop(run_number, None)
+        if j is not None:
+            j.close(discard=True)
+
+    def sync(self) -> bool:
+        """Batched fsync for journals idle longer than FSYNC_INTERVAL. Returns True if any were synced."""
+        now = time.monotonic()
+        synced = False
+        for j in self._open.values():
+            if j._unsynced and now - j._last_sync >= FSYNC_INTERVAL:
+                j.sync()
+                synced = True
+        return synced
+
+    def close_all(self) -> None:
+        for j in self._open.values():
+            j.close()
+        self._open.clear()
+
+    def pending_runs(self) -> list:
+        """[(run_number, state)] for every journal left behind by a previous session, oldest first."""
+        out = []
+        try:
+            names = sorted(os.listdir(self.dir))
+        except OSError:
+            return out
+        for name in names:
+            if not name.endswith(".jnl"):
+                continue
+            state = replay(os.path.join(self.dir, name))
+            if state and state.get("run"):
+                out.append((state["run"], state))
+        out.sort(key=lambda rs: rs[1].get("opened", 0))
+        return out
+
+
+def replay(path: str) -> dict:
+    """
+    Rebuild one run from its journal:
+    {"run", "opened", "fields": {name: value}, "assigned": [units], "notes": [lines]}.
+    A torn last line (crash mid-write) is skipped.
+    """
+    state = {"run": None, "opened": 0, "fields": {}, "assigned": [], "notes": []}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                kind = rec.get("k")
+                if kind == "open":
+                    state["run"] = rec.get("run")
+                    state["opened"] = rec.get("t", 0)
+                elif kind == "field":
+                    state["fields"][rec.get("name")] = rec.get("value", "")
+                elif kind == "assign":
+                    state["assigned"] = list(rec.get("units") or [])
+                elif kind == "line":
+                    state["notes"].append(rec.get("text", ""))
+                elif kind == "reset":
+                    state["notes"] = (rec.get("text") or "").split("\n")
+    except OSError:
+        return {}
+    return state
@@ -0,0 +1,168 @@
+# run_notes.py
+import re
+from datetime import datetime
+
+_STAMPED = re.compile(r"^\[([^\]\n]*)\] (.*)$")
+
+
+class NoteEntry:
+    __slots__ = ("ts", "text")
+
+    def __init__(self, ts, text):
+        self.ts = ts        # "HH:MM:SS" or None for un-timestamped lines
+        self.text = text
+
+    @classmethod
+    def parse(cls, line: str) -> "NoteEntry":
+        m = _STAMPED.match(line)
+        if m:
+            return cls(m.group(1), m.group(2))
+        return cls(None, line)
+
+    def render(self) -> str:
+        return f"[{self.ts}] {self.text}" if self.ts is not None else self.text
+
+
+def is_bare_prompt(line: str) -> bool:
+    """True for a lone "[12:34:56] " prompt nobody typed after."""
+    return (line.startswith("[") and line.count("]") == 1
+            and line.split("]")[1].strip() == "")
+
+
+class RunNotes:
+    """
+    Append-only notes for one run; the tk.Text in the run tab mirrors it.
+
+    Text is held as completed entries plus the open last line ("tail") the
+    dispatcher is typing into, so appends, prompt handling and last-line
+    checks never look at the rest of the notes. If the dispatcher edits an
+    earlier line, mark_stale() makes the next read re-parse the widget once.
+
+    listener(kind, text), if set, sees every committed line ("line") and
+    every full re-parse ("reset") - enough to journal the notes.
+    """
+
+    def __init__(self, widget=None, listener=None):
+        self.widget = widget
+        self.listener = listener
+        self.entries = []
+        self.tail = ""
+        self.stale = False
+
+    def _emit(self, kind: str, text: str) -> None:
+        if self.listener is not None:
+            try:
+                self.listener(kind, text)
+            except Exception as e:
+                print(f"[run_notes] listener failed: {e}")
+
+    # -------------------------
+    # Widget sync
+    # -------------------------
+    def _insert(self, s: str) -> None:
+        if self.widget is not None and s:
+            self.widget.insert("end", s)
+            self.widget.edit_modified(False)   # only user edits should trip check_widget()
+
+    def sync(self) -> None:
+        """Pull typed text from the widget: just the last line, or everything if marked stale."""
+        if self.widget is None:
+            return
+        if self.stale:
+            self.load(self.widget.get("1.0", "end-1c"))
+            self._emit("reset", "\n".join(e.render() for e in self.entries))
+        else:
+            self.tail = self.widget.get("end-1c linestart", "end-1c")
+
+    def mark_stale(self) -> None:
+        self.stale = True
+
+    def check_widget(self) -> None:
+        """
+        Call after user input. Typing on the open last line is picked up by
+        sync(); anything else (an earlier line edited, a multi-line paste)
+        marks the model stale. Only index lookups, no text is read.
+        """
+        w = self.widget
+        if w is None or self.stale or not w.edit_modified():
+            return
+        w.edit_modified(False)
+        last = int(w.index("end-1c").split(".")[0])
+        cursor = int(w.index("insert").split(".")[0])
+        if last != len(self.entries) + 1 or cursor < last:
+            self.stale = True
+
+    def load(self, text: str) -> None:
+        lines = (text or "").split("\n")
+        self.entries = [NoteEntry.parse(line) for line in lines[:-1]]
+        self.tail = lines[-1]
+        self.stale = False
+
+    def restore(self, lines) -> None:
+        """Refill an empty model + widget with previously committed lines (e.g. from a journal)."""
+        self.entries = [NoteEntry.parse(line) for line in lines]
+        self.tail = ""
+        self.stale = False
+        self._insert("".join(line + "\n" for line in lines))
+
+    # -------------------------
+    # Appends
+    # -------------------------
+    def _commit_tail(self) -> None:
+        self.entries.append(NoteEntry.parse(self.tail))
+        self._insert("\n")
+        self._emit("line", self.tail)
+        self.tail = ""
+
+    def _drop_bare_prompt(self) -> None:
+        if self.tail and is_bare_prompt(self.tail):
+            if self.widget is not None:
+                self.widget.delete(f"end-{len(self.tail) + 1}c", "end-1c")
+                self.widget.edit_modified(False)
+            self.tail = ""
+
+    def append(self, text: str, ts: str = None, stamp: bool = True) -> NoteEntry:
+        """Add a finished line (replacing a bare prompt); stamped with now unless stamp=False."""
+        self.sync()
+        self._drop_bare_prompt()
+        if self.tail:
+            self._commit_tail()
+        if stamp and ts is None:
+            ts = datetime.now().strftime("%H:%M:%S")
+        entry = NoteEntry(ts if stamp else None, text)
+        self.entries.append(entry)
+        self._insert(entry.render() + "\n")
+        self._emit("line", entry.render())
+        return entry
+
+    def new_line(self, ts: str = None) -> None:
+        """Return key: close the typed line and open a fresh "[ts] " prompt."""
+        self.sync()
+        self._commit_tail()
+        self.prompt(ts)
+
+    def prompt(self, ts: str = None) -> None:
+        """Open a "[ts] " prompt on its own line (no-op if one is already open)."""
+        self.sync()
+        if is_bare_prompt(self.tail):
+            return
+        if self.tail:
+            self._commit_tail()
+        self.tail = f"[{ts or datetime.now().strftime('%H:%M:%S')}] "
+        self._insert(self.tail)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def last_line(self) -> str:
+        if self.tail:
+            return self.tail
+        return self.entries[-1].render() if self.entries else ""
+
+    def text(self) -> str:
+        """Full notes text, as the widget shows it."""
+        self.sync()
+        return "\n".join([e.render() for e in self.entries] + [self.tail])
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,276 @@
+# run_records.py
+import re
+import sys
+from datetime import date, timedelta
+
+# Compact in-memory form of parsed run_log.txt blocks.
+#
+# A parsed history used to be plain dicts with a dict per status line, each
+# holding its own copies of the unit code, the status word and a 19-char
+# timestamp. Here unit / status / nature strings are interned (one object per
+# distinct value), timestamps are int seconds, and every record uses
+# __slots__. Records still answer r.get("caller"), r["statuses"], st.get("unit")
+# etc., so RunReportsWindow and the other dict readers work unchanged.
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+_EPOCH = date(1970, 1, 1)
+_ADDENDUM = re.compile(r"^\[([^\]\n]*)\] ([^:\n]*): (.*)$")
+
+# "YYYY-MM-DD" <-> days since 1970-01-01, filled lazily (a history spans a few thousand days)
+_day_number = {}
+_day_text = {}
+_second_of_day = {}     # "HH:MM:SS" -> seconds, at most 86400 entries
+
+
+def _intern(s):
+    return sys.intern(s) if s is not None else None
+
+
+def ts_to_epoch(s):
+    """
+    "YYYY-MM-DD HH:MM:SS" -> int seconds (naive, no timezone shift).
+    Anything else is returned unchanged so it renders back byte-for-byte.
+    """
+    if s is None or len(s) != 19 or s[10] != " ":
+        return s
+    day = _day_number.get(s[:10])
+    if day is None:
+        day = _learn_day(s[:10])
+        if day is None:
+            return s
+    sod = _second_of_day.get(s[11:])
+    if sod is None:
+        sod = _learn_time(s[11:])
+        if sod is None:
+            return s
+    return day * 86400 + sod
+
+
+def _learn_day(text: str):
+    try:
+        d = date.fromisoformat(text)
+    except ValueError:
+        return None
+    if d.isoformat() != text:
+        return None
+    day = _day_number[text] = (d - _EPOCH).days
+    _day_text[day] = text
+    return day
+
+
+def _learn_time(text: str):
+    hh, mm, ss = text[0:2], text[3:5], text[6:8]
+    if text[2] != ":" or text[5] != ":" or not (hh + mm + ss).isdigit():
+        return None
+    h, m, s = int(hh), int(mm), int(ss)
+    if h > 23 or m > 59 or s > 59:
+        return None
+    sod = _second_of_day[text] = h * 3600 + m * 60 + s
+    return sod
+
+
+def epoch_to_ts(value):
+    """Inverse of ts_to_epoch (strings and None pass through)."""
+    if not isinstance(value, int):
+        return value
+    day, secs = divmod(value, 86400)
+    text = _day_text.get(day)
+    if text is None:
+        text = _day_text[day] = (_EPOCH + timedelta(days=day)).isoformat()
+    h, rem = divmod(secs, 3600)
+    m, s = divmod(rem, 60)
+    return f"{text} {h:02d}:{m:02d}:{s:02d}"
+
+
+class _DictLike:
+    """Read-mostly mapping interface over __slots__; a None slot reads as a missing key."""
+    __slots__ = ()
+    KEYS = ()
+
+    def _value(self, key):
+        return getattr(self, key)
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        value = self._value(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key not in self.KEYS:
+            return default
+        value = self._value(key)
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return key in self.KEYS and self._value(key) is not None
+
+    def keys(self):
+        return [k for k in self.KEYS if self._value(k) is not None]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(k, self._value(k)) for k in self.keys()]
+
+    def values(self):
+        return [self._value(k) for k in self.keys()]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, _DictLike):
+            other = other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class StatusEvent(_DictLike):
+    """One "UNIT|STATUS|TS" line from a run's Statuses: section."""
+    __slots__ = ("unit", "status", "ts")
+    KEYS = ("unit", "status", "timestamp")
+
+    def __init__(self, unit, status, ts):
+        self.unit = sys.intern(unit)
+        self.status = sys.intern(status)
+        self.ts = ts            # epoch int, or the raw string if it wasn't TS_FORMAT
+
+    @classmethod
+    def parse(cls, line: str):
+        parts = line.split("|")
+        if len(parts) < 3:
+            return None
+        return cls(parts[0], parts[1], ts_to_epoch(parts[2]))
+
+    @classmethod
+    def from_dict(cls, d) -> "StatusEvent":
+        return cls(d.get("unit", ""), d.get("status", ""), ts_to_epoch(d.get("timestamp", "")))
+
+    def _value(self, key):
+        if key == "timestamp":
+            return epoch_to_ts(self.ts)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key == "timestamp":
+            self.ts = ts_to_epoch(value)
+        elif key in ("unit", "status"):
+            setattr(self, key, _intern(value))
+        else:
+            raise KeyError(key)
+
+
+class Addendum:
+    """One "[YYYY-MM-DD HH:MM:SS] author: text" line; str(a) gives the line back."""
+    __slots__ = ("ts", "author", "text")
+
+    def __init__(self, ts, author, text):
+        self.ts = ts            # epoch int / raw string; None for a free-form line
+        self.author = _intern(author)
+        self.text = text
+
+    @classmethod
+    def parse(cls, line: str) -> "Addendum":
+        m = _ADDENDUM.match(line)
+        if m:
+            return cls(ts_to_epoch(m.group(1)), m.group(2), m.group(3))
+        return cls(None, None, line)
+
+    def __str__(self):
+        if self.ts is None:
+            return self.text
+        return f"[{epoch_to_ts(self.ts)}] {self.author}: {self.text}"
+
+    def __repr__(self):
+        return f"Addendum({str(self)!r})"
+
+
+class RunRecord(_DictLike):
+    """
+    One run block. Same keys as the old parsed dict:
+    run_number, caller, location, nature, assigned, timestamp, notes,
+    statuses (StatusEvents), addendums (str).
+
+    The two list keys read as tuples, so the old r["addendums"].append(...)
+    raises instead of changing a throwaway copy. r["statuses"] holds the
+    live StatusEvents (r["statuses"][i]["status"] = ... does take effect);
+    r["addendums"] builds the strings on each access. Add through
+    r.statuses / r.add_addendum(), or assign r["statuses"] = [...].
+    to_dict() gives lists, as the old parsed dicts had.
+    """
+    __slots__ = ("run_number", "caller", "location", "nature", "assigned",
+                 "ts", "notes", "statuses", "addendums")
+    KEYS = ("notes", "statuses", "addendums", "run_number", "caller", "location",
+            "nature", "assigned", "timestamp")
+
+    def __init__(self, run_number=None, caller=None, location=None, nature=None,
+                 assigned=None, ts=None, notes="", statuses=None, addendums=None):
+        self.run_number = run_number
+        self.caller = caller
+        self.location = location
+        self.nature = _intern(nature)
+        self.assigned = assigned
+        self.ts = ts
+        self.notes = notes
+        self.statuses = statuses if statuses is not None else []
+        self.addendums = addendums if addendums is not None else []
+
+    @classmethod
+    def from_dict(cls, d) -> "RunRecord":
+        rec = cls()
+        for key, value in d.items():
+            rec[key] = value
+        return rec
+
+    def _value(self, key):
+        if key == "timestamp":
+            return epoch_to_ts(self.ts)
+        if key == "addendums":
+            return tuple(str(a) for a in self.addendums)
+        if key == "statuses":
+            return tuple(self.statuses)
+        return getattr(self, key)
+
+    def to_dict(self) -> dict:
+        d = dict(self.items())
+        for key in ("statuses", "addendums"):
+            if key in d:
+                d[key] = list(d[key])
+        return d
+
+    def __setitem__(self, key, value):
+        if key == "timestamp":
+            self.ts = ts_to_epoch(value)
+        elif key == "statuses":
+            self.statuses = [st if isinstance(st, StatusEvent) else StatusEvent.from_dict(st)
+                             for st in (value or [])]
+        elif key == "addendums":
+            self.addendums = [ad if isinstance(ad, Addendum) else Addendum.parse(ad)
+                              for ad in (value or [])]
+        elif key == "nature":
+            self.nature = _intern(value)
+        elif key in self.KEYS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def add_addendum(self, line: str) -> None:
+        self.addendums.append(Addendum.parse(line))
@@ -1,266 +1,17 @@
-import os
-import json
-from datetime import datetime
 import tkinter as tk
 import customtkinter as ctk
-from tkinter import messagebox
-from filelock import FileLock
+from tkinter import messagebox, filedialog
 
-# =========================
-# Files & constants
-# =========================
-RUN_LOG_FILE = "run_log.txt"        # Canonical log for runs
-RUN_LOG_LOCK = f"{RUN_LOG_FILE}.lock"
-USERS_FILE = "users.txt"            # username,password,first,last,bosk_id,is_temp,is_admin
-RESPONDER_USERS_FILE = "responder_users.json"  # {"41": ["dakota"], "42": ["alex","jordan"]}
-OWNER_BOSK_IDS = {"OWNER-001"}      # <-- update to your real owner BOSK ID(s)
-
-
-# =========================
-# Auth helpers
-# =========================
-def _load_users_from_file(path: str = USERS_FILE) -> dict:
-    """
-    Returns dict:
-      users[username_lower] = {
-        'username': str, 'password': str, 'first': str, 'last': str,
-        'bosk_id': str, 'is_temp': bool, 'is_admin': bool
-      }
-    """
-    users = {}
-    if not os.path.exists(path):
-        return users
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = [p.strip() for p in line.split(",")]
-            # username,password,first,last,bosk_id,is_temp,is_admin
-            if len(parts) < 7:
-                # tolerate short lines
-                parts += [""] * (7 - len(parts))
-            username, password, first, last, bosk_id, is_temp, is_admin = parts[:7]
-            users[username.lower()] = {
-                "username": username,
-                "password": password,
-                "first": first,
-                "last": last,
-                "bosk_id": (bosk_id or "").upper(),
-                "is_temp": (str(is_temp).strip().upper() in ("1", "TRUE", "YES", "Y")),
-                "is_admin": (str(is_admin).strip().upper() in ("1", "TRUE", "YES", "Y")),
-            }
-    return users
-
-
-def verify_credentials(username: str, password: str) -> tuple[bool, bool]:
-    """
-    Returns (is_valid, is_admin)
-    """
-    if not username or not password:
-        return (False, False)
-    users = _load_users_from_file()
-    rec = users.get(username.lower())
-    if not rec:
-        return (False, False)
-    if rec["password"] != password:
-        return (False, False)
-    return (True, bool(rec["is_admin"]))
-
-
-def is_owner(username: str) -> bool:
-    rec = _load_users_from_file().get((username or "").lower())
-    if not rec:
-        return False
-    return rec.get("bosk_id", "").upper() in OWNER_BOSK_IDS
-
-
-def _load_responder_users_map() -> dict:
-    """
-    Load responder->usernames mapping.
-    Normalizes usernames to lowercase strings and keys to str.
-    Example file:
-      { "41": ["dakota"], "42": ["alex","jordan"] }
-    """
-    if not os.path.exists(RESPONDER_USERS_FILE):
-        return {}
-    try:
-        with open(RESPONDER_USERS_FILE, "r", encoding="utf-8") as f:
-            raw = json.load(f)
-    except Exception:
-        return {}
-    mapping: dict[str, list[str]] = {}
-    for k, v in raw.items():
-        key = str(k).strip()
-        if not key:
-            continue
-        if isinstance(v, str):
-            usernames = [v.strip().lower()] if v.strip() else []
-        elif isinstance(v, list):
-            usernames = [str(x).strip().lower() for x in v if str(x).strip()]
-        else:
-            usernames = []
-        mapping[key] = usernames
-    return mapping
-
-
-def get_user_responder_ids(username: str) -> set[str]:
-    """Reverse-lookup: which responder IDs map to this username (lowercased)"""
-    username_l = (username or "").strip().lower()
-    if not username_l:
-        return set()
-    mapping = _load_responder_users_map()
-    out = {rid for rid, users in mapping.items() if username_l in users}
-    return out
-
-
-# =========================
-# Run log helpers
-# =========================
-def save_run_to_text(run_data: dict, statuses: dict) -> None:
-    """
-    Appends a new run block to run_log.txt
-    Format is designed to be human-readable and easily parsed.
-
-    Expected fields in run_data:
-      run_number, caller, location, nature, assigned (comma-separated), notes, timestamp (optional)
-    """
-    os.makedirs(os.path.dirname(RUN_LOG_FILE) or ".", exist_ok=True)
-    timestamp = run_data.get("timestamp") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    block = [
-        "=== RUN START ===",
-        f"RunNumber: {run_data.get('run_number','')}",
-        f"Caller: {run_data.get('caller','')}",
-        f"Location: {run_data.get('location','')}",
-        f"Nature: {run_data.get('nature','')}",
-        f"Assigned: {run_data.get('assigned','')}",
-        f"Timestamp: {timestamp}",
-        "Notes:",
-        (run_data.get("notes") or "").strip(),
-        "Statuses:"
-    ]
-
-    # statuses: { unit: {status, timestamp} }
-    for unit, st in (statuses or {}).items():
-        block.append(f"{unit}|{st.get('status','')}|{st.get('timestamp','')}")
-
-    block += [
-        "Addendums:",   # keep this literal; we'll append addendums after this line
-        "=== RUN END ===",
-        ""
-    ]
-
-    with FileLock(RUN_LOG_LOCK, timeout=5):
-        with open(RUN_LOG_FILE, "a", encoding="utf-8") as f:
-            f.write("\n".join(block) + "\n")
-
-
-def parse_runs_from_log():
-    """
-    Returns a list of dicts for each run block.
-    """
-    runs = []
-    if not os.path.exists(RUN_LOG_FILE):
-        return runs
-
-    with open(RUN_LOG_FILE, "r", encoding="utf-8") as f:
-        lines = [ln.rstrip("\n") for ln in f.readlines()]
-
-    cur = None
-    section = None
-    for ln in lines:
-        if ln == "=== RUN START ===":
-            cur = {"notes": "", "statuses": [], "addendums": []}
-            section = None
-            continue
-        if ln == "=== RUN END ===":
-            if cur:
-                runs.append(cur)
-            cur = None
-            section = None
-            continue
-        if cur is None:
-            continue
-
-        if ln.startswith("RunNumber: "):
-            cur["run_number"] = ln.split("RunNumber: ", 1)[1]
-        elif ln.startswith("Caller: "):
-            cur["caller"] = ln.split("Caller: ", 1)[1]
-        elif ln.startswith("Location: "):
-            cur["location"] = ln.split("Location: ", 1)[1]
-        elif ln.startswith("Nature: "):
-            cur["nature"] = ln.split("Nature: ", 1)[1]
-        elif ln.startswith("Assigned: "):
-            cur["assigned"] = ln.split("Assigned: ", 1)[1]
-        elif ln.startswith("Timestamp: "):
-            cur["timestamp"] = ln.split("Timestamp: ", 1)[1]
-        elif ln == "Notes:":
-            section = "notes"
-        elif ln == "Statuses:":
-            section = "statuses"
-        elif ln == "Addendums:":
-            section = "addendums"
-        else:
-            if section == "notes":
-                cur["notes"] += (ln + "\n")
-            elif section == "statuses":
-                # Format: UNIT|STATUS|TS
-                parts = ln.split("|")
-                if len(parts) >= 3:
-                    cur["statuses"].append({"unit": parts[0], "status": parts[1], "timestamp": parts[2]})
-            elif section == "addendums":
-                if ln.strip():
-                    cur["addendums"].append(ln)
-
-    return runs
-
-
-def append_addendum(run_number: str, author: str, text: str) -> None:
-    """
-    Appends an addendum line at the end of the target run block (after 'Addendums:').
-    To keep it simple, we rewrite the file.
-    """
-    runs = parse_runs_from_log()
-    if not runs:
-        raise RuntimeError("No runs found.")
-
-    found = False
-    for r in runs:
-        if r.get("run_number") == run_number:
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            r.setdefault("addendums", [])
-            r["addendums"].append(f"[{ts}] {author}: {text}")
-            found = True
-            break
-    if not found:
-        raise RuntimeError(f"Run not found: {run_number}")
-
-    # Rewrite file
-    out = []
-    for r in runs:
-        out += [
-            "=== RUN START ===",
-            f"RunNumber: {r.get('run_number','')}",
-            f"Caller: {r.get('caller','')}",
-            f"Location: {r.get('location','')}",
-            f"Nature: {r.get('nature','')}",
-            f"Assigned: {r.get('assigned','')}",
-            f"Timestamp: {r.get('timestamp','')}",
-            "Notes:",
-            (r.get("notes") or "").rstrip("\n"),
-            "Statuses:"
-        ]
-        for st in (r.get("statuses") or []):
-            out.append(f"{st.get('unit','')}|{st.get('status','')}|{st.get('timestamp','')}")
-        out += ["Addendums:"]
-        for ad in (r.get("addendums") or []):
-            out.append(ad)
-        out += ["=== RUN END ===", ""]
-
-    with FileLock(RUN_LOG_LOCK, timeout=5):
-        with open(RUN_LOG_FILE, "w", encoding="utf-8") as f:
-            f.write("\n".join(out) + "\n")
+# Storage / query side lives in run_store (no Tk); re-exported for existing callers.
+from run_search import PARALLEL_MIN_BYTES
+from run_store import (  # noqa: F401
+    RUN_LOG_FILE, RUN_LOG_LOCK, RUN_LOG_APPEND_MODE, run_log_target, run_log_queue,
+    save_run_to_text, iter_runs, iter_runs_from, parse_runs_from_log,
+    append_addendum, log_fingerprint, log_size, run_matches,
+    USERS_FILE, RESPONDER_USERS_FILE, OWNER_BOSK_IDS,
+    verify_credentials, is_owner, get_user_responder_ids,
+    tokenize_assigned, run_visible, access_filter,
+)
 
 
 # =========================
@@ -365,6 +116,7 @@ class RunReportsWindow(ctk.CTkToplevel):
         ctk.CTkButton(top, text="Search", command=self._on_search).pack(side="left")
         ctk.CTkButton(top, text="Clear", command=self._on_clear).pack(side="left", padx=(6, 0))
         self.search_entry.bind("<Return>", lambda _e: self._on_search())
+        self.search_entry.bind("<KeyRelease>", self._on_query_edit)
 
         # Main split
         main = ctk.CTkFrame(self)
@@ -395,11 +147,18 @@ class RunReportsWindow(ctk.CTkToplevel):
         bottom.pack(fill="x", padx=10, pady=(0, 10))
         ctk.CTkButton(bottom, text="Refresh", command=self.refresh).pack(side="right", padx=4)
         ctk.CTkButton(bottom, text="Open", command=self.open_selected).pack(side="right", padx=4)
+        self.export_btn = ctk.CTkButton(bottom, text="Export…", command=self.on_export)
+        self.export_btn.pack(side="left", padx=4)
+        self.export_var = tk.StringVar(value="")
+        ctk.CTkLabel(bottom, textvariable=self.export_var).pack(side="left", padx=8)
+        self.export_job = None
 
         # Data
         self.all_runs = []
         self.filtered_runs = []
         self.current_run_number = None
+        self.search_job = None
+        self.search_hits = []
 
         self.refresh()
 
@@ -413,31 +172,7 @@ class RunReportsWindow(ctk.CTkToplevel):
         return needle in (hay or "").lower()
 
     def _run_matches(self, r: dict, q: str) -> bool:
-        if not q:
-            return True
-        q = q.lower().strip()
-        # fields
-        fields = [
-            r.get("run_number", ""),
-            r.get("caller", ""),
-            r.get("location", ""),
-            r.get("nature", ""),
-            r.get("assigned", ""),
-            r.get("notes", ""),
-        ]
-        if any(self._contains(f.lower(), q) for f in fields):
-            return True
-        # statuses: unit, status, timestamp
-        for st in (r.get("statuses") or []):
-            if (self._contains(st.get("unit", "").lower(), q) or
-                self._contains(st.get("status", "").lower(), q) or
-                self._contains(st.get("timestamp", "").lower(), q)):
-                return True
-        # addendums
-        for ad in (r.get("addendums") or []):
-            if self._contains(ad.lower(), q):
-                return True
-        return False
+        return run_matches(r, q)
 
     def _filter_runs_by_query(self, runs: list[dict], query: str) -> list[dict]:
         return [r for r in runs if self._run_matches(r, query)]
@@ -445,23 +180,7 @@ class RunReportsWindow(ctk.CTkToplevel):
     # -------------------------
     # Access control
     # -------------------------
-    @staticmethod
-    def _tokenize_assigned(assigned_str: str) -> tuple[set[str], set[str]]:
-        """
-        Returns (tokens_all_lower, responder_id_tokens)
-        - tokens are split on commas
-        - responder_id_tokens are numeric-like strings (e.g., "41")
-        """
-        tokens = set()
-        ids = set()
-        for raw in (assigned_str or "").replace(";", ",").split(","):
-            tok = raw.strip()
-            if not tok:
-                continue
-            tokens.add(tok.lower())
-            if tok.isdigit():
-                ids.add(tok)
-        return tokens, ids
+    _tokenize_assigned = staticmethod(tokenize_assigned)
 
     def _user_has_access_to_run(self, r: dict) -> bool:
         """
@@ -473,32 +192,66 @@ class RunReportsWindow(ctk.CTkToplevel):
         """
         if self.is_admin or self.is_owner:
             return True
-
-        assigned = r.get("assigned", "") or ""
-        tokens_all, id_tokens = self._tokenize_assigned(assigned)
-
-        # Username listed directly in Assigned
-        if (self.username or "").strip().lower() in tokens_all:
-            return True
-
-        # Responder mapping
-        my_ids = get_user_responder_ids(self.username)
-        return len(my_ids & id_tokens) > 0
+        return run_visible(r, self.username, get_user_responder_ids(self.username))
 
     def _apply_access_filter(self, runs: list[dict]) -> list[dict]:
-        return [r for r in runs if self._user_has_access_to_run(r)]
+        visible = access_filter(self.username, self.is_admin, self.is_owner)
+        return list(runs) if visible is None else [r for r in runs if visible(r)]
 
     # -------------------------
     # UI actions
     # -------------------------
     def _on_search(self):
         q = self.search_entry.get().strip()
+        self._cancel_search()
+        if q and log_size() >= PARALLEL_MIN_BYTES:
+            self._start_parallel_search(q)
+            return
         self._populate_list(self._filter_runs_by_query(self.filtered_runs, q))
 
     def _on_clear(self):
+        self._cancel_search()
         self.search_entry.delete(0, "end")
         self._populate_list(self.filtered_runs)
 
+    # Large histories: search the log across cores (run_search), hits stream into the list
+    def _start_parallel_search(self, q: str):
+        from run_search import RunSearch, SearchJob
+
+        self.search_hits = []
+        self.listbox.delete(0, "end")
+        self.search_job = SearchJob(RunSearch(query=q, username=self.username,
+                                              is_admin=self.is_admin, is_owner=self.is_owner))
+        self.search_job.query = q
+        self.search_job.start()
+        self.after(100, self._poll_search)
+
+    def _poll_search(self):
+        job = self.search_job
+        if job is None:
+            return
+        for r in job.hits[len(self.search_hits):]:
+            self.search_hits.append(r)
+            self.listbox.insert("end", f"{r.get('run_number', 'Run ?')}  —  {r.get('timestamp', '')}")
+        if job.error is not None:
+            self.search_job = None
+            messagebox.showerror("Search Failed", f"Could not search runs:\n{job.error}", parent=self)
+        elif job.done:
+            self.search_job = None
+        else:
+            self.after(100, self._poll_search)
+
+    def _cancel_search(self):
+        if self.search_job is not None:
+            self.search_job.cancel()
+            self.search_job = None
+
+    def _on_query_edit(self, _e=None):
+        # a running search is for the old text; drop it as soon as the query changes
+        job = self.search_job
+        if job is not None and self.search_entry.get().strip() != job.query:
+            self._cancel_search()
+
     def refresh(self):
         self.all_runs = parse_runs_from_log()
         # Apply access control first
@@ -507,6 +260,7 @@ class RunReportsWindow(ctk.CTkToplevel):
         self._populate_list(self.filtered_runs)
 
     def _populate_list(self, runs: list[dict]):
+        self.search_hits = []
         self.listbox.delete(0, "end")
         for r in runs:
             rn = r.get("run_number", "Run ?")
@@ -519,7 +273,7 @@ class RunReportsWindow(ctk.CTkToplevel):
             return None
         label = self.listbox.get(sel[0])
         run_number = label.split("—")[0].strip()
-        for r in self.filtered_runs:
+        for r in self.search_hits or self.filtered_runs:
             if r.get("run_number") == run_number:
                 return r
         return None
@@ -562,6 +316,50 @@ class RunReportsWindow(ctk.CTkToplevel):
         # Store current selection
         self.current_run_number = r.get("run_number")
 
+    # -------------------------
+    # Bulk export
+    # -------------------------
+    def on_export(self):
+        """Export every run this user can see that matches the search box (background thread)."""
+        from run_export import ExportJob
+
+        if self.export_job is not None and self.export_job.is_alive():
+            self.export_job.cancel()
+            return
+        dest = filedialog.asksaveasfilename(
+            parent=self, title="Export runs", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz"), ("JSON", "*.json"),
+                       ("JSON Lines", "*.jsonl"), ("JSON Lines (gzip)", "*.jsonl.gz")],
+        )
+        if not dest:
+            return
+        self.export_job = ExportJob(dest, query=self.search_entry.get().strip(),
+                                    username=self.username, is_admin=self.is_admin, is_owner=self.is_owner)
+        self.export_job.start()
+        self.export_btn.configure(text="Cancel export")
+        self.export_var.set("Exporting…")
+        self.after(200, self._poll_export)
+
+    def _poll_export(self):
+        job = self.export_job
+        if job is None:
+            return
+        if job.is_alive():
+            self.export_var.set(f"Exporting… {job.written} runs ({job.fraction:.0%})")
+            self.after(200, self._poll_export)
+            return
+        self.export_btn.configure(text="Export…")
+        self.export_job = None
+        if job.cancel_event.is_set():
+            self.export_var.set("Export cancelled")
+            return
+        if job.error is not None:
+            self.export_var.set("Export failed")
+            messagebox.showerror("Export Failed", f"Could not export runs:\n{job.error}", parent=self)
+            return
+        self.export_var.set(f"Exported {job.result} runs")
+        messagebox.showinfo("Export", f"{job.result} runs exported to {job.dest}.", parent=self)
+
     def on_addendum(self):
         txt = self.addendum_entry.get().strip()
         if not txt:
@@ -0,0 +1,390 @@
+# run_search.py
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from run_export import run_filter
+from run_store import (ARCHIVE_SUFFIX, RUN_END, RUN_START, SUMMARY_DIR, iter_runs_from, log_files,
+                       log_size, parse_raw_block, run_matches, segment_dir)
+
+# Multi-core search over the run history and the shift summaries.
+#
+# The history is cut into shards - one per month segment (or archive) on a
+# segmented log, byte ranges of about SHARD_BYTES aligned to RUN START lines
+# of a single run_log.txt - and each shard is parsed and filtered in a worker
+# process. Shards are handed back in log order as soon as they and every
+# shard before them are done, so results stream in oldest-first (newest-first
+# with reverse=True) and a caller can stop after the first page. Histories
+# under PARALLEL_MIN_BYTES are searched in-process: starting workers costs
+# more than it saves there.
+#
+# Free-text queries take a raw grep path: each log file is memory-mapped and
+# a compiled bytes regex runs over the whole buffer; only around a hit are the
+# RUN START / RUN END lines located and that one block parsed, then checked
+# with run_matches so results equal the parsed search. Nothing is split into
+# lines or decoded for blocks without a hit.
+
+SHARD_BYTES = 8 << 20
+PARALLEL_MIN_BYTES = 32 << 20
+SUMMARY_SHARD_FILES = 64
+_POLL = 0.1                         # seconds between cancel checks while waiting on a shard
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def get_pool(jobs: int = None) -> ProcessPoolExecutor:
+    """Process pool shared by every search in this process (started on first use)."""
+    global _pool
+    jobs = jobs or default_jobs()
+    with _pool_lock:
+        if _pool is None or _pool._max_workers != jobs:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn, not fork: searches start from a thread of the running Tk
+            # process, and forking a multithreaded process can deadlock the child
+            _pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# =========================
+# Workers (module level so they pickle)
+# =========================
+def _search_run_shard(path, start, end, filters, reverse):
+    pattern = grep_pattern(filters.get("query"))
+    if pattern is not None:
+        keep = run_filter(**dict(filters, query=None))
+        hits = [r for r in _grep_file(path, pattern, filters["query"], start, end) if keep is None or keep(r)]
+    else:
+        keep = run_filter(**filters)
+        hits = []
+        for run, block_start, _ in iter_runs_from(start, path):
+            if end is not None and block_start >= end:
+                break
+            if keep is None or keep(run):
+                hits.append(run)
+    # Timestamp order inside the shard; runs without one stay where they were, last
+    hits.sort(key=lambda r: (0, r.ts) if isinstance(r.ts, int) else (1, 0))
+    if reverse:
+        hits.reverse()
+    return hits
+
+
+def _search_summary_shard(summary_dir, names, pack, needle, reverse):
+    hits = []
+    if pack is not None:
+        from archive_store import iter_members
+        members = iter_members(pack)
+    else:
+        members = ((n, _read_bytes(os.path.join(summary_dir, n))) for n in names)
+    for name, data in members:
+        text = data.decode("utf-8", errors="replace")
+        if needle in name.lower() or needle in text.lower():
+            hits.append(name)
+    hits.sort(reverse=reverse)
+    return hits
+
+
+def _read_bytes(path) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+# =========================
+# Raw grep (mmap)
+# =========================
+_START = RUN_START.encode()
+_END = b"\n" + RUN_END.encode()
+
+
+def grep_pattern(query):
+    """
+    Compiled bytes regex for a run_matches query, or None when raw grep can't
+    stand in for it: an empty query, or non-ASCII text (bytes IGNORECASE
+    folds ASCII only, run_matches uses str.lower()).
+    """
+    q = (query or "").strip().lower()
+    if not q or not q.isascii():
+        return None
+    return re.compile(re.escape(q.encode()), re.IGNORECASE if any(c.isalpha() for c in q) else 0)
+
+
+def _block_end(buf, frm: int) -> int:
+    """Offset just past the newline of the first exact RUN END line at/after frm, or -1."""
+    while True:
+        i = buf.find(_END, frm)
+        if i < 0:
+            return -1
+        j = i + len(_END)
+        if buf[j:j + 1] == b"\n":
+            return j + 1
+        if buf[j:j + 2] == b"\r\n":
+            return j + 2
+        frm = j
+
+
+def _start_line(buf, lo: int, hi: int) -> int:
+    """Offset of the last RUN START marker in buf[lo:hi] that ends its line, or -1."""
+    while True:
+        i = buf.rfind(_START, lo, hi)
+        if i < 0:
+            return -1
+        j = i + len(_START)
+        if buf[j:j + 1] == b"\n" or buf[j:j + 2] == b"\r\n":
+            return i
+        hi = j - 1
+
+
+def _grep_buffer(buf, pattern, query: str, lo: int = 0, hi: int = None) -> list:
+    """Runs whose block starts in buf[lo:hi], has a pattern hit and passes run_matches."""
+    hits = []
+    hi = len(buf) if hi is None else min(hi, len(buf))
+    pos = lo
+    while pos < hi:
+        m = pattern.search(buf, pos, hi)
+        if m is None:
+            break
+        at = m.start()
+        start = _start_line(buf, 0, at + len(_START))
+        if start < 0:
+            pos = at + 1
+            continue
+        end = _block_end(buf, start)
+        if end < 0:
+            break                       # torn tail: no complete block from here on
+        if at >= end:
+            pos = at + 1                # hit between blocks
+            continue
+        # A later START line resets the block, as in run_store._scan_from: the
+        # hit is in a torn block, whose text never belongs to the next run.
+        reset = _start_line(buf, max(at, start + 1), end)
+        if reset >= 0:
+            pos = reset
+            continue
+        if buf.rfind(b"\n", 0, start) + 1 >= lo:
+            run = parse_raw_block(buf[start:end])
+            if run_matches(run, query):
+                hits.append(run)
+        pos = end
+    return hits
+
+
+def _grep_file(path: str, pattern, query: str, lo: int = 0, hi: int = None) -> list:
+    """
+    _grep_buffer over a memory-mapped segment / run_log.txt, or block by block
+    over an archive (offsets are the uncompressed ones). The map is closed
+    before returning, so it never holds up a rewrite of the file.
+    """
+    if path.endswith(ARCHIVE_SUFFIX):
+        from archive_store import iter_pack, select_blocks
+        blocks = [b for b in select_blocks(path, offset=lo) if hi is None or b["raw_start"] < hi]
+        hits = []
+        for entry, data in iter_pack(path, blocks):
+            base = entry["raw_start"]
+            hits += _grep_buffer(data, pattern, query, max(0, lo - base), None if hi is None else hi - base)
+        return hits
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):       # missing or empty file
+        return []
+    with mm:
+        return _grep_buffer(mm, pattern, query, lo, hi)
+
+
+# =========================
+# Searches
+# =========================
+class _ShardedSearch(ABC):
+    """Iterate for hits; cancel() (from any thread) stops the iteration and drops queued shards."""
+
+    worker = None
+
+    def __init__(self, jobs: int = None, reverse: bool = False):
+        self.jobs = jobs
+        self.reverse = reverse
+        self.shards_total = 0
+        self.shards_done = 0
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @abstractmethod
+    def _shards(self) -> list:
+        """Worker argument tuples, in log order."""
+
+    def _parallel(self) -> bool:
+        return False
+
+    def __iter__(self):
+        shards = self._shards()
+        if self.reverse:
+            shards.reverse()
+        self.shards_total = len(shards)
+        jobs = self.jobs or default_jobs()
+        if jobs <= 1 or len(shards) <= 1 or not self._parallel():
+            for args in shards:
+                if self.cancelled:
+                    return
+                hits = type(self).worker(*args)
+                self.shards_done += 1
+                yield from self._until_cancelled(hits)
+            return
+
+        pool = get_pool(jobs)
+        futures = [pool.submit(type(self).worker, *args) for args in shards]
+        try:
+            for fut in futures:
+                while not fut.done():
+                    if self.cancelled:
+                        return
+                    wait([fut], timeout=_POLL, return_when=FIRST_COMPLETED)
+                if self.cancelled:
+                    return
+                self.shards_done += 1
+                yield from self._until_cancelled(fut.result())
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+    def _until_cancelled(self, hits):
+        for hit in hits:
+            if self.cancelled:
+                return
+            yield hit
+
+
+class RunSearch(_ShardedSearch):
+    """
+    Runs matching the run_export.run_filter filters (query, since/until,
+    units, nature, username/is_admin/is_owner), oldest first, or newest first
+    with reverse=True.
+
+        for run in RunSearch(query="chest pain", since="2020-01-01"): ...
+    """
+
+    worker = staticmethod(_search_run_shard)
+
+    def __init__(self, path: str = None, jobs: int = None, reverse: bool = False, **filters):
+        super().__init__(jobs, reverse)
+        self.path = path
+        self.filters = filters
+
+    def _parallel(self) -> bool:
+        return log_size(self.path) >= PARALLEL_MIN_BYTES
+
+    def _shards(self) -> list:
+        files = log_files(self.path, self.filters.get("since"), self.filters.get("until"))
+        if segment_dir(self.path) is not None or not files or files[0].endswith(ARCHIVE_SUFFIX):
+            return [(f, 0, None, self.filters, self.reverse) for f in files]
+        path = files[0]
+        cuts = _block_cuts(path, SHARD_BYTES)
+        return [(path, start, end, self.filters, self.reverse)
+                for start, end in zip(cuts, cuts[1:] + [None])]
+
+
+def _block_cuts(path: str, every: int) -> list:
+    """Byte offsets of RUN START lines roughly `every` bytes apart (always starting with 0)."""
+    marker = b"\n" + RUN_START.encode()
+    size = os.path.getsize(path)
+    cuts = [0]
+    with open(path, "rb") as f:
+        pos = every
+        while pos < size:
+            f.seek(pos - 1)
+            window = f.read(1 << 20)
+            if len(window) <= len(marker):
+                break
+            i = window.find(marker)
+            if i < 0:
+                pos += len(window) - len(marker)
+                continue
+            cut = pos - 1 + i + 1
+            cuts.append(cut)
+            pos = cut + every
+    return cuts
+
+
+class SummarySearch(_ShardedSearch):
+    """Shift summary file names whose name or text contains the query (case-insensitive), by name."""
+
+    worker = staticmethod(_search_summary_shard)
+
+    def __init__(self, query: str, summary_dir: str = SUMMARY_DIR, jobs: int = None, reverse: bool = False):
+        super().__init__(jobs, reverse)
+        self.summary_dir = summary_dir
+        self.needle = (query or "").strip().lower()
+        self._bytes = 0
+
+    def _parallel(self) -> bool:
+        return self._bytes >= PARALLEL_MIN_BYTES
+
+    def _shards(self) -> list:
+        try:
+            entries = sorted(os.scandir(self.summary_dir), key=lambda e: e.name)
+        except OSError:
+            return []
+        loose = [e for e in entries if e.name.endswith(".txt")]
+        packs = [e for e in entries if e.name.endswith(ARCHIVE_SUFFIX)]
+        self._bytes = sum(e.stat().st_size for e in loose) + 8 * sum(e.stat().st_size for e in packs)
+        shards = [(e.name, (self.summary_dir, None, e.path, self.needle, self.reverse)) for e in packs]
+        names = [e.name for e in loose]
+        shards += [(names[i], (self.summary_dir, names[i:i + SUMMARY_SHARD_FILES], None, self.needle, self.reverse))
+                   for i in range(0, len(names), SUMMARY_SHARD_FILES)]
+        # by first name: "YYYY-MM.pack" sorts before that month's "YYYY-MM-DD_..." files
+        return [args for _, args in sorted(shards, key=lambda s: s[0])]
+
+
+class SearchJob(threading.Thread):
+    """
+    Drains a RunSearch / SummarySearch in a daemon thread. The GUI polls
+    `hits` (grows as shards finish), `done` and `error` from Tk's after()
+    loop; cancel() when the query changes.
+    """
+
+    def __init__(self, search: _ShardedSearch):
+        super().__init__(daemon=True, name="search")
+        self.search = search
+        self.hits = []
+        self.error = None
+        self.finished = False
+
+    def run(self):
+        try:
+            for hit in self.search:
+                self.hits.append(hit)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+    def cancel(self) -> None:
+        self.search.cancel()
+
+    @property
+    def done(self) -> bool:
+        return self.finished
@@ -0,0 +1,330 @@
+# run_segments.py
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+from filelock import FileLock
+
+import run_cache
+import run_store
+
+# Month-segmented layout for the run log:
+#
+#   run_log/2024-04.pack     closed and compacted (archive_store.py), read block by block
+#   run_log/2024-05.txt      closed: its month has ended, nothing appends to it
+#   run_log/2024-06.txt      active: the current month, new runs are appended here
+#   run_log/manifest.json    per segment: bytes, run count, Timestamp range, run-number range
+#
+# Segment files use the run_log.txt block format unchanged. The layout is
+# switched on by run_log/manifest.json existing (`python run_segments.py split`
+# converts an existing run_log.txt); until then everything keeps using
+# run_log.txt. Readers ask segments_for() which files can hold matching runs,
+# so a one-month query opens one file however long the history gets.
+#
+# The manifest is a cache over the directory listing: a segment file missing
+# from it, or whose size no longer matches, is rescanned - from where the
+# last scan stopped when the file only grew (the active month after an
+# append), else in full. Full scans are written back so other processes
+# don't repeat them.
+
+SEGMENT_DIR = "run_log"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+_SEGMENT_FILE = re.compile(r"^(\d{4}-\d{2})\.(txt|pack)$")
+_RUN_DIGITS = re.compile(r"(\d+)\s*$")
+
+_manifests = {}     # abs segment dir -> [manifest mtime_ns, {month: entry}]
+
+
+def manifest_path(seg_dir: str = SEGMENT_DIR) -> str:
+    return os.path.join(seg_dir, MANIFEST_NAME)
+
+
+def is_segmented(seg_dir: str = SEGMENT_DIR) -> bool:
+    return os.path.exists(manifest_path(seg_dir))
+
+
+def month_of(ts: str):
+    """"YYYY-MM" of a "YYYY-MM-DD HH:MM:SS" timestamp, or None if it isn't one."""
+    if not ts or len(ts) < 10 or ts[4] != "-" or ts[7] != "-" or not (ts[:4] + ts[5:7]).isdigit():
+        return None
+    return ts[:7]
+
+
+def current_month(now: datetime = None) -> str:
+    return (now or datetime.now()).strftime("%Y-%m")
+
+
+def active_segment(seg_dir: str = SEGMENT_DIR, now: datetime = None) -> str:
+    """Segment file new runs go to: the current month's, whatever the run's own Timestamp."""
+    return os.path.join(seg_dir, f"{current_month(now)}.txt")
+
+
+def run_number_value(run_number):
+    """Trailing digits of a run number ("Run 1042" -> 1042), or None."""
+    m = _RUN_DIGITS.search(run_number or "")
+    return int(m.group(1)) if m else None
+
+
+def wanted_run_numbers(run_number):
+    """Run numbers as ints for range pruning, or None when run_number can't be pruned on."""
+    if run_number is None or callable(run_number):
+        return None
+    values = [run_number_value(rn) for rn in ([run_number] if isinstance(run_number, str) else run_number)]
+    return None if None in values else values
+
+
+def may_contain(ranges: dict, since: str = None, until: str = None, wanted=None) -> bool:
+    """Whether a segment / archive block with these RunRanges can hold a matching run."""
+    if since is not None or until is not None:
+        if ranges["first_ts"] is None:
+            return False
+        if (since is not None and ranges["last_ts"] < since) or (until is not None and ranges["first_ts"] > until):
+            return False
+    if wanted is not None and not ranges["unnumbered"]:
+        lo, hi = ranges["min_run"], ranges["max_run"]
+        if lo is None or not any(lo <= n <= hi for n in wanted):
+            return False
+    return True
+
+
+class RunRanges:
+    """Run count, Timestamp range and run-number range over some run blocks."""
+
+    def __init__(self):
+        self.runs = self.unnumbered = 0
+        self.first_ts = self.last_ts = self.min_run = self.max_run = None
+
+    def add(self, lines) -> None:
+        """Count one block from its raw lines (only the header lines are looked at)."""
+        self.runs += 1
+        rn = ts = None
+        for ln in lines:
+            if ln.startswith("RunNumber: "):
+                rn = ln[11:]
+            elif ln.startswith("Timestamp: "):
+                ts = ln[11:]
+        if month_of(ts):
+            self.first_ts = ts if self.first_ts is None or ts < self.first_ts else self.first_ts
+            self.last_ts = ts if self.last_ts is None or ts > self.last_ts else self.last_ts
+        n = run_number_value(rn)
+        if n is None:
+            self.unnumbered += 1
+        else:
+            self.min_run = n if self.min_run is None or n < self.min_run else self.min_run
+            self.max_run = n if self.max_run is None or n > self.max_run else self.max_run
+
+    def merge(self, other: dict) -> None:
+        """Fold in another as_dict() (e.g. an archive block's index entry)."""
+        self.runs += other["runs"]
+        self.unnumbered += other["unnumbered"]
+        for key, pick in (("first_ts", min), ("last_ts", max), ("min_run", min), ("max_run", max)):
+            mine, theirs = getattr(self, key), other[key]
+            setattr(self, key, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+
+    def as_dict(self) -> dict:
+        return {"runs": self.runs, "first_ts": self.first_ts, "last_ts": self.last_ts,
+                "min_run": self.min_run, "max_run": self.max_run, "unnumbered": self.unnumbered}
+
+
+# =========================
+# Manifest
+# =========================
+def scan_segment(path: str) -> dict:
+    """
+    Manifest entry for one segment file. "bytes" is the uncompressed size (the
+    segment's length in iter_runs_from offsets), "stored" its size on disk,
+    "end" the offset after its last complete block and "tail" the
+    run_store.tail_crc there (so a grown segment can be extended, see _scan).
+    """
+    return _scan(path)[0]
+
+
+def _scan(path: str, prev: dict = None):
+    """(entry, extended): a text segment that only grew since prev is read from prev["end"] on."""
+    stored = os.path.getsize(path)
+    ranges = RunRanges()
+    if path.endswith(run_store.ARCHIVE_SUFFIX):
+        from archive_store import read_index
+        index = read_index(path)
+        for block in index["blocks"]:
+            ranges.merge(block)
+        size = end = index["raw_bytes"]
+        extended = False
+    else:
+        size = end = stored
+        extended = (prev is not None and prev.get("file") == os.path.basename(path)
+                    and prev.get("end") is not None and prev["end"] <= stored
+                    and prev.get("tail") == run_store.tail_crc(path, prev["end"]))
+        if extended:
+            ranges.merge(prev)
+        start = end = prev["end"] if extended else 0
+        for lines, _, end in run_store.iter_runs_from(start, path, raw=True):
+            ranges.add(lines)
+    entry = dict(ranges.as_dict(), file=os.path.basename(path), bytes=size, stored=stored, end=end,
+                 tail=None if path.endswith(run_store.ARCHIVE_SUFFIX) else run_store.tail_crc(path, end))
+    return entry, extended
+
+
+def _read_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return dict(data.get("segments") or {})
+
+
+def save_manifest(seg_dir: str, segments: dict) -> None:
+    """Atomically replace manifest.json."""
+    path = manifest_path(seg_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "segments": segments}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+    _manifests[os.path.abspath(seg_dir)] = [os.stat(path).st_mtime_ns, dict(segments)]
+
+
+def load_manifest(seg_dir: str = SEGMENT_DIR) -> dict:
+    """{month: entry} for every segment file in seg_dir, oldest first, each entry current."""
+    key = os.path.abspath(seg_dir)
+    try:
+        mtime = os.stat(manifest_path(seg_dir)).st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _manifests.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = _manifests[key] = [mtime, _read_manifest(manifest_path(seg_dir))]
+    known = cached[1]
+    active = current_month()
+    out = {}
+    dirty = False
+    try:
+        names = sorted(os.listdir(seg_dir))
+    except OSError:
+        return out
+    for name in names:
+        m = _SEGMENT_FILE.match(name)
+        if not m:
+            continue
+        month = m.group(1)
+        if m.group(2) == "pack" and f"{month}.txt" in names:
+            continue        # compaction was interrupted (or the month reopened); the text file wins
+        path = os.path.join(seg_dir, name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        entry = known.get(month)
+        if entry is None or entry.get("file") != name or entry.get("stored") != size:
+            entry, extended = _scan(path, entry)
+            known[month] = entry
+            # full scans are written back for other processes; extending the
+            # active month after an append is cheap enough to redo anywhere
+            dirty = dirty or not extended or month < active
+        entry["closed"] = month < active
+        out[month] = entry
+    if dirty and mtime is not None:
+        try:
+            save_manifest(seg_dir, out)
+        except OSError as e:
+            print(f"[run_segments] could not update manifest: {e}")
+    return out
+
+
+def segment_spans(seg_dir: str = SEGMENT_DIR) -> list:
+    """[(path, base, size)] oldest first; base is the segment's offset in the concatenated log."""
+    spans = []
+    base = 0
+    for entry in load_manifest(seg_dir).values():
+        spans.append((os.path.join(seg_dir, entry["file"]), base, entry["bytes"]))
+        base += entry["bytes"]
+    return spans
+
+
+def segments_for(seg_dir: str = SEGMENT_DIR, since: str = None, until: str = None,
+                 run_number=None) -> list:
+    """
+    Segment paths, oldest first, that can hold a run with a Timestamp in
+    [since, until] ("YYYY-MM-DD HH:MM:SS" strings, see run_store.time_bound)
+    and a run number accepted by run_number (string / collection as in
+    run_store.iter_runs; a callable can't be pruned on).
+    """
+    wanted = wanted_run_numbers(run_number)
+    return [os.path.join(seg_dir, entry["file"]) for entry in load_manifest(seg_dir).values()
+            if may_contain(entry, since, until, wanted)]
+
+
+# =========================
+# Migration
+# =========================
+def split_log(src: str = None, seg_dir: str = SEGMENT_DIR) -> dict:
+    """
+    Copy every complete block of src (run_log.txt) byte-for-byte into
+    month segments by its Timestamp, write the manifest and rename src to
+    src + ".pre-split". Runs without a Timestamp stay with the run before
+    them. Holds the run log lock throughout; blocks consoles queued for
+    run_log.txt meanwhile go to the active segment when flushed
+    (run_store.run_log_queue). Returns {month: runs}.
+    """
+    src = src or run_store.RUN_LOG_FILE
+    if is_segmented(seg_dir):
+        raise RuntimeError(f"{seg_dir} is already segmented")
+    os.makedirs(seg_dir, exist_ok=True)
+    if any(_SEGMENT_FILE.match(n) for n in os.listdir(seg_dir)):
+        raise RuntimeError(f"{seg_dir} already holds segment files")
+    counts = {}
+    with FileLock(run_store.RUN_LOG_LOCK, timeout=30):
+        month = out = None
+        try:
+            with open(src, "rb") as f:
+                for lines, start, end in run_store.iter_runs_from(0, src, raw=True):
+                    ts = next((ln[11:] for ln in lines if ln.startswith("Timestamp: ")), None)
+                    m = month_of(ts) or month or current_month()
+                    if m != month:
+                        if out is not None:
+                            out.close()
+                        out = open(os.path.join(seg_dir, f"{m}.txt"), "ab")
+                        month = m
+                    f.seek(start)
+                    out.write(f.read(end - start) + b"\n")
+                    counts[m] = counts.get(m, 0) + 1
+        finally:
+            if out is not None:
+                out.close()
+        save_manifest(seg_dir, load_manifest(seg_dir))
+        os.replace(src, src + ".pre-split")
+        run_cache.discard(src)
+    return counts
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Month segments of the run log")
+    ap.add_argument("--dir", default=SEGMENT_DIR, help="segment directory (default: %(default)s)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("split", help="convert run_log.txt into month segments")
+    sp.add_argument("--log", default=run_store.RUN_LOG_FILE)
+    sub.add_parser("status", help="list segments from the manifest")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "split":
+        counts = split_log(args.log, args.dir)
+        print(f"{sum(counts.values())} runs into {len(counts)} segments under {args.dir}/")
+        return 0
+    for month, e in load_manifest(args.dir).items():
+        state = "closed" if e["closed"] else "active"
+        print(f"{month}  {state:<6} {e['runs']:>7} runs {e['bytes']:>12} bytes {e['stored']:>12} on disk  "
+              f"{e['first_ts'] or '-'} .. {e['last_ts'] or '-'}  runs {e['min_run']}..{e['max_run']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,672 @@
+# run_store.py
+import json
+import os
+import zlib
+from datetime import datetime
+
+from filelock import FileLock
+
+from log_writer import get_queue, MODE_LOCK
+from run_records import Addendum, RunRecord, StatusEvent, ts_to_epoch
+
+# Storage and query side of the run log, with no Tk imports, so scripts and
+# the ppm_report CLI can read runs without loading the GUI. run_reports
+# re-exports these names for the windows and existing callers.
+
+RUN_LOG_FILE = "run_log.txt"        # Canonical log for runs (until split into run_log/ segments)
+RUN_LOG_LOCK = f"{RUN_LOG_FILE}.lock"
+ARCHIVE_SUFFIX = ".pack"            # compressed closed segment (see archive_store.py)
+# append_addendum rewrites the whole file, so run log appends keep taking the lock.
+# Blocks are self-delimiting, so log_writer.MODE_O_APPEND works if addendums move out.
+RUN_LOG_APPEND_MODE = MODE_LOCK
+USERS_FILE = "users.txt"            # username,password,first,last,bosk_id,is_temp,is_admin
+RESPONDER_USERS_FILE = "responder_users.json"  # {"41": ["dakota"], "42": ["alex","jordan"]}
+OWNER_BOSK_IDS = {"OWNER-001"}      # <-- update to your real owner BOSK ID(s)
+SUMMARY_DIR = "shift_summaries"     # archived shift summaries, YYYY-MM-DD_SHIFT_X_summary.txt
+
+
+# =========================
+# Run log helpers
+# =========================
+def segment_dir(path):
+    """Segment directory for `path` (None = the default log), or None for a single log file."""
+    if path is None:
+        from run_segments import SEGMENT_DIR, is_segmented
+        return SEGMENT_DIR if is_segmented() else None
+    return path if os.path.isdir(path) else None
+
+
+def run_log_target() -> tuple[str, str]:
+    """(file, lock) new run blocks are appended to: the active month segment once segmented."""
+    seg_dir = segment_dir(None)
+    if seg_dir is None:
+        return RUN_LOG_FILE, RUN_LOG_LOCK
+    from run_segments import active_segment
+    return active_segment(seg_dir), RUN_LOG_LOCK
+
+
+def run_log_queue():
+    """
+    Shared append queue for new run blocks. The target is re-checked under
+    the lock at flush time, so a block queued just before split_log (or a
+    month rollover) lands in the file readers use now.
+    """
+    log_path, lock_path = run_log_target()
+    q = get_queue(log_path, lock_path, mode=RUN_LOG_APPEND_MODE)
+    q.retarget = _run_log_file
+    return q
+
+
+def _run_log_file() -> str:
+    return run_log_target()[0]
+
+
+def log_exists(path: str = None) -> bool:
+    return segment_dir(path) is not None or os.path.exists(path or RUN_LOG_FILE)
+
+
+def log_size(path: str = None) -> int:
+    """Bytes in the run log (every segment together when segmented); 0 if missing."""
+    seg_dir = segment_dir(path)
+    if seg_dir is not None:
+        from run_segments import segment_spans
+        return sum(size for _, _, size in segment_spans(seg_dir))
+    try:
+        return os.path.getsize(path or RUN_LOG_FILE)
+    except OSError:
+        return 0
+
+
+def log_files(path: str = None, since=None, until=None) -> list:
+    """Files of the log in order: the segments that can hold [since, until], or the one file."""
+    seg_dir = segment_dir(path)
+    if seg_dir is not None:
+        from run_segments import segments_for
+        return segments_for(seg_dir, time_bound(since, False), time_bound(until, True))
+    path = path or RUN_LOG_FILE
+    return [path] if os.path.exists(path) else []
+
+
+def save_run_to_text(run_data: dict, statuses: dict) -> None:
+    """
+    Appends a new run block to run_log.txt (or the active month segment)
+    Format is designed to be human-readable and easily parsed.
+
+    Expected fields in run_data:
+      run_number, caller, location, nature, assigned (comma-separated), notes, timestamp (optional)
+    """
+    timestamp = run_data.get("timestamp") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    block = [
+        "=== RUN START ===",
+        f"RunNumber: {run_data.get('run_number','')}",
+        f"Caller: {run_data.get('caller','')}",
+        f"Location: {run_data.get('location','')}",
+        f"Nature: {run_data.get('nature','')}",
+        f"Assigned: {run_data.get('assigned','')}",
+        f"Timestamp: {timestamp}",
+        "Notes:",
+        (run_data.get("notes") or "").strip(),
+        "Statuses:"
+    ]
+
+    # statuses: { unit: {status, timestamp} }
+    for unit, st in (statuses or {}).items():
+        block.append(f"{unit}|{st.get('status','')}|{st.get('timestamp','')}")
+
+    block += [
+        "Addendums:",   # keep this literal; we'll append addendums after this line
+        "=== RUN END ===",
+        ""
+    ]
+
+    run_log_queue().append("\n".join(block) + "\n")
+
+
+RUN_START = "=== RUN START ==="
+RUN_END = "=== RUN END ==="
+_READ_CHUNK = 1 << 16
+_HEADER_FIELDS = {"RunNumber", "Caller", "Location", "Nature", "Assigned", "Timestamp"}
+
+
+def _parse_block(lines) -> RunRecord:
+    """One RunRecord from the lines between RUN START and RUN END."""
+    run_number = caller = location = nature = assigned = ts = None
+    notes, statuses, addendums = [], [], []
+    section = None
+    for ln in lines:
+        head, sep, value = ln.partition(": ")
+        if sep and head in _HEADER_FIELDS:
+            # header lines win wherever they appear, as they always have
+            if head == "RunNumber":
+                run_number = value
+            elif head == "Caller":
+                caller = value
+            elif head == "Location":
+                location = value
+            elif head == "Nature":
+                nature = value
+            elif head == "Assigned":
+                assigned = value
+            else:
+                ts = ts_to_epoch(value)
+        elif ln == "Notes:":
+            section = "notes"
+        elif ln == "Statuses:":
+            section = "statuses"
+        elif ln == "Addendums:":
+            section = "addendums"
+        elif section == "notes":
+            notes.append(ln)
+            notes.append("\n")
+        elif section == "statuses":
+            # Format: UNIT|STATUS|TS
+            parts = ln.split("|")
+            if len(parts) >= 3:
+                statuses.append(StatusEvent(parts[0], parts[1], ts_to_epoch(parts[2])))
+        elif section == "addendums":
+            if ln.strip():
+                addendums.append(Addendum.parse(ln))
+    return RunRecord(run_number, caller, location, nature, assigned, ts,
+                     "".join(notes), statuses, addendums)
+
+
+def _iter_blocks(path):
+    """Line lists of complete run blocks, oldest first. Holds one block at a time."""
+    with open(path, "r", encoding="utf-8", buffering=_READ_CHUNK) as f:
+        yield from _blocks(f)
+
+
+def _blocks(lines):
+    cur = None
+    for raw in lines:
+        ln = raw.rstrip("\n")
+        # endswith: a block cut short by a crash can leave the next START glued to its last line
+        if ln.endswith(RUN_START):
+            cur = []
+        elif ln == RUN_END:
+            if cur is not None:
+                yield cur
+            cur = None
+        elif cur is not None:
+            cur.append(ln)
+
+
+def _iter_lines_reverse(path):
+    """Lines of a file from last to first, read in fixed-size chunks from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        rest = b""
+        while pos > 0:
+            step = min(_READ_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            parts = (f.read(step) + rest).split(b"\n")
+            rest = parts[0]          # may continue in the previous chunk
+            for part in reversed(parts[1:]):
+                yield part.decode("utf-8", errors="replace").rstrip("\r")
+        yield rest.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _iter_blocks_reverse(path):
+    """Line lists of complete run blocks, newest first (same blocks as _iter_blocks)."""
+    return _blocks_reverse(_iter_lines_reverse(path))
+
+
+def _blocks_reverse(lines):
+    cur = None
+    for ln in lines:
+        if ln == RUN_END:
+            cur = []
+        elif ln.endswith(RUN_START):
+            if cur is not None:
+                cur.reverse()
+                yield cur
+            cur = None
+        elif cur is not None:
+            cur.append(ln)
+
+
+def iter_runs_from(offset: int = 0, path: str = None, raw: bool = False):
+    """
+    (run, start, end) for each complete block whose START line is at or after
+    byte `offset`; start/end are byte offsets of the block. Stops at a partial
+    last block, so a caller can resume later from the last `end` it saw.
+    raw=True yields the block's lines instead of a parsed RunRecord.
+
+    A segmented log reads as its segments concatenated oldest first, so
+    offsets stay valid across calls while new runs go to the active segment.
+    """
+    seg_dir = segment_dir(path)
+    if seg_dir is not None:
+        from run_segments import segment_spans
+        for seg, base, size in segment_spans(seg_dir):
+            if base + size > offset:
+                for run, start, end in _iter_file_from(seg, max(0, offset - base), raw):
+                    yield run, base + start, base + end
+        return
+    yield from _iter_file_from(path or RUN_LOG_FILE, offset, raw)
+
+
+def _iter_file_from(path: str, offset: int, raw: bool):
+    if not os.path.exists(path):
+        return
+    if path.endswith(ARCHIVE_SUFFIX):
+        from archive_store import iter_raw_lines
+        yield from _scan_from(iter_raw_lines(path, offset), offset, raw)
+        return
+    with open(path, "rb", buffering=_READ_CHUNK) as f:
+        f.seek(offset)
+        yield from _scan_from(f, offset, raw)
+
+
+def _scan_from(byte_lines, offset: int, raw: bool):
+    start_marks = (RUN_START.encode() + b"\n", RUN_START.encode() + b"\r\n")
+    end_marks = (RUN_END.encode() + b"\n", RUN_END.encode() + b"\r\n")
+    pos = offset
+    cur = start = None
+    for data in byte_lines:
+        line_start, pos = pos, pos + len(data)
+        if not data.endswith(b"\n"):
+            return                      # torn tail; resume from the previous end
+        if data.endswith(start_marks):
+            cur, start = [], line_start
+        elif data in end_marks:
+            if cur is not None:
+                lines = _decode_lines(cur)
+                yield (lines if raw else _parse_block(lines)), start, pos
+            cur = None
+        elif cur is not None:
+            cur.append(data)
+
+
+def parse_raw_block(data: bytes) -> RunRecord:
+    """RunRecord from one block's bytes, its RUN START line through its RUN END line."""
+    body = data[data.index(b"\n") + 1:data.rindex(RUN_END.encode())]
+    return _parse_block(_decode_lines([body]))
+
+
+def _decode_lines(raw_lines) -> list:
+    """Newline-terminated byte lines -> str lines (one decode per block)."""
+    text = b"".join(raw_lines).decode("utf-8", errors="replace")
+    lines = text.split("\n")
+    lines.pop()
+    if "\r" in text:
+        lines = [ln.rstrip("\r") for ln in lines]
+    return lines
+
+
+def log_fingerprint(path: str, offset: int, size: int = 64) -> bytes:
+    """
+    The `size` bytes just before `offset`. Readers that resume from an offset
+    compare it to spot a rewritten (append_addendum) or truncated log.
+    """
+    seg_dir = segment_dir(path)
+    if seg_dir is not None:
+        from run_segments import segment_spans
+        for seg, base, length in segment_spans(seg_dir):
+            if base < offset <= base + length:
+                return log_fingerprint(seg, offset - base, size)
+        return b""
+    path = path or RUN_LOG_FILE
+    if path.endswith(ARCHIVE_SUFFIX):
+        from archive_store import read_raw
+        try:
+            data = read_raw(path, max(0, offset - size), offset)
+        except (OSError, ValueError):
+            return b""
+        return data if len(data) == min(offset, size) else b""
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, offset - size))
+            data = f.read(min(offset, size))
+    except OSError:
+        return b""
+    return data if len(data) == min(offset, size) else b""
+
+
+def tail_crc(path: str, offset: int, size: int = 4096) -> int:
+    """CRC-32 of log_fingerprint(path, offset, size): whether a log only grew past offset."""
+    return zlib.crc32(log_fingerprint(path, offset, size))
+
+
+def time_bound(value, end_of_day: bool):
+    """datetime/date/"YYYY-MM-DD[ HH:MM:SS]" -> comparable "YYYY-MM-DD HH:MM:SS" string."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if hasattr(value, "strftime"):
+        value = value.strftime("%Y-%m-%d")
+    value = str(value).strip()
+    if len(value) == 10:
+        value += " 23:59:59" if end_of_day else " 00:00:00"
+    return value
+
+
+def _run_number_matcher(run_number):
+    if run_number is None:
+        return None
+    if callable(run_number):
+        return run_number
+    if isinstance(run_number, str):
+        return lambda rn: rn == run_number
+    wanted = set(run_number)
+    return lambda rn: rn in wanted
+
+
+def iter_runs(path: str = None, reverse: bool = False, since=None, until=None,
+              run_number=None, predicate=None, limit: int = None):
+    """
+    Stream runs (RunRecord, read like the parse_runs_from_log dicts) one block at a time.
+
+    reverse      newest first (reads the file backwards in chunks)
+    since/until  inclusive Timestamp bounds (datetime, date or string); runs
+                 without a timestamp are skipped when either is set
+    run_number   exact string, a collection of them, or a callable
+    predicate    callable(run) applied after parsing
+    limit        stop after this many runs
+
+    Timestamp and run number filters look only at the header lines, so a
+    non-matching block is never parsed. Breaking out of the loop (or limit)
+    stops reading the file. On a segmented log (path None or a segment
+    directory) the same filters pick which month segments are opened at all.
+    """
+    lo, hi = time_bound(since, False), time_bound(until, True)
+    seg_dir = segment_dir(path)
+    if seg_dir is not None:
+        from run_segments import segments_for
+        files = segments_for(seg_dir, lo, hi, run_number)
+    else:
+        path = path or RUN_LOG_FILE
+        files = [path] if os.path.exists(path) else []
+    match_rn = _run_number_matcher(run_number)
+    count = 0
+    for block in _iter_file_blocks(files[::-1] if reverse else files, reverse, lo, hi, run_number):
+        if lo is not None or hi is not None or match_rn is not None:
+            rn = ts = None
+            for ln in block:
+                if ln.startswith("RunNumber: "):
+                    rn = ln[11:]
+                elif ln.startswith("Timestamp: "):
+                    ts = ln[11:]
+            if match_rn is not None and (rn is None or not match_rn(rn)):
+                continue
+            if (lo is not None or hi is not None) and (
+                    ts is None or (lo is not None and ts < lo) or (hi is not None and ts > hi)):
+                continue
+        run = _parse_block(block)
+        if predicate is not None and not predicate(run):
+            continue
+        yield run
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def _iter_file_blocks(files, reverse: bool, lo=None, hi=None, run_number=None):
+    for path in files:
+        if path.endswith(ARCHIVE_SUFFIX):
+            # archived segment: only the compressed blocks whose index ranges can match
+            import archive_store
+            if reverse:
+                yield from _blocks_reverse(archive_store.iter_lines_reverse(path, lo, hi, run_number))
+            else:
+                yield from _blocks(archive_store.iter_lines(path, lo, hi, run_number))
+        else:
+            yield from (_iter_blocks_reverse(path) if reverse else _iter_blocks(path))
+
+
+def parse_runs_from_log():
+    """
+    Returns a RunRecord (dict-compatible, see run_records.py) for each run block.
+    Loaded through the persisted parse next to the log (run_cache.py), so only
+    runs appended since it was written are parsed. Prefer iter_runs() when only
+    some runs (latest N, a date range) are needed.
+    """
+    from run_cache import load_runs
+    return load_runs()
+
+
+def append_addendum(run_number: str, author: str, text: str) -> None:
+    """
+    Appends an addendum line at the end of the target run block (after 'Addendums:').
+    To keep it simple, we rewrite the file - on a segmented log only the
+    month segment holding the run (an archived one comes back as plain text).
+    """
+    seg_dir = segment_dir(None)
+    if seg_dir is None:
+        targets = [RUN_LOG_FILE]
+    else:
+        from run_segments import segments_for
+        targets = segments_for(seg_dir, run_number=run_number)
+
+    seen = False
+    for target in targets:
+        runs = list(iter_runs(target))
+        seen = seen or bool(runs)
+        for r in runs:
+            if r.get("run_number") == run_number:
+                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                r.add_addendum(f"[{ts}] {author}: {text}")
+                _rewrite_log(target, runs)
+                return
+    if not seen:
+        raise RuntimeError("No runs found.")
+    raise RuntimeError(f"Run not found: {run_number}")
+
+
+def _rewrite_log(path: str, runs) -> None:
+    """Write runs back as text; an archived segment comes back as its plain .txt file."""
+    out = []
+    for r in runs:
+        out += [
+            "=== RUN START ===",
+            f"RunNumber: {r.get('run_number','')}",
+            f"Caller: {r.get('caller','')}",
+            f"Location: {r.get('location','')}",
+            f"Nature: {r.get('nature','')}",
+            f"Assigned: {r.get('assigned','')}",
+            f"Timestamp: {r.get('timestamp','')}",
+            "Notes:",
+            (r.get("notes") or "").rstrip("\n"),
+            "Statuses:"
+        ]
+        for st in (r.get("statuses") or []):
+            out.append(f"{st.get('unit','')}|{st.get('status','')}|{st.get('timestamp','')}")
+        out += ["Addendums:"]
+        for ad in (r.get("addendums") or []):
+            out.append(ad)
+        out += ["=== RUN END ===", ""]
+
+    packed = path.endswith(ARCHIVE_SUFFIX)
+    target = path[:-len(ARCHIVE_SUFFIX)] + ".txt" if packed else path
+    with FileLock(RUN_LOG_LOCK, timeout=5):
+        with open(target, "w", encoding="utf-8") as f:
+            f.write("\n".join(out) + "\n")
+        if packed:
+            os.remove(path)
+    from run_cache import discard
+    discard(path)
+    discard(target)
+
+
+# =========================
+# Search
+# =========================
+def run_matches(r, q: str) -> bool:
+    """Case-insensitive substring match over a run's fields, statuses and addendums."""
+    if not q:
+        return True
+    q = q.lower().strip()
+    fields = [
+        r.get("run_number", ""),
+        r.get("caller", ""),
+        r.get("location", ""),
+        r.get("nature", ""),
+        r.get("assigned", ""),
+        r.get("notes", ""),
+    ]
+    if any(q in (f or "").lower() for f in fields):
+        return True
+    for st in (r.get("statuses") or []):
+        if (q in st.get("unit", "").lower() or
+                q in st.get("status", "").lower() or
+                q in st.get("timestamp", "").lower()):
+            return True
+    for ad in (r.get("addendums") or []):
+        if q in ad.lower():
+            return True
+    return False
+
+
+def run_units(r) -> set:
+    """Upper-case unit codes named in Assigned or in the Statuses lines."""
+    units = {u.strip().upper() for u in (r.get("assigned") or "").split(",") if u.strip()}
+    units.update(st.get("unit", "").upper() for st in (r.get("statuses") or []))
+    units.discard("")
+    return units
+
+
+# =========================
+# Auth / visibility helpers
+# =========================
+def _load_users_from_file(path: str = USERS_FILE) -> dict:
+    """
+    Returns dict:
+      users[username_lower] = {
+        'username': str, 'password': str, 'first': str, 'last': str,
+        'bosk_id': str, 'is_temp': bool, 'is_admin': bool
+      }
+    """
+    users = {}
+    if not os.path.exists(path):
+        return users
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = [p.strip() for p in line.split(",")]
+            # username,password,first,last,bosk_id,is_temp,is_admin
+            if len(parts) < 7:
+                # tolerate short lines
+                parts += [""] * (7 - len(parts))
+            username, password, first, last, bosk_id, is_temp, is_admin = parts[:7]
+            users[username.lower()] = {
+                "username": username,
+                "password": password,
+                "first": first,
+                "last": last,
+                "bosk_id": (bosk_id or "").upper(),
+                "is_temp": (str(is_temp).strip().upper() in ("1", "TRUE", "YES", "Y")),
+                "is_admin": (str(is_admin).strip().upper() in ("1", "TRUE", "YES", "Y")),
+            }
+    return users
+
+
+def verify_credentials(username: str, password: str) -> tuple[bool, bool]:
+    """
+    Returns (is_valid, is_admin)
+    """
+    if not username or not password:
+        return (False, False)
+    users = _load_users_from_file()
+    rec = users.get(username.lower())
+    if not rec:
+        return (False, False)
+    if rec["password"] != password:
+        return (False, False)
+    return (True, bool(rec["is_admin"]))
+
+
+def is_owner(username: str) -> bool:
+    rec = _load_users_from_file().get((username or "").lower())
+    if not rec:
+        return False
+    return rec.get("bosk_id", "").upper() in OWNER_BOSK_IDS
+
+
+def _load_responder_users_map() -> dict:
+    """
+    Load responder->usernames mapping.
+    Normalizes usernames to lowercase strings and keys to str.
+    Example file:
+      { "41": ["dakota"], "42": ["alex","jordan"] }
+    """
+    if not os.path.exists(RESPONDER_USERS_FILE):
+        return {}
+    try:
+        with open(RESPONDER_USERS_FILE, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except Exception:
+        return {}
+    mapping: dict[str, list[str]] = {}
+    for k, v in raw.items():
+        key = str(k).strip()
+        if not key:
+            continue
+        if isinstance(v, str):
+            usernames = [v.strip().lower()] if v.strip() else []
+        elif isinstance(v, list):
+            usernames = [str(x).strip().lower() for x in v if str(x).strip()]
+        else:
+            usernames = []
+        mapping[key] = usernames
+    return mapping
+
+
+def get_user_responder_ids(username: str) -> set[str]:
+    """Reverse-lookup: which responder IDs map to this username (lowercased)"""
+    username_l = (username or "").strip().lower()
+    if not username_l:
+        return set()
+    mapping = _load_responder_users_map()
+    out = {rid for rid, users in mapping.items() if username_l in users}
+    return out
+
+
+def user_roles(username: str) -> tuple[bool, bool]:
+    """(is_admin, is_owner) for a username from users.txt."""
+    rec = _load_users_from_file().get((username or "").lower())
+    if not rec:
+        return (False, False)
+    return (bool(rec["is_admin"]), rec.get("bosk_id", "").upper() in OWNER_BOSK_IDS)
+
+
+def tokenize_assigned(assigned_str: str) -> tuple[set[str], set[str]]:
+    """
+    Returns (tokens_all_lower, responder_id_tokens)
+    - tokens are split on commas
+    - responder_id_tokens are numeric-like strings (e.g., "41")
+    """
+    tokens = set()
+    ids = set()
+    for raw in (assigned_str or "").replace(";", ",").split(","):
+        tok = raw.strip()
+        if not tok:
+            continue
+        tokens.add(tok.lower())
+        if tok.isdigit():
+            ids.add(tok)
+    return tokens, ids
+
+
+def run_visible(r, username: str, responder_ids: set) -> bool:
+    """Non-admin rule: username or one of the user's responder IDs is in Assigned."""
+    tokens_all, id_tokens = tokenize_assigned(r.get("assigned", "") or "")
+    if (username or "").strip().lower() in tokens_all:
+        return True
+    return len(responder_ids & id_tokens) > 0
+
+
+def access_filter(username: str, is_admin: bool = False, is_owner: bool = False):
+    """
+    Predicate(run) -> bool with RunReportsWindow's visibility rules, or None
+    when the user sees everything. responder_users.json is read once.
+    """
+    if is_admin or is_owner:
+        return None
+    my_ids = get_user_responder_ids(username)
+    return lambda r: run_visible(r, username, my_ids)
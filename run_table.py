@@ -0,0 +1,333 @@
+# run_table.py
+import os
+import sqlite3
+
+try:
+    import numpy as np
+except ImportError:     # optional: without NumPy callers keep looping over iter_runs()
+    np = None
+
+from run_records import RunRecord, StatusEvent, ts_to_epoch
+from run_store import iter_runs_from, log_exists, log_fingerprint, time_bound
+
+# Columnar view of the run history for counting / selecting without touching
+# run dicts:
+#
+#   ts        int64   epoch seconds of the run Timestamp (-1 if missing)
+#   nature    int32   code into self.natures
+#   location  int32   code into self.locations
+#   open      bool    some unit's latest status is not in CLOSED_STATUSES
+#   units     uint64  (n, words) membership bitmap, bit i = self.units[i]
+#   ref       int64   byte offset of the block in the run log, or runs.id in ppm.db
+#
+# refresh() only reads what was added since the last call; a rewritten log
+# (append_addendum) or a shrunk database triggers a full rebuild.
+
+CLOSED_STATUSES = {"AVAILABLE"}
+SOURCE_LOG = "log"
+SOURCE_DB = "db"
+_INITIAL_CAPACITY = 1024
+
+
+def available() -> bool:
+    return np is not None
+
+
+class _Vocab:
+    """str <-> dense int code, in first-seen order."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value: str) -> int:
+        c = self.codes.get(value)
+        if c is None:
+            c = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+    def lookup(self, values) -> list:
+        if isinstance(values, str):
+            values = [values]
+        return [self.codes[v] for v in values if v in self.codes]
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _split_units(assigned: str) -> list:
+    return [u.strip().upper() for u in (assigned or "").split(",") if u.strip()]
+
+
+class RunTable:
+    """
+    NumPy columns over run_log.txt (source="log") or ppm.db (source="db").
+
+        t = RunTable(); t.refresh()
+        t.count(since="2024-06-01", until="2024-06-30", nature="Fall", unit="E1")
+        rows = t.select(open=True); t.records(rows[-10:])
+    """
+
+    def __init__(self, path: str = None, source: str = SOURCE_LOG):
+        if np is None:
+            raise RuntimeError("run_table needs NumPy (pip install numpy)")
+        self.source = source
+        self.path = path if source == SOURCE_LOG else (path or "ppm.db")     # None: run_store's log
+        self.natures = _Vocab()
+        self.locations = _Vocab()
+        self.units = _Vocab()
+        self._reset()
+
+    def _reset(self):
+        self.natures.__init__()
+        self.locations.__init__()
+        self.units.__init__()
+        self.n = 0
+        self._cap = 0
+        self._words = 1
+        self._ts = np.empty(0, dtype=np.int64)
+        self._nature = np.empty(0, dtype=np.int32)
+        self._location = np.empty(0, dtype=np.int32)
+        self._open = np.empty(0, dtype=bool)
+        self._units = np.zeros((0, self._words), dtype=np.uint64)
+        self._ref = np.empty(0, dtype=np.int64)
+        self._resume = 0            # log: byte offset after the last block; db: last runs.id
+        self._fingerprint = b""
+
+    # ---- column views (length n) ----
+    @property
+    def ts(self):
+        return self._ts[:self.n]
+
+    @property
+    def nature(self):
+        return self._nature[:self.n]
+
+    @property
+    def location(self):
+        return self._location[:self.n]
+
+    @property
+    def open(self):
+        return self._open[:self.n]
+
+    @property
+    def unit_bits(self):
+        return self._units[:self.n]
+
+    @property
+    def ref(self):
+        return self._ref[:self.n]
+
+    def __len__(self):
+        return self.n
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def refresh(self) -> int:
+        """Pull in runs added since the last refresh. Returns how many were added."""
+        try:
+            if self.source == SOURCE_DB:
+                return self._refresh_db()
+            return self._refresh_log()
+        except Exception as e:
+            print(f"[run_table] refresh failed: {e}")
+            return 0
+
+    def _refresh_log(self) -> int:
+        if not log_exists(self.path):
+            if self.n:
+                self._reset()
+            return 0
+        if self._resume and log_fingerprint(self.path, self._resume) != self._fingerprint:
+            self._reset()
+        rows = []
+        end = self._resume
+        for run, start, end in iter_runs_from(self._resume, self.path):
+            statuses = run.statuses
+            rows.append((run.ts, run.get("nature", ""), run.get("location", ""),
+                         _split_units(run.get("assigned", "")) + [st.unit.upper() for st in statuses],
+                         self._is_open((st.unit, st.status) for st in statuses), start))
+        self._append(rows)
+        if end != self._resume:
+            self._resume = end
+            self._fingerprint = log_fingerprint(self.path, end)
+        return len(rows)
+
+    def _refresh_db(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        conn = sqlite3.connect(self.path)
+        try:
+            c = conn.cursor()
+            top = c.execute("SELECT MAX(id) FROM runs").fetchone()[0] or 0
+            if top < self._resume:
+                self._reset()
+            runs = c.execute(
+                "SELECT id, nature, location, assigned, timestamp FROM runs WHERE id > ? ORDER BY id",
+                (self._resume,)).fetchall()
+            if not runs:
+                return 0
+            by_run = {}
+            for run_id, unit, status in c.execute(
+                    "SELECT run_id, unit, status FROM statuses WHERE run_id > ? ORDER BY rowid",
+                    (self._resume,)):
+                by_run.setdefault(run_id, []).append((unit or "", status or ""))
+        finally:
+            conn.close()
+        rows = []
+        for run_id, nature, location, assigned, ts in runs:
+            sts = by_run.get(run_id, [])
+            rows.append((ts_to_epoch(ts), nature or "", location or "",
+                         _split_units(assigned) + [u.upper() for u, _ in sts],
+                         self._is_open(sts), run_id))
+        self._append(rows)
+        self._resume = runs[-1][0]
+        return len(rows)
+
+    @staticmethod
+    def _is_open(statuses) -> bool:
+        latest = {}
+        for unit, status in statuses:
+            latest[unit] = status
+        return any(st not in CLOSED_STATUSES for st in latest.values())
+
+    def _append(self, rows) -> None:
+        if not rows:
+            return
+        m = len(rows)
+        self._grow(self.n + m)
+        codes = [[self.units.code(u) for u in units] for _, _, _, units, _, _ in rows]
+        words = (len(self.units) + 63) // 64 or 1
+        if words > self._words:
+            wider = np.zeros((self._cap, words), dtype=np.uint64)
+            wider[:, :self._words] = self._units
+            self._units, self._words = wider, words
+        sl = slice(self.n, self.n + m)
+        self._ts[sl] = [ts if isinstance(ts, int) else -1 for ts, _, _, _, _, _ in rows]
+        self._nature[sl] = [self.natures.code(r[1]) for r in rows]
+        self._location[sl] = [self.locations.code(r[2]) for r in rows]
+        self._open[sl] = [r[4] for r in rows]
+        self._ref[sl] = [r[5] for r in rows]
+        masks = []
+        for unit_codes in codes:
+            v = 0
+            for c in unit_codes:
+                v |= 1 << c
+            masks.append(v)
+        for w in range(self._words):
+            shift = 64 * w
+            self._units[sl, w] = [(v >> shift) & 0xFFFFFFFFFFFFFFFF for v in masks]
+        self.n += m
+
+    def _grow(self, need: int) -> None:
+        if need <= self._cap:
+            return
+        cap = max(_INITIAL_CAPACITY, self._cap)
+        while cap < need:
+            cap *= 2
+        for name in ("_ts", "_nature", "_location", "_open", "_ref"):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+        units = np.zeros((cap, self._words), dtype=np.uint64)
+        units[:self.n] = self._units[:self.n]
+        self._units = units
+        self._cap = cap
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def mask(self, since=None, until=None, nature=None, location=None, unit=None, open=None):
+        """
+        Boolean row mask. since/until as for run_store.iter_runs (inclusive;
+        runs without a timestamp drop out). nature / location / unit take one
+        value or a list (any of). open=True/False keeps open/closed runs.
+        """
+        m = np.ones(self.n, dtype=bool)
+        if since is not None or until is not None:
+            ts = self.ts
+            m &= ts >= 0
+            lo, hi = ts_to_epoch(time_bound(since, False)), ts_to_epoch(time_bound(until, True))
+            if isinstance(lo, int):
+                m &= ts >= lo
+            if isinstance(hi, int):
+                m &= ts <= hi
+        if nature is not None:
+            m &= np.isin(self.nature, self.natures.lookup(nature))
+        if location is not None:
+            m &= np.isin(self.location, self.locations.lookup(location))
+        if unit is not None:
+            wanted = [u.strip().upper() for u in ([unit] if isinstance(unit, str) else unit)]
+            hit = np.zeros(self.n, dtype=bool)
+            bits = self.unit_bits
+            for c in self.units.lookup(wanted):
+                hit |= (bits[:, c >> 6] & np.uint64(1 << (c & 63))) != 0
+            m &= hit
+        if open is not None:
+            m &= self.open if open else ~self.open
+        return m
+
+    def count(self, **filters) -> int:
+        return int(np.count_nonzero(self.mask(**filters)))
+
+    def select(self, **filters):
+        """Row indexes (oldest first) matching the filters."""
+        return np.flatnonzero(self.mask(**filters))
+
+    def count_by(self, column: str, **filters) -> dict:
+        """{value: count} over "nature" or "location" for the filtered rows."""
+        vocab = self.natures if column == "nature" else self.locations
+        codes = getattr(self, column)[self.mask(**filters)]
+        counts = np.bincount(codes, minlength=len(vocab))
+        return {vocab.values[i]: int(c) for i, c in enumerate(counts) if c}
+
+    def records(self, rows) -> list:
+        """Full RunRecords for the given row indexes, read back from the source."""
+        refs = [int(r) for r in self.ref[np.asarray(rows, dtype=np.int64)]]
+        if self.source == SOURCE_DB:
+            return self._db_records(refs)
+        out = []
+        for ref in refs:
+            run = next(iter_runs_from(ref, self.path), None)
+            if run is not None:
+                out.append(run[0])
+        return out
+
+    def _db_records(self, ids) -> list:
+        conn = sqlite3.connect(self.path)
+        try:
+            out = []
+            for run_id in ids:
+                row = conn.execute(
+                    "SELECT run_number, caller, location, nature, assigned, notes, timestamp "
+                    "FROM runs WHERE id = ?", (run_id,)).fetchone()
+                if row is None:
+                    continue
+                sts = [StatusEvent(u or "", s or "", ts_to_epoch(t or ""))
+                       for u, s, t in conn.execute(
+                           "SELECT unit, status, timestamp FROM statuses WHERE run_id = ? ORDER BY rowid",
+                           (run_id,))]
+                out.append(RunRecord(row[0], row[1], row[2], row[3], row[4],
+                                     ts_to_epoch(row[6]), row[5] or "", sts))
+            return out
+        finally:
+            conn.close()
+
+
+_tables = {}
+
+
+def get_run_table(path: str = None, source: str = SOURCE_LOG):
+    """Shared, refreshed RunTable per source, or None when NumPy isn't installed."""
+    if np is None:
+        return None
+    key = (source, os.path.abspath(path or ("run_log.txt" if source == SOURCE_LOG else "ppm.db")))
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = RunTable(path, source)
+    table.refresh()
+    return table
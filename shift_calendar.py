@@ -0,0 +1,160 @@
+# shift_calendar.py
+import json
+import os
+from datetime import datetime, timedelta
+
+SCHEDULE_FILE = "shift_schedule.json"  # optional override of DEFAULT_SCHEDULE
+DAY_START_HOUR = 6
+NIGHT_START_HOUR = 18
+DEFAULT_HORIZON_DAYS = 56
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Odd/even ISO week rotation (same table CallForm used to rebuild on every call)
+DEFAULT_SCHEDULE = {
+    "odd": {
+        "Mon": {"day": "C", "night": "D"},
+        "Tue": {"day": "C", "night": "D"},
+        "Wed": {"day": "A", "night": "B"},
+        "Thu": {"day": "A", "night": "B"},
+        "Fri": {"day": "C", "night": "D"},
+        "Sat": {"day": "C", "night": "D"},
+        "Sun": {"day": "C", "night": "D"},
+    },
+    "even": {
+        "Mon": {"day": "A", "night": "B"},
+        "Tue": {"day": "A", "night": "B"},
+        "Wed": {"day": "C", "night": "D"},
+        "Thu": {"day": "C", "night": "D"},
+        "Fri": {"day": "A", "night": "B"},
+        "Sat": {"day": "A", "night": "B"},
+        "Sun": {"day": "A", "night": "B"},
+    },
+}
+
+
+def load_schedule_file(path: str = SCHEDULE_FILE) -> dict:
+    """
+    Read shift_schedule.json if present. Expected shape:
+      {"day_start_hour": 6, "night_start_hour": 18, "horizon_days": 56,
+       "odd": {"Mon": {"day": "C", "night": "D"}, ...}, "even": {...}}
+    Missing keys fall back to the defaults; a broken file is ignored.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def merge_schedule(overrides: dict) -> dict:
+    """
+    DEFAULT_SCHEDULE with an "odd"/"even" override laid over it per day and
+    slot, so a file that only lists some weekdays (or only "day") keeps the
+    defaults for the rest. Malformed entries are ignored with a warning.
+    """
+    merged = {}
+    for parity in ("odd", "even"):
+        week = overrides.get(parity) or {}
+        if not isinstance(week, dict):
+            print(f"[shift_calendar] ignoring {parity!r} in {SCHEDULE_FILE}: not a weekday map")
+            week = {}
+        merged[parity] = {}
+        for day in DAY_NAMES:
+            entry = dict(DEFAULT_SCHEDULE[parity][day])
+            override = week.get(day, {})
+            if isinstance(override, dict):
+                entry.update({k: str(v) for k, v in override.items() if k in ("day", "night") and v})
+            else:
+                print(f"[shift_calendar] ignoring {parity}.{day} in {SCHEDULE_FILE}: expected day/night")
+            merged[parity][day] = entry
+    return merged
+
+
+class ShiftCalendar:
+    """
+    Precomputed rotation table. Every day in the horizon gets two slots
+    (day, night) stored as one character each, so "which shift is on" and
+    "when is the next handover" are plain index arithmetic.
+
+    Times are local wall-clock (naive datetimes), matching how the rest of
+    the app stamps runs and shift logs.
+    """
+
+    def __init__(self, schedule=None, day_start_hour=DAY_START_HOUR,
+                 night_start_hour=NIGHT_START_HOUR, horizon_days=DEFAULT_HORIZON_DAYS,
+                 start=None):
+        if not (0 <= day_start_hour < night_start_hour <= 24):
+            raise ValueError("day_start_hour must come before night_start_hour")
+        self.schedule = schedule or DEFAULT_SCHEDULE
+        self.day_start = timedelta(hours=day_start_hour)
+        self.day_len = timedelta(hours=night_start_hour - day_start_hour)
+        self.horizon_days = max(1, int(horizon_days))
+        self._build((start or datetime.now()).date())
+
+    def _build(self, start_date) -> None:
+        # Start one day early so the small hours before day_start (which
+        # belong to the previous day's night shift) are covered.
+        first = start_date - timedelta(days=1)
+        self._origin = datetime(first.year, first.month, first.day) + self.day_start
+        slots = []
+        for i in range(self.horizon_days + 1):
+            d = first + timedelta(days=i)
+            parity = "odd" if d.isocalendar()[1] % 2 == 1 else "even"
+            entry = self.schedule[parity][DAY_NAMES[d.weekday()]]
+            slots.append(entry["day"])
+            slots.append(entry["night"])
+        self._slots = "".join(slots)
+
+    def _locate(self, when):
+        """Return (day_index, is_night) for `when`, rebuilding if off the table."""
+        delta = when - self._origin
+        days = delta.days
+        if days < 0 or days > self.horizon_days:
+            self._build(when.date())
+            delta = when - self._origin
+            days = delta.days
+        is_night = (delta - timedelta(days=days)) >= self.day_len
+        return days, is_night
+
+    def shift_at(self, when=None) -> str:
+        """Shift letter ("A".."D") on duty at `when` (default: now)."""
+        days, is_night = self._locate(when or datetime.now())
+        return self._slots[2 * days + (1 if is_night else 0)]
+
+    def next_handover(self, when=None) -> datetime:
+        """Start of the next day/night slot after `when` (default: now)."""
+        days, is_night = self._locate(when or datetime.now())
+        base = self._origin + timedelta(days=days)
+        return base + (timedelta(days=1) if is_night else self.day_len)
+
+
+_calendar = None
+
+
+def get_calendar() -> ShiftCalendar:
+    """Shared calendar for CallForm, shift logs and shift summaries."""
+    global _calendar
+    if _calendar is None:
+        cfg = load_schedule_file()
+        _calendar = ShiftCalendar(
+            schedule=merge_schedule(cfg),
+            day_start_hour=int(cfg.get("day_start_hour", DAY_START_HOUR)),
+            night_start_hour=int(cfg.get("night_start_hour", NIGHT_START_HOUR)),
+            horizon_days=int(cfg.get("horizon_days", DEFAULT_HORIZON_DAYS)),
+        )
+    return _calendar
+
+
+def reload_calendar() -> ShiftCalendar:
+    """Drop the cached calendar (e.g. after editing shift_schedule.json)."""
+    global _calendar
+    _calendar = None
+    return get_calendar()
+
+
+def current_shift_key(when=None) -> str:
+    return get_calendar().shift_at(when)
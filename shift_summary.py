@@ -2,8 +2,9 @@ import os
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-
-SUMMARY_DIR = "shift_summaries"  # Make sure this folder exists
+from shift_calendar import get_calendar
+import archive_store
+from run_store import SUMMARY_DIR
 
 class ShiftSummaryWindow(ctk.CTkToplevel):
     def __init__(self, parent):
@@ -20,8 +21,15 @@ class ShiftSummaryWindow(ctk.CTkToplevel):
         self.search_var = tk.StringVar()
         self.search_var.trace_add("write", self.filter_files)
 
-        search_bar = ctk.CTkEntry(self, textvariable=self.search_var, placeholder_text="Search shift or date (e.g., A, 2025-08-03)")
+        cal = get_calendar()
+        on_duty = f"On duty: Shift {cal.shift_at()} (handover {cal.next_handover().strftime('%Y-%m-%d %H:%M')})"
+        ctk.CTkLabel(self, text=on_duty).pack(anchor="w", padx=10, pady=(10, 0))
+
+        search_bar = ctk.CTkEntry(self, textvariable=self.search_var,
+                                  placeholder_text="Search shift or date (e.g., A, 2025-08-03) - Enter also searches the text")
         search_bar.pack(fill="x", padx=10, pady=(10, 0))
+        search_bar.bind("<Return>", lambda _e: self.search_contents())
+        self.search_job = None
 
         self.file_listbox = tk.Listbox(self, width=30)
         self.file_listbox.pack(side="left", fill="y", padx=10, pady=10)
@@ -33,13 +41,17 @@ class ShiftSummaryWindow(ctk.CTkToplevel):
         self.load_files()
 
     def load_files(self):
-        self.all_files = sorted([
+        # past months may be packed into SUMMARY_DIR/YYYY-MM.pack (archive_store.py)
+        self.all_files = sorted(set([
             f for f in os.listdir(SUMMARY_DIR)
             if f.endswith(".txt")
-        ])
+        ] + archive_store.summary_names(SUMMARY_DIR)))
         self.filter_files()
 
     def filter_files(self, *args):
+        if getattr(self, "search_job", None) is not None:
+            self.search_job.cancel()
+            self.search_job = None
         query = self.search_var.get().lower()
         self.file_listbox.delete(0, "end")
         self.filtered_files = []
@@ -49,6 +61,36 @@ class ShiftSummaryWindow(ctk.CTkToplevel):
                 self.file_listbox.insert("end", fname)
                 self.filtered_files.append(fname)
 
+    def search_contents(self):
+        """Names and text of every summary, loose or packed, searched across cores (run_search)."""
+        from run_search import SearchJob, SummarySearch
+
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        if self.search_job is not None:
+            self.search_job.cancel()
+        self.file_listbox.delete(0, "end")
+        self.filtered_files = []
+        self.search_job = SearchJob(SummarySearch(query, SUMMARY_DIR))
+        self.search_job.start()
+        self.after(100, self._poll_search)
+
+    def _poll_search(self):
+        job = self.search_job
+        if job is None:
+            return
+        for fname in job.hits[len(self.filtered_files):]:
+            self.file_listbox.insert("end", fname)
+            self.filtered_files.append(fname)
+        if job.error is not None:
+            self.search_job = None
+            messagebox.showerror("Error", f"Search failed:\n{job.error}")
+        elif job.done:
+            self.search_job = None
+        else:
+            self.after(100, self._poll_search)
+
     def display_summary(self, event=None):
         selection = self.file_listbox.curselection()
         if not selection:
@@ -58,8 +100,11 @@ class ShiftSummaryWindow(ctk.CTkToplevel):
         path = os.path.join(SUMMARY_DIR, selected_file)
 
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            else:
+                content = archive_store.read_summary(selected_file, SUMMARY_DIR)
             self.text_area.delete("1.0", "end")
             self.text_area.insert("end", content)
         except Exception as e:
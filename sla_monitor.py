@@ -0,0 +1,181 @@
+# sla_monitor.py
+import time
+
+ENROUTE_SLA_MINUTES = 3      # DISPATCHED -> ENROUTE
+ON_SCENE_SLA_MINUTES = 10    # DISPATCHED -> ON SCENE
+
+# Statuses that satisfy / end each milestone
+_ENROUTE_DONE = {"ENROUTE", "ON SCENE", "TRANSPORTING", "AVAILABLE", "UNAVAILABLE", "--"}
+_ON_SCENE_DONE = {"ON SCENE", "TRANSPORTING", "AVAILABLE", "UNAVAILABLE", "--"}
+
+
+class _Timer:
+    __slots__ = ("key", "expires", "callback", "slot")
+
+    def __init__(self, key, expires, callback):
+        self.key = key
+        self.expires = expires    # absolute tick
+        self.callback = callback
+        self.slot = None          # dict currently holding this timer
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel (levels of 64 slots, 1 s ticks by default:
+    ~1 min, ~68 min, ~73 h, ~194 days of reach).
+
+    schedule() and cancel() are O(1): a timer lives in exactly one slot dict
+    and remembers which. advance() walks the ticks that elapsed, firing the
+    level-0 slot for each and cascading coarser slots down as their block
+    comes due.
+    """
+
+    def __init__(self, tick: float = 1.0, bits: int = 6, levels: int = 4, now: float = None):
+        self.tick = float(tick)
+        self.bits = bits
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.levels = levels
+        self._wheels = [[{} for _ in range(self.size)] for _ in range(levels)]
+        self._timers = {}
+        self._current = int((time.time() if now is None else now) // self.tick)
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def _place(self, t: _Timer) -> None:
+        delta = t.expires - self._current
+        level = 0
+        while level < self.levels - 1 and delta >= (1 << (self.bits * (level + 1))):
+            level += 1
+        expires = t.expires
+        max_delta = (1 << (self.bits * self.levels)) - 1
+        if delta > max_delta:
+            expires = self._current + max_delta   # re-placed again on cascade
+        idx = (expires >> (self.bits * level)) & self.mask
+        slot = self._wheels[level][idx]
+        slot[t.key] = t
+        t.slot = slot
+
+    def schedule(self, key, when: float, callback) -> None:
+        """Fire callback(key) at absolute time `when` (seconds). Replaces any timer with the same key."""
+        self.cancel(key)
+        t = _Timer(key, max(int(when // self.tick), self._current + 1), callback)
+        self._timers[key] = t
+        self._place(t)
+
+    def cancel(self, key) -> bool:
+        t = self._timers.pop(key, None)
+        if t is None:
+            return False
+        if t.slot is not None:
+            t.slot.pop(key, None)
+            t.slot = None
+        return True
+
+    def _cascade(self, level: int) -> None:
+        idx = (self._current >> (self.bits * level)) & self.mask
+        slot = self._wheels[level][idx]
+        if not slot:
+            return
+        timers = list(slot.values())
+        slot.clear()
+        for t in timers:
+            self._place(t)
+
+    def advance(self, now: float = None) -> list:
+        """Run every timer due by `now`. Returns the fired keys."""
+        target = int((time.time() if now is None else now) // self.tick)
+        fired = []
+        while self._current < target:
+            if not self._timers:
+                self._current = target    # nothing pending: jump straight there
+                break
+            self._current += 1
+            level = 1
+            while level < self.levels and (self._current & ((1 << (self.bits * level)) - 1)) == 0:
+                self._cascade(level)
+                level += 1
+            slot = self._wheels[0][self._current & self.mask]
+            if not slot:
+                continue
+            due = list(slot.values())
+            slot.clear()
+            for t in due:
+                self._timers.pop(t.key, None)
+                t.slot = None
+                fired.append(t.key)
+                try:
+                    t.callback(t.key)
+                except Exception as e:
+                    print(f"[sla_monitor] timer callback failed: {e}")
+        return fired
+
+
+class SlaMonitor:
+    """
+    Response-time watchdog: one wheel timer per outstanding (run, unit,
+    milestone). Feed it every unit status change; on_breach(run, unit,
+    milestone, minutes) is called when a milestone is missed.
+    """
+
+    def __init__(self, on_breach, enroute_minutes: float = ENROUTE_SLA_MINUTES,
+                 on_scene_minutes: float = ON_SCENE_SLA_MINUTES, now: float = None):
+        self.on_breach = on_breach
+        self.limits = {"ENROUTE": enroute_minutes, "ON SCENE": on_scene_minutes}
+        self.wheel = TimerWheel(now=now)
+        self._by_run = {}    # run -> set of keys
+
+    def _arm(self, run, unit, milestone, now):
+        minutes = self.limits.get(milestone)
+        if not minutes:
+            return
+        key = (run, unit, milestone)
+        self.wheel.schedule(key, now + minutes * 60, self._fire)
+        self._by_run.setdefault(run, set()).add(key)
+
+    def _disarm(self, run, unit, milestone):
+        key = (run, unit, milestone)
+        self.wheel.cancel(key)
+        keys = self._by_run.get(run)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._by_run.pop(run, None)
+
+    def _fire(self, key):
+        run, unit, milestone = key
+        keys = self._by_run.get(run)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._by_run.pop(run, None)
+        self.on_breach(run, unit, milestone, self.limits.get(milestone))
+
+    def status_event(self, run, unit, status, now: float = None) -> None:
+        if not run or not unit:
+            return
+        now = time.time() if now is None else now
+        unit = unit.upper()
+        if status == "DISPATCHED":
+            if (run, unit, "ON SCENE") not in self.wheel:
+                self._arm(run, unit, "ENROUTE", now)
+                self._arm(run, unit, "ON SCENE", now)
+            return
+        if status in _ENROUTE_DONE:
+            self._disarm(run, unit, "ENROUTE")
+        if status in _ON_SCENE_DONE:
+            self._disarm(run, unit, "ON SCENE")
+
+    def clear_run(self, run) -> None:
+        for key in self._by_run.pop(run, set()):
+            self.wheel.cancel(key)
+
+    def poll(self, now: float = None) -> list:
+        return self.wheel.advance(now)
+
+    def pending(self) -> int:
+        return len(self.wheel)
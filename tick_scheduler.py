@@ -0,0 +1,245 @@
+# tick_scheduler.py
+import time
+from collections import OrderedDict
+
+HIGH, NORMAL, LOW = 0, 1, 2
+
+# Interval multipliers by window state (tasks created with run_when_hidden ignore these)
+VISIBILITY_FACTORS = {"focused": 1, "background": 2, "hidden": 4}
+
+
+class _Task:
+    __slots__ = ("name", "func", "base_ms", "max_ms", "interval_ms", "priority", "adaptive",
+                 "run_when_hidden", "once", "next_due", "runs", "total_s", "max_s", "last_s")
+
+    def __init__(self, name, func, interval_ms, priority, max_ms, adaptive, run_when_hidden, once):
+        self.name = name
+        self.func = func
+        self.base_ms = interval_ms
+        self.max_ms = max_ms or interval_ms
+        self.interval_ms = interval_ms
+        self.priority = priority
+        self.adaptive = adaptive
+        self.run_when_hidden = run_when_hidden
+        self.once = once
+        self.next_due = 0.0
+        self.runs = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.last_s = 0.0
+
+
+class TickScheduler:
+    """
+    One Tk after() chain for all periodic work of a window.
+
+    - add(): periodic task. If adaptive, a run that returns a falsy value
+      ("nothing changed") doubles the interval up to max_interval_ms; a
+      truthy return snaps it back to the base interval.
+    - Window state (focused / background / hidden) stretches intervals.
+    - LOW priority tasks and defer()'d jobs run from after_idle slices with a
+      small time budget, so they never hold up input handling.
+    - call_later(): one-shot timers (e.g. focus nudges) on the same chain.
+    - stats(): run counts and durations per task.
+    """
+
+    def __init__(self, widget, idle_budget_ms: float = 15):
+        self.widget = widget
+        self.idle_budget = idle_budget_ms / 1000.0
+        self.visibility = "focused"
+        self._tasks = {}
+        self._idle_queue = OrderedDict()   # name -> callable or LOW _Task (coalesced)
+        self._idle_stats = {}              # name -> _Task used only for counters
+        self._after_id = None
+        self._idle_pending = False
+        self._running = False
+        self._seq = 0
+
+    # -------------------------
+    # Registration
+    # -------------------------
+    def add(self, name, func, interval_ms, priority=NORMAL, max_interval_ms=None,
+            adaptive=True, run_when_hidden=False, delay_ms=None) -> None:
+        t = _Task(name, func, interval_ms, priority, max_interval_ms, adaptive, run_when_hidden, False)
+        t.next_due = time.monotonic() + (interval_ms if delay_ms is None else delay_ms) / 1000.0
+        self._tasks[name] = t
+        self._rearm()
+
+    def call_later(self, delay_ms, func, name=None) -> str:
+        """One-shot on the shared chain. Reusing a name replaces the pending call."""
+        if name is None:
+            self._seq += 1
+            name = f"_once{self._seq}"
+        t = _Task(name, func, delay_ms, HIGH, None, False, True, True)
+        t.next_due = time.monotonic() + delay_ms / 1000.0
+        self._tasks[name] = t
+        self._rearm()
+        return name
+
+    def defer(self, name, func) -> None:
+        """Low-priority job run in idle time; repeated defers before it runs collapse into one."""
+        self._idle_queue[name] = func
+        self._schedule_idle()
+
+    def pending(self, name) -> bool:
+        """True if a task or deferred job with this name is waiting to run."""
+        return name in self._tasks or name in self._idle_queue
+
+    def remove(self, name) -> None:
+        self._tasks.pop(name, None)
+        self._idle_queue.pop(name, None)
+
+    def poke(self, name) -> None:
+        """Reset a task to its base interval and run it on the next tick."""
+        t = self._tasks.get(name)
+        if t is not None:
+            t.interval_ms = t.base_ms
+            t.next_due = time.monotonic()
+            self._rearm()
+
+    def set_visibility(self, state: str) -> None:
+        if state not in VISIBILITY_FACTORS or state == self.visibility:
+            return
+        prev, self.visibility = self.visibility, state
+        if VISIBILITY_FACTORS[state] < VISIBILITY_FACTORS[prev]:
+            # Coming back to the foreground: catch up right away
+            now = time.monotonic()
+            for t in self._tasks.values():
+                if not t.once:
+                    t.interval_ms = t.base_ms
+                    t.next_due = min(t.next_due, now)
+            self._rearm()
+
+    # -------------------------
+    # Loop
+    # -------------------------
+    def start(self) -> None:
+        self._running = True
+        self._rearm()
+        if self._idle_queue:
+            self._schedule_idle()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._idle_queue.clear()
+
+    def _rearm(self) -> None:
+        if not self._running:
+            return
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if not self._tasks:
+            return
+        pending = [t.next_due for t in self._tasks.values() if t.next_due != float("inf")]
+        if not pending:
+            return
+        wait = min(pending) - time.monotonic()
+        try:
+            self._after_id = self.widget.after(max(1, int(wait * 1000)), self._tick)
+        except Exception:
+            self._after_id = None
+
+    def _tick(self) -> None:
+        self._after_id = None
+        if not self._running:
+            return
+        now = time.monotonic()
+        due = sorted((t for t in self._tasks.values() if t.next_due <= now),
+                     key=lambda t: (t.priority, t.next_due))
+        for t in due:
+            if t.priority == LOW:
+                t.next_due = float("inf")       # re-armed after it runs in idle time
+                self._idle_queue[t.name] = t
+                self._schedule_idle()
+            else:
+                self._run(t)
+        self._rearm()
+
+    def _run(self, t: _Task) -> None:
+        start = time.perf_counter()
+        changed = True
+        try:
+            changed = t.func()
+        except Exception as e:
+            print(f"[tick_scheduler] task {t.name} failed: {e}")
+        elapsed = time.perf_counter() - start
+        t.runs += 1
+        t.total_s += elapsed
+        t.last_s = elapsed
+        t.max_s = max(t.max_s, elapsed)
+
+        if t.once:
+            if self._tasks.get(t.name) is t:
+                del self._tasks[t.name]
+            return
+        if self._tasks.get(t.name) is not t:
+            return  # removed while running
+        if t.adaptive:
+            t.interval_ms = t.base_ms if changed else min(t.interval_ms * 2, t.max_ms)
+        factor = 1 if t.run_when_hidden else VISIBILITY_FACTORS[self.visibility]
+        t.next_due = time.monotonic() + t.interval_ms * factor / 1000.0
+
+    def _schedule_idle(self) -> None:
+        if self._idle_pending or not self._running:
+            return
+        self._idle_pending = True
+        try:
+            self.widget.after_idle(self._drain_idle)
+        except Exception:
+            self._idle_pending = False
+
+    def _drain_idle(self) -> None:
+        self._idle_pending = False
+        if not self._running:
+            return
+        deadline = time.perf_counter() + self.idle_budget
+        while self._idle_queue and time.perf_counter() < deadline:
+            name, job = self._idle_queue.popitem(last=False)
+            if isinstance(job, _Task):
+                self._run(job)
+                continue
+            start = time.perf_counter()
+            try:
+                job()
+            except Exception as e:
+                print(f"[tick_scheduler] idle job {name} failed: {e}")
+            self._record_idle(name, time.perf_counter() - start)
+        if self._idle_queue:
+            self._schedule_idle()
+        self._rearm()
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+    def _record_idle(self, name, elapsed) -> None:
+        t = self._idle_stats.get(name)
+        if t is None:
+            t = self._idle_stats[name] = _Task(name, None, 0, LOW, None, False, True, True)
+        t.runs += 1
+        t.total_s += elapsed
+        t.last_s = elapsed
+        t.max_s = max(t.max_s, elapsed)
+
+    def stats(self) -> dict:
+        """{name: {"runs", "total_ms", "avg_ms", "max_ms", "interval_ms"}}"""
+        out = {}
+        rows = list(self._tasks.items()) + [(f"idle:{n}", t) for n, t in self._idle_stats.items()]
+        for name, t in rows:
+            out[name] = {
+                "runs": t.runs,
+                "total_ms": round(t.total_s * 1000, 3),
+                "avg_ms": round(t.total_s * 1000 / t.runs, 3) if t.runs else 0.0,
+                "max_ms": round(t.max_s * 1000, 3),
+                "interval_ms": t.interval_ms,
+            }
+        return out
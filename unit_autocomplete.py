@@ -0,0 +1,137 @@
+# unit_autocomplete.py
+import heapq
+
+# Lower rank sorts first; anything not listed goes after these
+STATUS_RANK = {
+    "AVAILABLE": 0,
+    "--": 1,
+    "DISPATCHED": 2,
+    "ENROUTE": 2,
+    "ON SCENE": 3,
+    "TRANSPORTING": 3,
+    "UNAVAILABLE": 9,
+}
+
+
+class _TrieNode:
+    __slots__ = ("children", "codes")
+
+    def __init__(self):
+        self.children = {}
+        self.codes = set()   # every unit reachable through this prefix
+
+
+class UnitAutocomplete:
+    """
+    Prefix trie over unit codes, apparatus codes and responder name words.
+
+    Each node keeps the set of codes below it, so a lookup is one walk down
+    the prefix plus a top-k pick over that node's codes. Statuses live in a
+    plain dict and are read at query time, so set_status() is O(1) and the
+    ranking (AVAILABLE first) is always current.
+    """
+
+    def __init__(self, limit: int = 8):
+        self.limit = limit
+        self._root = _TrieNode()
+        self._labels = {}      # CODE -> "E1 Engine 1"
+        self._terms = {}       # CODE -> indexed terms (for removal)
+        self._status = {}      # CODE -> status string
+
+    # -------------------------
+    # Building
+    # -------------------------
+    @staticmethod
+    def _terms_for(code: str, label: str) -> set:
+        terms = {code.lower()}
+        for word in (label or "").replace(",", " ").split():
+            terms.add(word.lower())
+        return terms
+
+    def add(self, code: str, label: str = "", status: str = None) -> None:
+        code = (code or "").strip().upper()
+        if not code:
+            return
+        if code in self._labels:
+            self.remove(code)
+        label = label or code
+        terms = self._terms_for(code, label)
+        for term in terms:
+            node = self._root
+            for ch in term:
+                node = node.children.setdefault(ch, _TrieNode())
+                node.codes.add(code)
+        self._labels[code] = label
+        self._terms[code] = terms
+        if status is not None:
+            self._status[code] = status
+
+    def remove(self, code: str) -> None:
+        code = (code or "").strip().upper()
+        for term in self._terms.pop(code, ()):
+            node = self._root
+            for ch in term:
+                child = node.children.get(ch)
+                if child is None:
+                    break
+                child.codes.discard(code)
+                if not child.codes:
+                    del node.children[ch]
+                    break
+                node = child
+        self._labels.pop(code, None)
+        self._status.pop(code, None)
+
+    def rebuild(self, responder_shifts: dict, apparatus: list, statuses: dict = None) -> None:
+        """responder_shifts: {"A": [(code, name), ...]}; apparatus: [(code, name), ...]"""
+        self._root = _TrieNode()
+        self._labels, self._terms = {}, {}
+        statuses = statuses or {}
+        for members in responder_shifts.values():
+            for code, name in members:
+                self.add(code, f"{code} {name}", statuses.get(code.upper()))
+        for code, name in apparatus:
+            self.add(code, f"{code} {name}", statuses.get(code.upper()))
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def set_status(self, code: str, status: str) -> None:
+        self._status[(code or "").strip().upper()] = status
+
+    def known(self, code: str) -> bool:
+        return (code or "").strip().upper() in self._labels
+
+    def label(self, code: str) -> str:
+        return self._labels.get((code or "").strip().upper(), "")
+
+    def suggest(self, prefix: str, limit: int = None) -> list:
+        """
+        Ranked [(code, label, status), ...] for a typed prefix: AVAILABLE
+        first, exact code matches ahead of name matches, then by code.
+        """
+        p = (prefix or "").strip().lower()
+        if not p:
+            return []
+        node = self._root
+        for ch in p:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        status = self._status
+        upper = p.upper()
+
+        def rank(code):
+            st = status.get(code, "--")
+            return (STATUS_RANK.get(st, 5), not code.startswith(upper), len(code), code)
+
+        best = heapq.nsmallest(limit or self.limit, node.codes, key=rank)
+        return [(c, self._labels[c], status.get(c, "--")) for c in best]
+
+
+def last_token(text: str) -> tuple:
+    """Split "E1, 43, M" into ("E1, 43, ", "M") so only the last item is completed."""
+    head, sep, tail = (text or "").rpartition(",")
+    if not sep:
+        return "", tail.strip()
+    return head + ", ", tail.strip()
@@ -0,0 +1,109 @@
+# unit_recommender.py
+import heapq
+import itertools
+import time
+
+# Lower sorts first. Units whose status/op status maps to None are never suggested.
+STATUS_ORDER = {
+    "AVAILABLE": 0,
+    "--": 1,
+    "TRANSPORTING": 2,
+    "ON SCENE": 3,
+    "ENROUTE": 3,
+    "DISPATCHED": 3,
+    "UNAVAILABLE": None,
+}
+READINESS_ORDER = {
+    "Ready": 0,
+    "Needs Maintenance": 1,
+    "Out of Service": None,
+}
+APPARATUS_GROUP = "APPARATUS"
+
+
+class UnitRecommender:
+    """
+    Ranks units to dispatch next, one heap per group (a shift letter for
+    responders, APPARATUS_GROUP for apparatus).
+
+    Heap key: (status rank, readiness rank, active run count, last dispatch
+    time, code) - i.e. available before busy, ready before degraded, idle
+    longest first. Updates push a fresh entry and mark the old one stale
+    (lazy deletion), so every status event is O(log n) and nothing scans
+    the whole fleet.
+    """
+
+    def __init__(self):
+        self._heaps = {}        # group -> [(key, seq, code)]
+        self._live = {}         # code -> (key, seq) currently valid
+        self._units = {}        # code -> state dict
+        self._seq = itertools.count()
+
+    def track(self, code: str, group: str, status: str = "AVAILABLE", readiness: str = "Ready") -> None:
+        code = (code or "").strip().upper()
+        if not code:
+            return
+        st = self._units.setdefault(code, {"last_dispatch": 0.0, "active_runs": 0})
+        st.update(group=group, status=status, readiness=readiness)
+        self._push(code)
+
+    def forget(self, code: str) -> None:
+        code = (code or "").strip().upper()
+        self._units.pop(code, None)
+        self._live.pop(code, None)
+
+    def update(self, code: str, status: str = None, readiness: str = None,
+               active_runs: int = None, now: float = None) -> None:
+        """Apply one status event. Moving to DISPATCHED stamps the last-dispatch time."""
+        code = (code or "").strip().upper()
+        st = self._units.get(code)
+        if st is None:
+            return
+        if status is not None:
+            if status == "DISPATCHED" and st.get("status") != "DISPATCHED":
+                st["last_dispatch"] = now if now is not None else time.time()
+            st["status"] = status
+        if readiness is not None:
+            st["readiness"] = readiness
+        if active_runs is not None:
+            st["active_runs"] = int(active_runs)
+        self._push(code)
+
+    def _push(self, code: str) -> None:
+        st = self._units[code]
+        s_rank = STATUS_ORDER.get(st.get("status"), 2)
+        r_rank = READINESS_ORDER.get(st.get("readiness"), 0)
+        if s_rank is None or r_rank is None:
+            self._live.pop(code, None)     # not dispatchable; old entries go stale
+            return
+        key = (s_rank, r_rank, st["active_runs"], st["last_dispatch"], code)
+        seq = next(self._seq)
+        self._live[code] = (key, seq)
+        heap = self._heaps.setdefault(st["group"], [])
+        heapq.heappush(heap, (key, seq, code))
+        if len(heap) > 2 * len(self._live) + 64:
+            self._compact(st["group"])
+
+    def _compact(self, group: str) -> None:
+        self._heaps[group] = [e for e in self._heaps[group] if self._live.get(e[2]) == (e[0], e[1])]
+        heapq.heapify(self._heaps[group])
+
+    def top(self, group: str, n: int = 3, exclude=()) -> list:
+        """Best `n` codes in a group, best first. O(k log n) for k popped entries."""
+        heap = self._heaps.get(group, [])
+        taken, out = [], []
+        skip = {str(x).upper() for x in exclude}
+        while heap and len(out) < n:
+            entry = heapq.heappop(heap)
+            key, seq, code = entry
+            if self._live.get(code) != (key, seq):
+                continue    # stale
+            taken.append(entry)
+            if code not in skip:
+                out.append(code)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return out
+
+    def status_of(self, code: str) -> str:
+        return self._units.get((code or "").strip().upper(), {}).get("status", "")